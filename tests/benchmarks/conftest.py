@@ -0,0 +1,26 @@
+import pytest
+
+# (operation, shape, requests, budget, seconds), filled by the benchmarks;
+# requests and budget are None when not counted
+RESULTS = []
+
+
+@pytest.fixture
+def bench_results():
+    return RESULTS
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    terminalreporter.section("yunpath benchmarks")
+    terminalreporter.write_line(
+        f"{'operation':<10} {'shape':<6} {'requests':>8} {'budget':>7} {'ms':>9}"
+    )
+    for operation, shape, requests, budget, seconds in RESULTS:
+        requests = "-" if requests is None else requests
+        budget = "-" if budget is None else budget
+        terminalreporter.write_line(
+            f"{operation:<10} {shape:<6} {requests:>8} {budget:>7} "
+            f"{seconds * 1000:>9.1f}"
+        )
@@ -0,0 +1,88 @@
+"""Startup benchmarks: `import yunpath` must not import any provider SDK
+
+The import time is measured with `python -X importtime` in a fresh
+interpreter. Set YUNPATH_IMPORT_BUDGET_MS to change its budget.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+IMPORT_BUDGET_MS = float(os.environ.get("YUNPATH_IMPORT_BUDGET_MS", "50"))
+
+# only imported once a cloud path is used
+HEAVY = ("cloudpathlib", "google", "boto3", "botocore", "azure", "requests")
+
+
+def _importtime(code):
+    """Run code in a fresh interpreter
+
+    Returns:
+        The cumulative import times (microseconds) by module, and the output
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times, proc.stdout
+
+
+def test_import_is_lazy():
+    times, _ = _importtime("import yunpath")
+    heavy = sorted(name for name in times if name.split(".")[0] in HEAVY)
+    assert heavy == []
+
+
+def test_import_time_budget(bench_results):
+    # the best of a few runs, to smooth out a busy machine
+    ms = min(_importtime("import yunpath")[0]["yunpath"] for _ in range(3)) / 1000
+    bench_results.append(("import", "-", None, None, ms / 1000))
+    assert ms <= IMPORT_BUDGET_MS, (
+        f"import yunpath took {ms:.1f}ms, over its budget of {IMPORT_BUDGET_MS}ms"
+    )
+
+
+def test_first_use_registers_gspath():
+    _, out = _importtime(
+        "import yunpath, pathlib\n"
+        "print(type(yunpath.AnyPath('gs://bucket/blob')).__module__)\n"
+        "print(hasattr(pathlib.Path('.'), 'rmtree'))"
+    )
+    assert out.split() == ["yunpath.patch", "True"]
+
+
+def test_submodules_register_gspath():
+    _, out = _importtime(
+        "from yunpath.sync import to_anypath\n"
+        "print(type(to_anypath('gs://bucket/blob')).__module__)"
+    )
+    assert out.split() == ["yunpath.patch"]
+
+
+@pytest.mark.parametrize(
+    "imports",
+    [
+        "import yunpath\nimport cloudpathlib",
+        "import cloudpathlib\nimport yunpath",
+    ],
+)
+def test_cloudpathlib_entry_points_get_gspath(imports):
+    _, out = _importtime(
+        f"{imports}\n"
+        "from cloudpathlib import AnyPath, CloudPath\n"
+        "print(type(CloudPath('gs://bucket/blob')).__module__)\n"
+        "print(type(AnyPath('gs://bucket/blob')).__module__)"
+    )
+    assert out.split() == ["yunpath.patch", "yunpath.patch"]
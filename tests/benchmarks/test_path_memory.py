@@ -0,0 +1,71 @@
+"""Memory benchmarks of the paths built by listings
+
+The paths yielded by `iterdir`, `walk` and `glob` skip the parsing of the
+constructor and only build their `urlparse` result and `PurePosixPath` when
+needed. They must take well under the memory of the constructed ones (measured
+with tracemalloc). The times are reported in the terminal summary, in the
+`ms` column per 1000 paths.
+"""
+import time
+import tracemalloc
+
+import pytest
+from yunpath import GSClient, GSPath
+
+from ..fake_gcs import FakeStorageClient
+
+pytestmark = pytest.mark.benchmark
+
+N = 5000
+NAMES = [f"data/dir{i % 50}/file{i:06d}.txt" for i in range(N)]
+
+
+@pytest.fixture
+def client():
+    return GSClient(storage_client=FakeStorageClient())
+
+
+def _build(make):
+    """Build a path per name
+
+    Returns:
+        The paths, the bytes and the seconds per path
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        paths = [make(name) for name in NAMES]
+        seconds = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return paths, size / N, seconds / N
+
+
+def test_listed_paths_are_lean(client, bench_results):
+    constructed, constructed_size, constructed_secs = _build(
+        lambda name: GSPath(f"gs://bucket/{name}", client=client)
+    )
+    listed, listed_size, listed_secs = _build(
+        lambda name: GSPath._from_listing(client, "gs://bucket/", name)
+    )
+    bench_results.append(("path", "new", None, None, constructed_secs * 1000))
+    bench_results.append(("path", "listed", None, None, listed_secs * 1000))
+
+    assert listed == constructed
+    assert listed_size < constructed_size / 1.5, (
+        f"a listed path takes {listed_size:.0f} bytes, "
+        f"a constructed one {constructed_size:.0f}"
+    )
+    assert listed_secs < constructed_secs
+
+
+def test_hash_and_eq_are_cached(client, bench_results):
+    paths = [GSPath._from_listing(client, "gs://bucket/", name) for name in NAMES]
+    slashed = [GSPath(f"{path}/", client=client) for path in paths]
+
+    start = time.perf_counter()
+    assert len(set(paths) | set(slashed)) == N
+    assert all(a == b for a, b in zip(paths, slashed))
+    seconds = time.perf_counter() - start
+    bench_results.append(("hash+eq", "listed", None, None, seconds / N * 1000))
@@ -0,0 +1,88 @@
+"""Benchmarks of the hot paths against the in-memory fake of GCS
+
+Each operation runs on a fresh client over a few tree shapes, and fails if
+it makes more requests than its budget. Lower a budget when an optimization
+lands, so that it does not regress. The wall times are reported in the
+terminal summary; set YUNPATH_BENCH_LATENCY to the seconds each request
+takes to see how they add up against a remote GCS.
+"""
+import os
+import time
+
+import pytest
+from yunpath import GSClient, GSPath
+
+from ..fake_gcs import FakeStorageClient
+
+pytestmark = pytest.mark.benchmark
+
+LATENCY = float(os.environ.get("YUNPATH_BENCH_LATENCY", "0"))
+
+SHAPES = {
+    # 100 files in one directory
+    "flat": [f"f{i:03d}.txt" for i in range(100)],
+    # a file at each level of a chain of 8 directories
+    "deep": [
+        "/".join(f"d{j}" for j in range(i + 1)) + f"/f{i}.txt" for i in range(8)
+    ],
+    # 100 files in 25 directories of 5 directories
+    "wide": [
+        f"d{i}/s{j}/f{k}.txt" for i in range(5) for j in range(5) for k in range(4)
+    ],
+}
+
+OPERATIONS = {
+    "resolve": lambda root, files: (root / files[-1]).resolve(),
+    "exists": lambda root, files: (root / files[-1]).exists(),
+    "stat": lambda root, files: (root / files[-1]).stat(),
+    "iterdir": lambda root, files: list(root.iterdir()),
+    "walk": lambda root, files: list(root.walk()),
+    "mkdir": lambda root, files: (root / "new" / "a" / "b" / "c").mkdir(
+        parents=True
+    ),
+    "copytree": lambda root, files: root.copytree(root.parent / "copy"),
+    "rmtree": lambda root, files: root.rmtree(),
+}
+
+# the maximum number of requests of each operation on each shape
+BUDGETS = {
+    "resolve": {"flat": 2, "deep": 10, "wide": 4},
+    "exists": {"flat": 3, "deep": 11, "wide": 5},
+    "stat": {"flat": 1, "deep": 1, "wide": 1},
+    "iterdir": {"flat": 2, "deep": 2, "wide": 2},
+    "walk": {"flat": 1, "deep": 1, "wide": 1},
+    "mkdir": {"flat": 10, "deep": 10, "wide": 10},
+    "copytree": {"flat": 207, "deep": 83, "wide": 352},
+    "rmtree": {"flat": 5, "deep": 5, "wide": 5},
+}
+
+
+def _tree(shape):
+    storage_client = FakeStorageClient(latency=LATENCY)
+    bucket = storage_client.bucket("bench")
+    for name in SHAPES[shape]:
+        bucket.blob(f"data/{name}").upload_from_string(name)
+    client = GSClient(storage_client=storage_client, metrics=True)
+    return GSPath("gs://bench/data", client=client)
+
+
+@pytest.mark.parametrize("shape", list(SHAPES))
+@pytest.mark.parametrize("operation", list(OPERATIONS))
+def test_rpc_budget(operation, shape, bench_results):
+    root = _tree(shape)
+    root.client.metrics.reset()
+
+    start = time.perf_counter()
+    OPERATIONS[operation](root, SHAPES[shape])
+    seconds = time.perf_counter() - start
+
+    snapshot = root.client.metrics.snapshot()
+    budget = BUDGETS[operation][shape]
+    bench_results.append(
+        (operation, shape, snapshot["rpc_count"], budget, seconds)
+    )
+    rpcs = {name: rpc["count"] for name, rpc in snapshot["rpcs"].items()}
+    assert snapshot["rpc_count"] <= budget, (
+        f"{operation} on {shape} made {snapshot['rpc_count']} requests, "
+        f"over its budget of {budget}: {rpcs}"
+    )
@@ -1,3 +1,4 @@
+import os
 import uuid
 import pytest
 from dotenv import load_dotenv
@@ -5,6 +6,45 @@ from yunpath import AnyPath
 
 load_dotenv()
 
+BUCKET = "handy-buffer-287000.appspot.com"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--fake-gcs",
+        action="store_true",
+        default=bool(os.environ.get("YUNPATH_FAKE_GCS")),
+        help="Run the tests against an in-memory fake of GCS instead of a "
+        "real bucket (or set YUNPATH_FAKE_GCS=1)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: offline benchmarks with budgets of GCS requests"
+    )
+    if config.getoption("--fake-gcs"):
+        from yunpath import GSClient
+        from .fake_gcs import FakeStorageClient
+
+        storage_client = FakeStorageClient()
+        storage_client.bucket(BUCKET).blob("yunpath-test/").upload_from_string("")
+        GSClient(storage_client=storage_client).set_as_default_client()
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:  # pragma: no cover
+            return
+        from .fake_gcs import JSONAPIServer
+
+        # for the asyncio transport of AsyncGSClient
+        config._json_api_server = JSONAPIServer(storage_client).start()
+
+
+def pytest_unconfigure(config):
+    server = getattr(config, "_json_api_server", None)
+    if server is not None:
+        server.stop()
+
 
 @pytest.fixture(scope="session")
 def uid():
@@ -15,7 +55,7 @@ def uid():
 def gspath(uid):  # noqa: F811
     """Return a AnyPath object"""
     p = AnyPath(
-        f"gs://handy-buffer-287000.appspot.com/yunpath-test/test-{uid}"
+        f"gs://{BUCKET}/yunpath-test/test-{uid}"
     )
     p.mkdir(exist_ok=True)
     yield p
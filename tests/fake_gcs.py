@@ -0,0 +1,648 @@
+"""An in-memory stand-in for the google-cloud-storage client
+
+It implements the part of the blob/bucket/listing/batch surface that
+`GSClient` uses. Each call that would be a request to GCS goes through a
+`requests.Session` (`client._http`, as in the real client), answered in
+process after the injected latency, so the metrics of `GSClient` count the
+requests as they would against GCS. `JSONAPIServer` serves the metadata of
+the objects over HTTP, for the asyncio transport.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from urllib.parse import unquote
+
+import google_crc32c
+import requests
+from google.api_core.exceptions import NotFound
+
+
+def _glob_to_regex(pattern):
+    """Compile a GCS `match_glob` expression"""
+    return re.compile(_glob_body(pattern) + r"\Z", re.S)
+
+
+def _glob_body(pattern):
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i : i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.index("]", i + 1)
+            body = pattern[i + 1 : j]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append("[" + body + "]")
+            i = j
+        elif c == "{":
+            j = pattern.index("}", i + 1)
+            alts = pattern[i + 1 : j].split(",")
+            out.append("(?:" + "|".join(_glob_body(a) for a in alts) + ")")
+            i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class _Object:
+    def __init__(self, data, metadata, content_type, generation):
+        self.data = data
+        self.metadata = dict(metadata) if metadata else None
+        self.content_type = content_type
+        self.generation = generation
+        self.updated = datetime.now(timezone.utc)
+        self.md5 = base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.crc32c = base64.b64encode(
+            google_crc32c.Checksum(data).digest()
+        ).decode()
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeBatch:
+    """`client.batch()`: the deletions are sent as one request on exit"""
+
+    def __init__(self, client, raise_exception=True):
+        self._client = client
+        self._raise_exception = raise_exception
+        self._ops = []
+        self._responses = []
+
+    def __enter__(self):
+        self._client._local.batch = self
+        return self
+
+    def __exit__(self, *exc):
+        self._client._local.batch = None
+        if exc[0] is not None:
+            return False
+        self._client._rpc("batch")
+        for op in self._ops:
+            try:
+                op()
+            except NotFound:
+                self._responses.append(FakeResponse(404))
+            except Exception:  # pragma: no cover
+                self._responses.append(FakeResponse(500))
+            else:
+                self._responses.append(FakeResponse(204))
+        return False
+
+
+class FakePage(list):
+    prefixes = ()
+
+
+class FakeIterator:
+    """`bucket.list_blobs()`: one request per page, the prefixes come with
+    the last page"""
+
+    def __init__(self, bucket, names, delimiter, prefix, max_results, page_size):
+        self._bucket = bucket
+        self._names = names
+        self._delimiter = delimiter
+        self._prefix = prefix or ""
+        self._max_results = max_results
+        self._page_size = page_size or 1000
+        self.prefixes = set()
+        self.next_page_token = None
+
+    def _items(self):
+        count = 0
+        for name in self._names:
+            if self._delimiter:
+                rest = name[len(self._prefix) :]
+                idx = rest.find(self._delimiter)
+                if idx >= 0:
+                    self.prefixes.add(self._prefix + rest[: idx + 1])
+                    continue
+            if self._max_results is not None and count >= self._max_results:
+                return
+            count += 1
+            yield name
+
+    @property
+    def pages(self):
+        names = list(self._items())
+        chunks = [
+            names[i : i + self._page_size]
+            for i in range(0, len(names), self._page_size)
+        ] or [[]]
+        for i, chunk in enumerate(chunks):
+            page = self._page(chunk)
+            # all the prefixes come with the last page
+            page.prefixes = (
+                tuple(sorted(self.prefixes)) if i == len(chunks) - 1 else ()
+            )
+            self.next_page_token = str(i + 1) if i < len(chunks) - 1 else None
+            yield page
+
+    def _page(self, names):
+        self._bucket._client._rpc("list")
+        blobs = FakePage()
+        for name in names:
+            blob = self._bucket._snapshot(name)
+            if blob is not None:
+                blobs.append(blob)
+        return blobs
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+
+class FakeBlob:
+    """A blob, with its properties loaded by `get_blob` or a listing"""
+
+    def __init__(self, name, bucket, generation=None, chunk_size=None):
+        self.name = name
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.metadata = None
+        self.size = None
+        self.updated = None
+        self.etag = None
+        self.md5_hash = None
+        self.crc32c = None
+        self.generation = generation
+        self.content_type = None
+
+    @property
+    def client(self):
+        return self.bucket._client
+
+    def _load(self, obj):
+        self.metadata = dict(obj.metadata) if obj.metadata else None
+        self.size = len(obj.data)
+        self.updated = obj.updated
+        self.etag = f"etag-{obj.generation}"
+        self.md5_hash = obj.md5
+        self.crc32c = obj.crc32c
+        self.generation = obj.generation
+        self.content_type = obj.content_type
+        return self
+
+    @property
+    def _properties(self):
+        return {
+            "name": self.name,
+            "metadata": self.metadata,
+            "size": None if self.size is None else str(self.size),
+            "updated": None if self.updated is None else self.updated.isoformat(),
+            "etag": self.etag,
+            "md5Hash": self.md5_hash,
+            "crc32c": self.crc32c,
+            "generation": None if self.generation is None else str(self.generation),
+            "contentType": self.content_type,
+        }
+
+    def _set_properties(self, value):
+        self.metadata = value.get("metadata")
+        self.size = None if value.get("size") is None else int(value["size"])
+        self.updated = value.get("updated")
+        if self.updated is not None:
+            self.updated = datetime.fromisoformat(self.updated)
+        self.etag = value.get("etag")
+        self.md5_hash = value.get("md5Hash")
+        self.crc32c = value.get("crc32c")
+        self.generation = (
+            None if value.get("generation") is None else int(value["generation"])
+        )
+        self.content_type = value.get("contentType")
+
+    def _store(self, data, content_type=None):
+        self.bucket._put(self.name, data, self.metadata, content_type)
+        self._load(self.bucket._objects[self.name])
+
+    def exists(self, **kwargs):
+        self.client._rpc("get")
+        return self.name in self.bucket._objects
+
+    def reload(self, **kwargs):
+        self.client._rpc("get")
+        obj = self.bucket._objects.get(self.name)
+        if obj is None:
+            raise NotFound(f"{self.name}")
+        self._load(obj)
+
+    def upload_from_string(self, data, content_type=None, **kwargs):
+        if isinstance(data, str):
+            data = data.encode()
+        self.client._rpc("upload", sent=len(data))
+        self._store(bytes(data), content_type)
+
+    def upload_from_filename(self, filename, content_type=None, **kwargs):
+        with open(filename, "rb") as fh:
+            data = fh.read()
+        self.client._rpc("upload", sent=len(data))
+        self._store(data, content_type)
+
+    def upload_from_file(self, file_obj, size=None, content_type=None, **kwargs):
+        data = file_obj.read() if size is None else file_obj.read(size)
+        self.client._rpc("upload", sent=len(data))
+        self._store(data, content_type)
+
+    def _data(self):
+        obj = self.bucket._objects.get(self.name)
+        if obj is None or (
+            self.generation is not None and obj.generation != self.generation
+        ):
+            raise NotFound(f"{self.name}")
+        return obj.data
+
+    def download_as_bytes(self, start=None, end=None, **kwargs):
+        data = self._data()
+        start = start or 0
+        end = len(data) if end is None else end + 1
+        self.client._rpc("download", received=len(data[start:end]))
+        return data[start:end]
+
+    def download_to_filename(self, filename, **kwargs):
+        data = self._data()
+        self.client._rpc("download", received=len(data))
+        with open(filename, "wb") as fh:
+            fh.write(data)
+
+    def download_to_file(self, file_obj, **kwargs):
+        data = self._data()
+        self.client._rpc("download", received=len(data))
+        file_obj.write(data)
+
+    def delete(self, **kwargs):
+        self.bucket.delete_blob(self.name)
+
+    def patch(self, **kwargs):
+        self.client._rpc("patch")
+        obj = self.bucket._objects.get(self.name)
+        if obj is None:
+            raise NotFound(self.name)
+        obj.metadata = dict(self.metadata) if self.metadata else None
+        obj.updated = datetime.now(timezone.utc)
+
+    def rewrite(self, source, token=None, **kwargs):
+        self.client._rpc("rewrite")
+        obj = source.bucket._objects.get(source.name)
+        if obj is None:
+            raise NotFound(source.name)
+        chunk = self.client.rewrite_chunk
+        done = int(token or 0)
+        total = len(obj.data)
+        if chunk and done + chunk < total:
+            done += chunk
+            return str(done), done, total
+        metadata = self.metadata if self.metadata is not None else obj.metadata
+        self.bucket._put(self.name, obj.data, metadata, obj.content_type)
+        self._load(self.bucket._objects[self.name])
+        return None, total, total
+
+    def compose(self, sources, **kwargs):
+        self.client._rpc("compose")
+        data = b""
+        for src in sources:
+            obj = src.bucket._objects.get(src.name)
+            if obj is None:
+                raise NotFound(src.name)
+            data += obj.data
+        self._store(data, self.content_type)
+
+    def open(self, mode="rb", **kwargs):
+        if "r" in mode:
+            data = self.download_as_bytes()
+            return io.BytesIO(data)
+        return _FakeWriter(self)
+
+
+class _FakeWriter(io.BytesIO):
+    def __init__(self, blob):
+        super().__init__()
+        self._blob = blob
+
+    def close(self):
+        if not self.closed:
+            self._blob.upload_from_string(self.getvalue())
+        super().close()
+
+    def terminate(self):
+        super().close()
+
+
+class FakeBucket:
+    """A bucket, its objects live in the client"""
+
+    def __init__(self, client, name):
+        self._client = client
+        self.name = name
+        self._objects = client._buckets.setdefault(name, {})
+
+    def __str__(self):
+        return self.name
+
+    def _put(self, name, data, metadata, content_type):
+        with self._client._lock:
+            self._client._generation += 1
+            self._objects[name] = _Object(
+                data, metadata, content_type, self._client._generation
+            )
+
+    def _snapshot(self, name, generation=None):
+        obj = self._objects.get(name)
+        if obj is None or (generation is not None and obj.generation != generation):
+            return None
+        return FakeBlob(name, self)._load(obj)
+
+    def exists(self, **kwargs):
+        self._client._rpc("bucket_get")
+        return True
+
+    def blob(self, name, generation=None, chunk_size=None, **kwargs):
+        return FakeBlob(name, self, generation=generation, chunk_size=chunk_size)
+
+    def get_blob(self, name, generation=None, **kwargs):
+        blob = self._snapshot(name, generation)
+        self._client._rpc("get", status=404 if blob is None else 200)
+        return blob
+
+    def list_blobs(
+        self,
+        max_results=None,
+        prefix=None,
+        delimiter=None,
+        start_offset=None,
+        end_offset=None,
+        match_glob=None,
+        page_size=None,
+        **kwargs,
+    ):
+        names = sorted(self._objects)
+        if prefix:
+            names = [n for n in names if n.startswith(prefix)]
+        if start_offset:
+            names = [n for n in names if n >= start_offset]
+        if end_offset:
+            names = [n for n in names if n < end_offset]
+        if match_glob:
+            regex = _glob_to_regex(match_glob)
+            names = [n for n in names if regex.match(n)]
+        return FakeIterator(self, names, delimiter, prefix, max_results, page_size)
+
+    def copy_blob(self, blob, destination_bucket, new_name=None, **kwargs):
+        self._client._rpc("copy")
+        obj = self._objects.get(blob.name)
+        if obj is None:
+            raise NotFound(blob.name)
+        new_name = new_name or blob.name
+        destination_bucket._put(new_name, obj.data, obj.metadata, obj.content_type)
+        return destination_bucket._snapshot(new_name)
+
+    def delete_blob(self, blob_name, **kwargs):
+        def _delete():
+            with self._client._lock:
+                if blob_name not in self._objects:
+                    raise NotFound(blob_name)
+                del self._objects[blob_name]
+
+        batch = getattr(self._client._local, "batch", None)
+        if batch is not None:
+            batch._ops.append(_delete)
+            return
+        self._client._rpc("delete")
+        _delete()
+
+    def delete_blobs(self, blobs, **kwargs):
+        for blob in blobs:
+            self.delete_blob(getattr(blob, "name", blob))
+
+
+# the requests of the JSON API behind each call, as the real client makes them
+_REQUESTS = {
+    "get": ("GET", "/storage/v1/b/b/o/o"),
+    "list": ("GET", "/storage/v1/b/b/o"),
+    "upload": ("POST", "/upload/storage/v1/b/b/o?uploadType=multipart"),
+    "download": ("GET", "/download/storage/v1/b/b/o/o?alt=media"),
+    "patch": ("PATCH", "/storage/v1/b/b/o/o"),
+    "rewrite": ("POST", "/storage/v1/b/b/o/o/rewriteTo/b/b/o/o"),
+    "compose": ("POST", "/storage/v1/b/b/o/o/compose"),
+    "copy": ("POST", "/storage/v1/b/b/o/o/copyTo/b/b/o/o"),
+    "delete": ("DELETE", "/storage/v1/b/b/o/o"),
+    "batch": ("POST", "/batch/storage/v1"),
+    "bucket_get": ("GET", "/storage/v1/b/b"),
+    "list_buckets": ("GET", "/storage/v1/b"),
+}
+
+
+class _FakeAdapter(requests.adapters.BaseAdapter):
+    """Answers the requests of the fake, after its latency"""
+
+    def __init__(self, client):
+        super().__init__()
+        self._client = client
+
+    def send(self, request, **kwargs):
+        latency = self._client.latency
+        if isinstance(latency, dict):
+            latency = latency.get(request.headers["X-Fake-Call"], 0.0)
+        if latency:
+            time.sleep(latency)
+        response = requests.Response()
+        response.status_code = int(request.headers["X-Fake-Status"])
+        response.headers["Content-Length"] = request.headers.get(
+            "X-Fake-Received", "0"
+        )
+        response.raw = io.BytesIO(b"")
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeStorageClient:
+    """The storage client
+
+    Args:
+        latency: The seconds each request takes, or a dict of the call names
+            (e.g. `get`, `list`, `upload`) to their seconds
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.rewrite_chunk = None
+        self.calls = Counter()
+        self._buckets = {}
+        self._local = threading.local()
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._http = requests.Session()
+        self._http.trust_env = False
+        self._http.mount("https://storage.googleapis.com/", _FakeAdapter(self))
+        # the root of the JSON API, see JSONAPIServer
+        self._connection = SimpleNamespace(
+            API_BASE_URL="https://storage.googleapis.com"
+        )
+
+    def _rpc(self, name, sent=0, received=0, status=200):
+        with self._lock:
+            self.calls[name] += 1
+        method, path = _REQUESTS[name]
+        self._http.request(
+            method,
+            "https://storage.googleapis.com" + path,
+            headers={
+                "Content-Length": str(sent),
+                "X-Fake-Call": name,
+                "X-Fake-Received": str(received),
+                "X-Fake-Status": str(status),
+            },
+        )
+
+    def bucket(self, name, user_project=None):
+        return FakeBucket(self, name)
+
+    def get_bucket(self, name, **kwargs):
+        self._rpc("bucket_get")
+        return FakeBucket(self, name)
+
+    def list_buckets(self, **kwargs):
+        self._rpc("list_buckets")
+        return [FakeBucket(self, name) for name in sorted(self._buckets)]
+
+    def batch(self, raise_exception=True):
+        return FakeBatch(self, raise_exception=raise_exception)
+
+
+class JSONAPIServer:
+    """The metadata part of the JSON API of GCS over HTTP, on localhost,
+    answered from the objects of a `FakeStorageClient` after its latency
+
+    It serves the objects, the listings and the buckets (GET only), for the
+    aiohttp transport of `AsyncGSClient`. `start()` points the
+    `_connection.API_BASE_URL` of the client to it.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self.url = None
+
+    async def _answer(self, name, body=None, status=200):
+        from aiohttp import web
+
+        latency = self._client.latency
+        if isinstance(latency, dict):
+            latency = latency.get(name, 0.0)
+        if latency:
+            await asyncio.sleep(latency)
+        with self._client._lock:
+            self._client.calls[name] += 1
+        if status == 404:
+            body = {"error": {"code": 404, "message": "Not Found"}}
+        return web.json_response(body, status=status)
+
+    async def _get_object(self, request):
+        bucket = request.match_info["bucket"]
+        # the raw path, for the names with an encoded slash
+        name = unquote(request.raw_path.split("?")[0].split("/o/", 1)[1])
+        blob = self._client.bucket(bucket)._snapshot(name)
+        if blob is None:
+            return await self._answer("get", status=404)
+        return await self._answer("get", _resource(blob))
+
+    async def _list_objects(self, request):
+        bucket = self._client.bucket(request.match_info["bucket"])
+        prefix = request.query.get("prefix", "")
+        delimiter = request.query.get("delimiter")
+        max_results = int(request.query.get("maxResults", 1000))
+        offset = int(request.query.get("pageToken", 0))
+
+        entries = []
+        prefixes = set()
+        for name in sorted(n for n in bucket._objects if n.startswith(prefix)):
+            rest = name[len(prefix) :]
+            if delimiter and delimiter in rest:
+                sub = prefix + rest[: rest.index(delimiter) + 1]
+                if sub not in prefixes:
+                    prefixes.add(sub)
+                    entries.append((sub, None))
+                continue
+            entries.append((name, name))
+
+        page = entries[offset : offset + max_results]
+        body = {
+            "items": [
+                _resource(bucket._snapshot(name)) for _, name in page if name
+            ],
+            "prefixes": [sub for sub, name in page if name is None],
+        }
+        if offset + max_results < len(entries):
+            body["nextPageToken"] = str(offset + max_results)
+        return await self._answer("list", body)
+
+    async def _get_bucket(self, request):
+        name = request.match_info["bucket"]
+        if name not in self._client._buckets:
+            return await self._answer("bucket_get", status=404)
+        return await self._answer("bucket_get", {"name": name})
+
+    async def _serve(self, started):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/storage/v1/b/{bucket}", self._get_bucket)
+        app.router.add_get("/storage/v1/b/{bucket}/o", self._list_objects)
+        app.router.add_get("/storage/v1/b/{bucket}/o/{name:.+}", self._get_object)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        started.set()
+
+    def start(self):
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(started), self._loop)
+        started.wait(10)
+        self._client._connection.API_BASE_URL = self.url
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(
+            self._runner.cleanup(), self._loop
+        ).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop.close()
+
+
+def _resource(blob):
+    return {
+        key: value for key, value in blob._properties.items() if value is not None
+    }
@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+from yunpath import AsyncGSClient, AsyncGSPath, GSPath
+from .conftest import uid  # noqa: F401
+
+
+def test_async_gspath(gspath):
+    """Test the awaitable methods of AsyncGSPath"""
+
+    async def main():
+        root = AsyncGSPath(gspath / "test_async_gspath")
+        await root.mkdir()
+        assert await root.is_dir()
+
+        files = [root / f"file{i}.txt" for i in range(10)]
+        await asyncio.gather(*(f.write_text(f.name) for f in files))
+        assert await asyncio.gather(*(f.read_text() for f in files)) == [
+            f.name for f in files
+        ]
+        assert all(await asyncio.gather(*(f.is_file() for f in files)))
+        assert (await files[0].stat()).st_size == len("file0.txt")
+
+        link = root / "link"
+        await link.symlink_to(files[0])
+        assert await link.is_symlink()
+        assert await link.readlink() == files[0]
+        assert await link.resolve() == files[0]
+        assert await link.read_text() == "file0.txt"
+
+        names = sorted([p.name async for p in root.iterdir()])
+        assert names == sorted([f.name for f in files] + ["link"])
+
+        walked = [
+            (dirpath, sorted(filenames))
+            async for dirpath, _, filenames in root.walk()
+        ]
+        assert walked == [(root, names)]
+
+        await root.rmtree()
+        assert not await root.exists()
+
+    asyncio.run(main())
+
+
+def test_async_gsclient(gspath):
+    """Test that an AsyncGSClient wraps a GSClient"""
+
+    async def main():
+        async with AsyncGSClient(gspath.client, max_workers=4) as client:
+            path = client.AsyncGSPath(str(gspath / "test_async_gsclient.txt"))
+            assert isinstance(path.path, GSPath)
+            assert path.path.client is gspath.client
+            assert path.parent == gspath
+            await path.write_bytes(b"data")
+            assert await path.read_bytes() == b"data"
+            await path.unlink()
+            with pytest.raises(FileNotFoundError):
+                await path.read_bytes()
+
+    asyncio.run(main())
+
+
+def test_connection_pool_is_grown_in_place():
+    """Test that the adapter of the session is resized, not replaced"""
+    import types
+
+    import requests
+    from yunpath import GSClient
+
+    class TlsAdapter(requests.adapters.HTTPAdapter):
+        pass
+
+    session = requests.Session()
+    adapter = TlsAdapter(pool_maxsize=4)
+    session.mount("https://", adapter)
+    client = GSClient(storage_client=types.SimpleNamespace(_http=session))
+
+    AsyncGSClient(client, max_workers=16).close()
+    assert session.get_adapter("https://storage.googleapis.com/") is adapter
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 16
+
+    # never shrunk
+    AsyncGSClient(client, max_workers=2).close()
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 16
+
+
+def test_native_metadata_reads(gspath):
+    """Test that the metadata reads are requests of the event loop, with the
+    symlink and directory placeholder semantics of GSPath"""
+    pytest.importorskip("aiohttp")
+    from cloudpathlib.exceptions import NoStatError
+
+    root = gspath / "test_native_metadata_reads"
+    (root / "dir").mkdir(parents=True)
+    (root / "implicit" / "file.txt").write_text("hello")
+    (root / "link").symlink_to(root / "implicit")
+    (root / "flink").symlink_to(root / "implicit" / "file.txt")
+
+    async def main():
+        async with AsyncGSClient(gspath.client) as client:
+            aroot = client.AsyncGSPath(root)
+            assert await (aroot / "dir").is_dir()
+            assert await (aroot / "implicit").is_dir()
+            assert not await (aroot / "implicit").is_file()
+            assert await (aroot / "implicit" / "file.txt").is_file()
+            assert not await (aroot / "nothing").exists()
+            assert await (aroot / "link").is_symlink()
+            assert await (aroot / "link").resolve() == root / "implicit"
+            assert await (aroot / "link" / "file.txt").exists()
+            for name in ("link", "flink", "dir", "implicit", "nothing"):
+                for follow in (True, False):
+                    path = root / name
+                    apath = aroot / name
+                    for method in ("exists", "is_dir", "is_file"):
+                        expected = getattr(path, method)(follow_symlinks=follow)
+                        answer = getattr(apath, method)(follow_symlinks=follow)
+                        assert await answer == expected, (name, method, follow)
+            assert (await (aroot / "flink").stat()).st_size == 5
+            assert (await (aroot / "flink").stat(follow_symlinks=False)).st_size == 0
+            with pytest.raises(NoStatError):
+                await (aroot / "dir").stat()
+
+            names = sorted([p.name async for p in aroot.iterdir()])
+            assert names == ["dir", "flink", "implicit", "link"]
+            assert [p.name async for p in (aroot / "link").iterdir()] == [
+                "file.txt"
+            ]
+            walked = [(top, dirs, files) async for top, dirs, files in aroot.walk()]
+            assert walked == list(root.walk())
+            # no thread was needed
+            assert client._executor is None
+
+    asyncio.run(main())
+    root.rmtree()
+
+
+def test_concurrent_metadata_reads(request):
+    """Test that many checks run concurrently on a single event loop"""
+    pytest.importorskip("aiohttp")
+    if not request.config.getoption("--fake-gcs"):
+        pytest.skip("needs the latency of the fake GCS")
+
+    import time
+
+    from yunpath import GSClient
+    from .fake_gcs import FakeStorageClient, JSONAPIServer
+
+    storage_client = FakeStorageClient(latency={"get": 0.05, "list": 0.05})
+    for i in range(250):
+        storage_client.bucket("bkt").blob(f"d/f{i}").upload_from_string("x")
+    server = JSONAPIServer(storage_client).start()
+
+    async def main():
+        async with AsyncGSClient(
+            GSClient(storage_client=storage_client), max_connections=500
+        ) as client:
+            paths = [client.AsyncGSPath(f"gs://bkt/d/f{i}") for i in range(500)]
+            start = time.perf_counter()
+            found = await asyncio.gather(*(path.exists() for path in paths))
+            return found, time.perf_counter() - start
+
+    try:
+        found, elapsed = asyncio.run(main())
+    finally:
+        server.stop()
+    assert found == [True] * 250 + [False] * 250
+    # about 1500 requests of 50 ms, one after the other would take 75 s
+    assert elapsed < 5
+    assert storage_client.calls["get"] >= 1000
+
+
+def test_default_client_replaced(gspath):
+    """Test that the pool of a replaced default client is shut down"""
+    from yunpath import GSClient, aio
+
+    old = aio._get_default_client()
+    assert old.client is gspath.client
+    old._get_executor()
+    try:
+        GSClient(storage_client=gspath.client.client).set_as_default_client()
+        new = aio._get_default_client()
+        assert new is not old
+        assert old._executor is None
+    finally:
+        gspath.client.set_as_default_client()
+    assert aio._get_default_client().client is gspath.client
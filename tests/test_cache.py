@@ -0,0 +1,45 @@
+import time
+
+from yunpath.cache import TTLCache
+
+
+def test_ttl_cache_get_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", None)
+    assert cache.get("a") == 1
+    assert "b" in cache
+    assert cache.get("b", 2) is None
+    assert cache.get("c", 3) == 3
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_ttl_cache_expire():
+    cache = TTLCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert "a" not in cache
+
+
+def test_ttl_cache_pop_prefix():
+    cache = TTLCache()
+    cache.set("bucket/dir", 1)
+    cache.set("bucket/dir/a", 2)
+    cache.set("bucket/dir2", 3)
+    cache.pop_prefix("bucket/dir/")
+    cache.pop("bucket/dir")
+    assert "bucket/dir" not in cache
+    assert "bucket/dir/a" not in cache
+    assert "bucket/dir2" in cache
+    cache.clear()
+    assert len(cache) == 0
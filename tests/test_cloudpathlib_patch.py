@@ -1,6 +1,7 @@
+import os
 import pytest
 from pathlib import Path
-from yunpath import AnyPath
+from yunpath import AnyPath, GSPath
 from cloudpathlib.exceptions import NoStatError
 from .conftest import uid  # noqa: F401
 
@@ -689,6 +690,45 @@ def test_eq_with_trailing_slash(gspath):
     path1.rmdir()
 
 
+def test_hash_consistent_with_eq():
+    """Paths equal regardless of a trailing slash hash the same"""
+    path1 = GSPath("gs://bucket/dir/file.txt")
+    path2 = GSPath("gs://bucket/dir/file.txt/")
+    assert hash(path1) == hash(path2)
+    assert len({path1, path2, GSPath("gs://bucket/dir")}) == 2
+    assert {path1: 1}[path2] == 1
+
+
+def test_from_listing():
+    """Paths built from a listing behave like the constructed ones"""
+    path = GSPath("gs://bucket/dir/file.txt")
+    listed = GSPath._from_listing(path.client, "gs://bucket/", "dir/file.txt")
+    assert listed == path
+    assert hash(listed) == hash(path)
+    assert str(listed) == str(path)
+    assert listed.name == "file.txt"
+    assert listed.parent == GSPath("gs://bucket/dir")
+    assert listed.bucket == "bucket"
+    assert listed.blob == "dir/file.txt"
+    assert listed / "x" == GSPath("gs://bucket/dir/file.txt/x")
+    assert path.parent._child("file.txt") == path
+    # the bucket names are shared
+    other = GSPath._from_listing(path.client, "gs://bucket/", "a")
+    assert listed.bucket is other.bucket
+
+
+def test_pickle_path():
+    """Paths survive pickling, with their lazy attributes"""
+    import pickle
+
+    path = GSPath._from_listing(
+        GSPath("gs://bucket").client, "gs://bucket/", "dir/file.txt"
+    )
+    restored = pickle.loads(pickle.dumps(path))
+    assert restored == path
+    assert restored.name == "file.txt"
+
+
 def test_fspath_property():
     """Test fspath property on PurePath"""
     from pathlib import PurePath
@@ -756,3 +796,636 @@ def test_eq_without_network_call(gspath):
     # without making network calls (we can't truly test no network calls,
     # but we verify the logic works)
     assert path1 == path2
+
+
+def test_symlink_cache_invalidated(gspath):
+    """Test that symlink lookups through the cache see changes made by the
+    same client"""
+    from yunpath import GSClient
+
+    client = GSClient(storage_client=gspath.client.client, symlink_cache_ttl=60)
+    assert client._symlink_cache is not None
+    assert gspath.client._symlink_cache is None
+    target = client.CloudPath(f"{gspath}/test_symlink_cache_target")
+    target.touch()
+    link = client.CloudPath(f"{gspath}/test_symlink_cache_link")
+
+    # cache that link is not a symlink
+    assert not link.is_symlink()
+    link.symlink_to(target)
+    assert link.is_symlink()
+    assert link.resolve() == target
+
+    link.unlink()
+    assert not link.is_symlink()
+
+    # Clean up
+    target.unlink()
+
+
+def test_index_symlinks(gspath):
+    """Test that the symlink index answers is_symlink/readlink/resolve"""
+    from unittest import mock
+    from yunpath import GSClient
+
+    folder = gspath / "test_index_symlinks"
+    folder.mkdir(exist_ok=True)
+    target = folder / "target"
+    target.touch()
+    link = folder / "link"
+    link.symlink_to(target)
+    (folder / "file").touch()
+
+    # the ancestors of the folder are answered by the symlink cache
+    client = GSClient(storage_client=gspath.client.client, symlink_cache_ttl=60)
+    folder, target, link = (client.CloudPath(str(p)) for p in (folder, target, link))
+    folder.resolve()
+    assert client.index_symlinks(folder) == 1
+
+    with mock.patch.object(
+        client.client, "bucket", side_effect=AssertionError("no calls")
+    ):
+        assert link.is_symlink()
+        assert not (folder / "file").is_symlink()
+        assert link.readlink() == target
+        assert link.resolve() == target
+
+    # changes through the client keep the index up to date
+    link2 = folder / "link2"
+    link2.symlink_to(target)
+    assert link2.is_symlink()
+    link2.unlink()
+    assert not link2.is_symlink()
+    assert client.refresh_symlink_index() >= 1
+
+    # Clean up
+    folder.rmtree()
+
+
+def _count_get_blob(client):
+    """Patch the storage client of a GSClient to record get_blob calls"""
+    from unittest import mock
+
+    calls = []
+    make_bucket = client.client.bucket
+
+    def bucket(name, *args, **kwargs):
+        bkt = make_bucket(name, *args, **kwargs)
+        get_blob = bkt.get_blob
+
+        def counted_get_blob(blob_name, *args, **kwargs):
+            calls.append(blob_name)
+            return get_blob(blob_name, *args, **kwargs)
+
+        bkt.get_blob = counted_get_blob
+        return bkt
+
+    return calls, mock.patch.object(client.client, "bucket", bucket)
+
+
+def test_single_fetch_per_blob(gspath):
+    """Test that each public call fetches a blob at most once"""
+    target = gspath / "test_single_fetch_target"
+    target.write_text("content")
+    link = gspath / "test_single_fetch_link"
+    link.symlink_to(target)
+    folder = gspath / "test_single_fetch_dir"
+    folder.mkdir(exist_ok=True)
+
+    calls, patcher = _count_get_blob(gspath.client)
+    with patcher:
+        for call in (
+            lambda: target.stat(),
+            lambda: link.stat(follow_symlinks=False),
+            lambda: link.readlink(),
+            lambda: link.is_symlink(),
+            lambda: target.is_file(follow_symlinks=False),
+            lambda: folder.is_dir(follow_symlinks=False),
+            lambda: gspath.client._is_file_or_dir(folder),
+        ):
+            calls.clear()
+            call()
+            assert len(calls) == len(set(calls)), calls
+
+    # Clean up
+    link.unlink()
+    target.unlink()
+    folder.rmdir()
+
+
+def test_copytree_parallel(tmp_path, gspath):
+    """Test copying a directory tree between local and GCS with threads"""
+    import shutil
+
+    source = tmp_path / "test_copytree_parallel"
+    (source / "subdir").mkdir(parents=True)
+    for i in range(5):
+        (source / f"file{i}.txt").write_text(str(i))
+    (source / "subdir" / "file.txt").write_text("sub")
+    (source / "subdir" / "file.log").write_text("log")
+
+    dest = gspath / "test_copytree_parallel"
+    AnyPath(source).copytree(
+        dest, max_workers=4, ignore=shutil.ignore_patterns("*.log")
+    )
+    assert (dest / "file3.txt").read_text() == "3"
+    assert (dest / "subdir" / "file.txt").read_text() == "sub"
+    assert not (dest / "subdir" / "file.log").exists()
+
+    local = tmp_path / "test_copytree_parallel_back"
+    dest.copytree(local, max_workers=4)
+    assert (local / "file3.txt").read_text() == "3"
+    assert (local / "subdir" / "file.txt").read_text() == "sub"
+
+    # Clean up
+    dest.rmtree()
+
+
+def test_copy_gs_to_gs_server_side(gspath):
+    """Test that GS to GS copy/copytree/move rewrite blobs server-side,
+    carrying over the symlink metadata"""
+    from unittest import mock
+
+    source = gspath / "test_server_side_source"
+    source.mkdir(exist_ok=True)
+    (source / "file.txt").write_text("content")
+    (source / "sub").mkdir(exist_ok=True)
+    (source / "sub" / "link").symlink_to("../file.txt")
+
+    link_copy = gspath / "test_server_side_link"
+    dest = gspath / "test_server_side_dest"
+    moved = gspath / "test_server_side_moved"
+    with mock.patch.object(
+        GSPath, "download_to", side_effect=AssertionError("downloaded")
+    ):
+        (source / "sub" / "link").copy(link_copy, follow_symlinks=False)
+        source.copytree(dest, max_workers=2)
+        dest.copytree(moved)
+        dest.rmtree()
+
+    assert link_copy.is_symlink()
+    assert (moved / "file.txt").read_text() == "content"
+    assert (moved / "sub" / "link").is_symlink()
+    assert (moved / "sub" / "link").read_text() == "content"
+
+    with mock.patch.object(
+        GSPath, "download_to", side_effect=AssertionError("downloaded")
+    ):
+        moved.move(dest)
+    assert not moved.exists()
+    assert (dest / "sub" / "link").is_symlink()
+
+    # Clean up
+    link_copy.unlink()
+    dest.rmtree()
+    source.rmtree()
+
+
+def test_rmtree_batched(gspath, monkeypatch):
+    """Test that rmtree deletes files and placeholders in batches"""
+    tree = gspath / "test_rmtree_batched"
+    (tree / "a" / "b").mkdir(parents=True)
+    for i in range(7):
+        (tree / "a" / f"file{i}.txt").write_text("x")
+    (tree / "a" / "b" / "file.txt").write_text("x")
+
+    client = gspath.client
+    monkeypatch.setattr(client, "delete_batch_size", 3)
+    monkeypatch.setattr(client, "delete_workers", 2)
+    tree.rmtree()
+
+    assert not tree.exists()
+    bucket = client.client.bucket(tree.bucket)
+    assert list(bucket.list_blobs(prefix=tree.blob + "/", max_results=1)) == []
+
+
+def test_composite_upload(tmp_path, gspath, monkeypatch):
+    """Test that large files are uploaded in parallel chunks and composed"""
+    local = tmp_path / "large.bin"
+    data = bytes(range(256)) * 400
+    local.write_bytes(data)
+
+    client = gspath.client
+    monkeypatch.setattr(client, "composite_upload_threshold", 1024)
+    monkeypatch.setattr(client, "composite_upload_chunk_size", 1000)
+    monkeypatch.setattr(client, "composite_upload_workers", 4)
+    dest = gspath / "test_composite_upload" / "large.bin"
+    local.copy(dest)
+
+    assert dest.read_bytes() == data
+    # no temporary components left behind
+    assert list(dest.parent.iterdir()) == [dest]
+
+    # a failed cleanup does not hide the error of the upload
+    from yunpath import transfer
+
+    def _fail(message):
+        def _raise(*args, **kwargs):
+            raise OSError(message)
+
+        return _raise
+
+    monkeypatch.setattr(transfer, "_crc32c", _fail("upload failed"))
+    monkeypatch.setattr(transfer, "delete_blobs", _fail("cleanup failed"))
+    with pytest.raises(OSError, match="upload failed"):
+        local.copy(dest.with_name("failed.bin"))
+
+    monkeypatch.undo()
+    dest.parent.rmtree()
+
+
+def test_sliced_download(tmp_path, gspath, monkeypatch):
+    """Test that large blobs are downloaded with concurrent ranged requests"""
+    data = bytes(range(256)) * 400
+    source = gspath / "test_sliced_download.bin"
+    source.write_bytes(data)
+
+    client = gspath.client
+    monkeypatch.setattr(client, "sliced_download_threshold", 1024)
+    monkeypatch.setattr(client, "sliced_download_chunk_size", 1000)
+    monkeypatch.setattr(client, "sliced_download_workers", 4)
+    # the short writes are continued
+    pwrite = os.pwrite
+    monkeypatch.setattr(os, "pwrite", lambda fd, buf, pos: pwrite(fd, buf[:300], pos))
+    try:
+        local = tmp_path / "sliced.bin"
+        source.download_to(local)
+        assert local.read_bytes() == data
+        copied = source.copy(tmp_path / "copied.bin")
+        assert copied.read_bytes() == data
+    finally:
+        source.unlink()
+
+
+def test_open_stream(gspath, monkeypatch):
+    """Test that open(stream=True) reads the blob with range requests"""
+    path = gspath / "test_open_stream.txt"
+    lines = [f"line {i}" for i in range(2000)]
+    path.write_text("\n".join(lines) + "\n")
+
+    client = gspath.client
+    monkeypatch.setattr(client, "stream_block_size", 1000)
+    monkeypatch.setattr(client, "stream_max_block_size", 4000)
+    try:
+        with path.open("rb", stream=True) as f:
+            assert f.seekable()
+            assert f.read(6) == b"line 0"
+            f.seek(-10, 2)
+            assert f.read() == b"line 1999\n"
+            f.seek(0)
+            assert list(f.iter_lines()) == [line.encode() for line in lines]
+            f.seek(0)
+            assert b"".join(f.iter_chunks()) == path.read_bytes()
+
+        with path.open("r", stream=True) as f:
+            assert f.read().splitlines() == lines
+    finally:
+        path.unlink()
+
+    with pytest.raises(FileNotFoundError):
+        path.open("rb", stream=True)
+
+
+def test_open_stream_read_across_blocks(gspath):
+    """Test that a read crossing a block boundary is not short"""
+    from yunpath.stream import GSRangeReader
+
+    path = gspath / "test_open_stream_read_across_blocks.bin"
+    data = bytes(range(100))
+    path.write_bytes(data)
+    blob = path.client.client.bucket(path.bucket).get_blob(path.blob)
+
+    reader = GSRangeReader(blob, block_size=10, max_block_size=10, readahead=False)
+    reader.seek(8)
+    assert reader.read(4) == data[8:12]
+    assert reader.read(25) == data[12:37]
+    buffer = bytearray(80)
+    assert reader.readinto(buffer) == 63
+    assert bytes(buffer[:63]) == data[37:]
+    assert reader.read(4) == b""
+    reader.close()
+    path.unlink()
+
+
+def test_open_stream_write(gspath):
+    """Test that open(stream=True) uploads straight to GCS on close"""
+    path = gspath / "test_open_stream_write.txt"
+    with path.open("w", stream=True) as f:
+        f.write("hello\n")
+        f.write("world\n")
+    assert path.read_text() == "hello\nworld\n"
+
+    # an error in the with block leaves the blob untouched
+    with pytest.raises(RuntimeError):
+        with path.open("wb", stream=True) as f:
+            f.write(b"partial")
+            raise RuntimeError("abort")
+    assert path.read_text() == "hello\nworld\n"
+
+    with pytest.raises(FileExistsError):
+        path.open("x", stream=True)
+
+    path.unlink()
+
+
+def test_scandir(gspath):
+    """Test that scandir entries answer types and stats from the listing"""
+    folder = gspath / "test_scandir"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "file.txt").write_text("hello")
+    (folder / "link").symlink_to(folder / "file.txt")
+
+    calls, patcher = _count_get_blob(gspath.client)
+    with patcher:
+        with folder.scandir() as it:
+            entries = {entry.name: entry for entry in it}
+        assert sorted(entries) == ["file.txt", "link", "sub"]
+        assert entries["sub"].is_dir()
+        assert not entries["sub"].is_file()
+        assert entries["file.txt"].is_file()
+        assert entries["file.txt"].stat().st_size == 5
+        assert entries["file.txt"].stat().st_mtime > 0
+        assert entries["link"].is_symlink()
+        assert entries["link"].is_file(follow_symlinks=False)
+        assert not entries["file.txt"].is_symlink()
+        assert entries["file.txt"].cloud_path == folder / "file.txt"
+    # only the directory itself is checked for a symlink, not the entries
+    assert calls == [folder.blob]
+
+    walked = list(folder.walk())
+    assert walked == [
+        (folder, ["sub"], ["file.txt", "link"]),
+        (folder / "sub", [], []),
+    ]
+    assert list(folder.walk(top_down=False))[-1][0] == folder
+    folder.rmtree()
+
+
+def test_walk_flat(gspath):
+    """Test that walk lists the whole tree once, placeholders included"""
+    from unittest import mock
+
+    folder = gspath / "test_walk_flat"
+    (folder / "a" / "empty").mkdir(parents=True)
+    (folder / "a" / "b").mkdir()
+    (folder / "a" / "b" / "f1.txt").write_text("1")
+    (folder / "a" / "f2.txt").write_text("2")
+    (folder / "f3.txt").write_text("3")
+
+    def normalize(walked):
+        return [
+            (str(dirpath).rstrip("/"), sorted(dirnames), sorted(filenames))
+            for dirpath, dirnames, filenames in walked
+        ]
+
+    for top_down in (True, False):
+        assert normalize(folder.walk(top_down=top_down)) == normalize(
+            folder.walk(top_down=top_down, lazy=True)
+        )
+
+    walked = normalize(folder.walk())
+    assert walked[0] == (str(folder), ["a"], ["f3.txt"])
+    assert (str(folder / "a" / "empty"), [], []) in walked
+    assert normalize(folder.walk(top_down=False))[-1][0] == str(folder)
+
+    # pruning in place skips the subtree
+    pruned = []
+    for dirpath, dirnames, _ in folder.walk():
+        pruned.append(dirpath.name)
+        dirnames[:] = [name for name in dirnames if name != "b"]
+    assert "b" not in pruned
+
+    # a single listing, no more calls
+    bucket = gspath.client.client.bucket(folder.bucket)
+    with mock.patch.object(
+        type(bucket), "list_blobs", autospec=True, side_effect=type(bucket).list_blobs
+    ) as list_blobs:
+        list(folder.walk())
+    assert list_blobs.call_count == 1
+
+    errors = []
+    with mock.patch.object(
+        type(bucket), "list_blobs", side_effect=RuntimeError("boom")
+    ):
+        assert list(folder.walk(on_error=errors.append)) == []
+    assert len(errors) == 1
+    folder.rmtree()
+
+
+def test_sharded_listing(gspath, monkeypatch):
+    """Test that listings split in key ranges give the same results"""
+    folder = gspath / "test_sharded_listing"
+    (folder / "sub").mkdir(parents=True)
+    names = [f"{c}{i}.txt" for c in "abcxyz" for i in range(5)]
+    for name in names:
+        (folder / name).write_text(name)
+    (folder / "sub" / "f.txt").write_text("f")
+
+    client = gspath.client
+    expected = sorted(
+        blob.name
+        for blob in client.client.bucket(folder.bucket).list_blobs(
+            prefix=folder.blob + "/"
+        )
+    )
+    assert [b.name for b in client.list_blobs(folder, shards=4)] == expected
+    assert [b.name for b in client.list_blobs(folder, hints=["b", "y"])] == expected
+    assert sorted(
+        b.name for b in client.list_blobs(folder, shards=8, ordered=False)
+    ) == expected
+
+    # stopping early does not hang
+    listed = client.list_blobs(folder, shards=4, max_workers=2)
+    next(listed)
+    listed.close()
+
+    before = sorted(map(str, folder.iterdir()))
+    walked = list(folder.walk())
+
+    bucket = client.client.bucket(folder.bucket)
+    list_blobs = type(bucket).list_blobs
+    calls = []
+    page_size = None
+
+    def _list_blobs(self, *args, **kwargs):
+        calls.append(kwargs)
+        return list_blobs(self, *args, page_size=page_size, **kwargs)
+
+    monkeypatch.setattr(type(bucket), "list_blobs", _list_blobs)
+    monkeypatch.setattr(client, "list_shards", 4)
+    # a directory listed in a single page is not sharded
+    assert sorted(map(str, folder.iterdir())) == before
+    assert len(calls) == 1
+
+    page_size = 10
+    calls.clear()
+    assert sorted(map(str, folder.iterdir())) == before
+    assert any("end_offset" in kwargs for kwargs in calls)
+    assert list(folder.walk()) == walked
+    assert len(before) == len(names) + 1
+    folder.rmtree()
+
+
+def test_glob_pushdown(gspath):
+    """Test that glob narrows the listing down server-side, with the same
+    results as the client-side glob"""
+    from unittest import mock
+    from cloudpathlib import CloudPath
+
+    folder = gspath / "test_glob_pushdown"
+    for name in (
+        "2026-01/part-0.parquet",
+        "2026-01/part-1.parquet",
+        "2026-01/other.txt",
+        "2026-02/part-0.parquet",
+        "2025-12/part-0.parquet",
+        "2026-03/nested/part-0.parquet",
+        "top.txt",
+        "sub/deep/file.txt",
+        "a,b/c.txt",
+        "run,v2/x/part-0.parquet",
+    ):
+        (folder / name).parent.mkdir(parents=True, exist_ok=True)
+        (folder / name).write_text(name)
+    (folder / "2026-04").mkdir()
+
+    def names(paths):
+        return sorted(str(p.relative_to(folder)).rstrip("/") for p in paths)
+
+    for method, pattern in [
+        ("glob", "2026-*/part-*.parquet"),
+        ("glob", "2026-*"),
+        ("glob", "*.txt"),
+        ("glob", "*/*"),
+        ("glob", "**/*.txt"),
+        ("glob", "sub/**"),
+        ("glob", "**"),
+        ("glob", "**/"),
+        ("glob", "202[56]-0?/part-[!1].parquet"),
+        ("rglob", "*.parquet"),
+        ("rglob", "deep"),
+        ("glob", "a,b/*.txt"),
+    ]:
+        expected = names(getattr(CloudPath, method)(folder, pattern))
+        assert names(getattr(folder, method)(pattern)) == expected, pattern
+
+    # a comma in the directory globbed
+    run = folder / "run,v2"
+    assert names(run.glob("x/*.parquet")) == names(
+        CloudPath.glob(run, "x/*.parquet")
+    )
+    assert names(run.glob("x/*.parquet")) == ["run,v2/x/part-0.parquet"]
+    assert names(folder.glob("a,b/*.txt")) == ["a,b/c.txt"]
+
+    assert names(folder.glob("2026-*/part-*.parquet")) == [
+        "2026-01/part-0.parquet",
+        "2026-01/part-1.parquet",
+        "2026-02/part-0.parquet",
+    ]
+
+    bucket = gspath.client.client.bucket(folder.bucket)
+    with mock.patch.object(
+        type(bucket), "list_blobs", autospec=True, side_effect=type(bucket).list_blobs
+    ) as list_blobs:
+        list(folder.glob("2026-*/part-*.parquet"))
+    kwargs = list_blobs.call_args.kwargs
+    assert kwargs["prefix"] == folder.blob + "/2026-"
+    assert kwargs["match_glob"].startswith("{")
+    folder.rmtree()
+
+
+def test_mkdir_parents_probes(gspath):
+    """Test that mkdir(parents=True) probes the ancestors at once"""
+    folder = gspath / "test_mkdir_parents_probes"
+    deep = folder / "a" / "b" / "c" / "d"
+
+    calls, patcher = _count_get_blob(gspath.client)
+    with patcher:
+        deep.mkdir(parents=True)
+    # only the shallowest missing level is fetched
+    assert calls == [folder.blob]
+    for path in (folder, folder / "a", folder / "a" / "b", deep):
+        assert path.is_dir()
+
+    deep.mkdir(parents=True, exist_ok=True)
+    with pytest.raises(FileExistsError):
+        deep.mkdir(parents=True)
+    from cloudpathlib.exceptions import CloudPathNotExistsError
+
+    with pytest.raises(CloudPathNotExistsError):
+        (folder / "x" / "y").mkdir()
+
+    (folder / "file").write_text("x")
+    with pytest.raises(FileExistsError):
+        (folder / "file").mkdir()
+
+    folder.rmtree()
+
+
+def test_metadata_store(tmp_path, gspath):
+    """Test that clients sharing a metadata store share the fetched metadata"""
+    from yunpath import GSClient
+
+    folder = gspath / "test_metadata_store"
+    (folder / "sub").mkdir(parents=True)
+    (folder / "file.txt").write_text("hello")
+
+    clients = [
+        GSClient(
+            storage_client=gspath.client.client,
+            metadata_store=tmp_path / "meta.db",
+        )
+        for _ in range(2)
+    ]
+    first, second = (GSPath(str(folder), client=client) for client in clients)
+    assert (first / "file.txt").stat().st_size == 5
+    assert (first / "file.txt").exists()
+    assert (first / "sub").is_dir()
+
+    calls, patcher = _count_get_blob(clients[1])
+    with patcher:
+        assert (second / "file.txt").stat().st_size == 5
+        assert (second / "file.txt").exists()
+        assert (second / "sub").is_dir()
+    assert calls == []
+
+    # writes through either client are seen by the other
+    (first / "file.txt").write_text("hello world")
+    assert (second / "file.txt").stat().st_size == 11
+    (first / "file.txt").unlink()
+    assert not (second / "file.txt").exists()
+
+    folder.rmtree()
+
+
+def test_metrics(gspath):
+    """Test that the operations and the requests behind them are counted"""
+    from yunpath import GSClient
+
+    folder = gspath / "test_metrics"
+    (folder / "file.txt").write_text("hello")
+
+    events = []
+    client = GSClient(storage_client=gspath.client.client, metrics=True)
+    client.metrics.hook = events.append
+    path = GSPath(str(folder / "file.txt"), client=client)
+
+    assert path.exists(follow_symlinks=False)
+    snapshot = client.metrics.snapshot()
+    # only the outermost operation, and the blob and its placeholder fetched
+    assert list(snapshot["operations"]) == ["exists"]
+    assert snapshot["operations"]["exists"]["count"] == 1
+    assert snapshot["rpcs"]["objects.get"]["count"] == 2
+    assert snapshot["rpc_count"] == 2
+    assert [e.kind for e in events] == ["rpc", "rpc", "operation"]
+
+    client.metrics.reset()
+    assert path.read_text() == "hello"
+    assert len(list(path.parent.iterdir())) == 1
+    snapshot = client.metrics.snapshot()
+    assert snapshot["operations"]["read_text"]["count"] == 1
+    assert snapshot["operations"]["iterdir"]["count"] == 1
+    assert snapshot["rpcs"]["objects.list"]["count"] >= 1
+    assert snapshot["bytes_received"] >= 5
+
+    folder.rmtree()
@@ -0,0 +1,242 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+from yunpath import GSClient
+from yunpath.filecache import LocalCacheManager
+from .conftest import uid  # noqa: F401
+
+
+def _file(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    return None if request.param == "memory" else tmp_path / "index.db"
+
+
+def test_lru_eviction(tmp_path, index):
+    """Test that the least recently used files are removed over the cap"""
+    manager = LocalCacheManager(250, index=index, min_age=0)
+    a, b, c = (_file(tmp_path / "cache" / name, 100) for name in "abc")
+    manager.access(a, hit=False)
+    manager.access(b, hit=False)
+    manager.access(a, hit=True)
+    manager.access(c, hit=False)
+
+    assert a.exists() and not b.exists() and c.exists()
+    stats = manager.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["evicted_bytes"] == 100
+    assert stats["files"] == 2
+    assert stats["bytes"] == 200
+
+
+def test_lfu_eviction(tmp_path, index):
+    """Test that the least frequently used files are removed first"""
+    manager = LocalCacheManager(250, policy="lfu", index=index, min_age=0)
+    a, b, c = (_file(tmp_path / "cache" / name, 100) for name in "abc")
+    manager.access(a, hit=False)
+    manager.access(a, hit=True)
+    manager.access(b, hit=False)
+    manager.access(b, hit=True)
+    manager.access(a, hit=True)
+    manager.access(c, hit=False)
+
+    # c was just read, b is used less than a
+    assert a.exists() and not b.exists() and c.exists()
+
+
+def test_min_age_and_keep(tmp_path, index):
+    """Test that the recently used files and the one read are kept"""
+    manager = LocalCacheManager(50, index=index, min_age=60)
+    a, b = (_file(tmp_path / "cache" / name, 100) for name in "ab")
+    manager.access(a, hit=False)
+    manager.access(b, hit=False)
+    assert a.exists() and b.exists()
+
+    manager.min_age = 0
+    assert manager.evict(keep=[b]) == 100
+    assert not a.exists() and b.exists()
+
+    with pytest.raises(ValueError):
+        LocalCacheManager(1, policy="fifo")
+
+
+def test_scan(tmp_path, index):
+    """Test that the files already cached are picked up, not the index"""
+    cache = tmp_path / "cache"
+    _file(cache / "bucket" / "a", 10)
+    _file(cache / "bucket" / "dir" / "b", 20)
+    index = index and cache / "index.db"
+    manager = LocalCacheManager(1000, index=index)
+    manager.scan(cache)
+    manager.scan(cache / "nothing")
+    assert manager.stats()["files"] == 2
+    assert manager.stats()["bytes"] == 30
+
+
+def _access(index, path):
+    manager = LocalCacheManager(150, index=index, min_age=0)
+    manager.access(path, hit=False)
+
+
+def test_shared_index(tmp_path):
+    """Test that processes sharing an index evict each other's files"""
+    index = tmp_path / "index.db"
+    a, b = (_file(tmp_path / "cache" / name, 100) for name in "ab")
+    manager = LocalCacheManager(150, index=index, min_age=0)
+    manager.access(a, hit=False)
+    time.sleep(0.01)
+
+    process = multiprocessing.get_context("spawn").Process(
+        target=_access, args=(index, b)
+    )
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert not a.exists() and b.exists()
+    assert manager.stats()["files"] == 1
+
+
+def test_client_local_cache(tmp_path, gspath):
+    """Test that the reads through the local cache stay under its cap"""
+    root = gspath / "test_client_local_cache"
+    for name in "abc":
+        (root / f"{name}.txt").write_text(name * 100)
+
+    client = GSClient(
+        storage_client=gspath.client.client,
+        local_cache_dir=tmp_path / "cache",
+        local_cache=LocalCacheManager(250, min_age=0),
+    )
+    paths = [client.CloudPath(f"{root}/{name}.txt") for name in "abc"]
+    assert paths[0].read_text() == "a" * 100
+    assert paths[1].read_bytes() == b"b" * 100
+    assert paths[0].read_text() == "a" * 100
+    with paths[2].open() as fh:
+        assert fh.read() == "c" * 100
+
+    stats = client.local_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 1)
+    assert stats["bytes"] <= 250
+    assert not paths[1]._local.exists()
+    assert paths[0]._local.exists()
+
+    # a new client picks up the cached files
+    client = GSClient(
+        storage_client=gspath.client.client,
+        local_cache_dir=tmp_path / "cache",
+        local_cache=1000,
+    )
+    assert client.local_cache.stats()["files"] == 2
+    client.clear_cache()
+    assert client.local_cache.stats()["files"] == 0
+    assert not os.listdir(tmp_path / "cache")
+
+    root.rmtree()
+
+
+def test_pinned_files_are_kept(tmp_path):
+    """Test that the files with an open map are not evicted"""
+    import mmap
+
+    manager = LocalCacheManager(50, min_age=0)
+    a, b = (_file(tmp_path / "cache" / name, 100) for name in "ab")
+    with open(a, "rb") as fh:
+        mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    manager.pin(a, mapped)
+    manager.access(a, hit=False)
+    manager.access(b, hit=False)
+    assert a.exists() and b.exists()
+    assert manager.pinned() == {str(a)}
+
+    mapped.close()
+    assert manager.pinned() == set()
+    manager.access(b, hit=True)
+    assert not a.exists()
+
+
+def test_mmap(tmp_path, gspath):
+    """Test that mmap and read_buffer map the cached file"""
+    path = gspath / "test_mmap" / "data.bin"
+    path.write_bytes(bytes(range(256)))
+    client = GSClient(
+        storage_client=gspath.client.client,
+        local_cache_dir=tmp_path / "cache",
+        local_cache=LocalCacheManager(100, min_age=0),
+    )
+    path = client.CloudPath(str(path))
+
+    mapped = path.mmap()
+    assert mapped[:4] == b"\x00\x01\x02\x03"
+    assert len(mapped) == 256
+    with pytest.raises(TypeError):
+        mapped[0] = 1
+    assert client.local_cache.pinned() == {str(path._local)}
+
+    # the map keeps its content when a newer version replaces the file
+    path.write_bytes(b"new")
+    time.sleep(0.01)
+    buffer = path.read_buffer()
+    assert bytes(buffer) == b"new"
+    assert mapped[:4] == b"\x00\x01\x02\x03"
+    mapped.close()
+    buffer.release()
+    assert client.local_cache.pinned() == set()
+
+    np = pytest.importorskip("numpy")
+    array = np.frombuffer(path.read_buffer(), dtype=np.uint8)
+    assert array.tolist() == list(b"new")
+
+    empty = path.parent / "empty.bin"
+    empty.write_bytes(b"")
+    assert path.parent.joinpath("empty.bin").read_buffer() == b""
+    with pytest.raises(ValueError):
+        empty.mmap()
+
+    from cloudpathlib.exceptions import CloudPathFileNotFoundError
+
+    with pytest.raises(CloudPathFileNotFoundError):
+        (path.parent / "nothing").read_buffer()
+
+    path.parent.rmtree()
+
+
+def test_writes_replace_mapped_files_only(tmp_path, gspath):
+    """Test that the cached file is written in place unless it is mapped"""
+    path = gspath / "test_writes_replace_mapped_files_only.bin"
+    path.write_bytes(b"abc")
+    client = GSClient(
+        storage_client=gspath.client.client, local_cache_dir=tmp_path / "cache"
+    )
+    path = client.CloudPath(str(path))
+    assert path.read_bytes() == b"abc"
+
+    inode = path._local.stat().st_ino
+    with path.open("ab") as fh:
+        fh.write(b"d")
+    assert path._local.stat().st_ino == inode
+
+    mapped = path.mmap()
+    with path.open("ab") as fh:
+        fh.write(b"e")
+    assert path._local.stat().st_ino != inode
+    assert mapped[:] == b"abcd"
+    assert path.read_bytes() == b"abcde"
+
+    # not once the map is closed
+    mapped.close()
+    inode = path._local.stat().st_ino
+    with path.open("r+b") as fh:
+        fh.write(b"A")
+    assert path._local.stat().st_ino == inode
+    assert path.read_bytes() == b"Abcde"
+
+    path.unlink()
@@ -0,0 +1,102 @@
+import multiprocessing
+import time
+
+from yunpath.metastore import MISSING, MetadataStore
+
+
+def test_metastore_get_set(tmp_path):
+    store = MetadataStore(tmp_path / "meta.db")
+    assert store.get("bkt", "a") is MISSING
+    store.set("bkt", "a", {"name": "a", "size": "1"}, generation=1)
+    store.set("bkt", "b", None)
+    assert store.get("bkt", "a") == {"name": "a", "size": "1"}
+    assert store.get("bkt", "b") is None
+    assert store.get("other", "a") is MISSING
+    assert len(store) == 2
+
+    store.set_dir("bkt", "d/", True)
+    assert store.get_dir("bkt", "d/") is True
+    assert store.get_dir("bkt", "e/") is MISSING
+
+
+def test_metastore_generation(tmp_path):
+    """Test that an entry is not replaced by the one of an older generation"""
+    store = MetadataStore(tmp_path / "meta.db")
+    store.set("bkt", "a", {"generation": "2"}, generation=2)
+    store.set("bkt", "a", {"generation": "1"}, generation=1)
+    assert store.get("bkt", "a") == {"generation": "2"}
+    store.set("bkt", "a", {"generation": "3"}, generation=3)
+    assert store.get("bkt", "a") == {"generation": "3"}
+
+
+def test_metastore_stale_missing(tmp_path):
+    """Test that a blob read as missing before a write does not replace it"""
+    store = MetadataStore(tmp_path / "meta.db", ttl=0.2)
+    # a reader finds nothing, meanwhile a writer records the new blob
+    store.invalidate("bkt", "a")
+    store.set("bkt", "a", {"generation": "1"}, generation=1)
+    store.set("bkt", "a", None)
+    assert store.get("bkt", "a") == {"generation": "1"}
+
+    # a missing blob is replaced by a written one, and an expired one by
+    # what is read after
+    store.set("bkt", "b", None)
+    store.set("bkt", "b", {"generation": "1"}, generation=1)
+    assert store.get("bkt", "b") == {"generation": "1"}
+    time.sleep(0.3)
+    store.set("bkt", "a", None)
+    assert store.get("bkt", "a") is None
+
+
+def test_metastore_invalidate(tmp_path):
+    store = MetadataStore(tmp_path / "meta.db")
+    for name in ("a/b/c", "a/b/", "a/bc", "a/b/d/e"):
+        store.set("bkt", name, {"name": name})
+    for prefix in ("a/", "a/b/", "a/b/d/", "x/"):
+        store.set_dir("bkt", prefix, True)
+
+    store.invalidate("bkt", "a/b/c")
+    assert store.get("bkt", "a/b/c") is MISSING
+    assert store.get("bkt", "a/b/") is not MISSING
+    # the parents may not exist anymore
+    assert store.get_dir("bkt", "a/") is MISSING
+    assert store.get_dir("bkt", "a/b/") is MISSING
+    assert store.get_dir("bkt", "a/b/d/") is True
+
+    store.invalidate("bkt", "a/b", recursive=True)
+    assert store.get("bkt", "a/b/") is MISSING
+    assert store.get("bkt", "a/b/d/e") is MISSING
+    assert store.get_dir("bkt", "a/b/d/") is MISSING
+    assert store.get("bkt", "a/bc") == {"name": "a/bc"}
+    assert store.get_dir("bkt", "x/") is True
+
+
+def test_metastore_expire_and_evict(tmp_path):
+    store = MetadataStore(tmp_path / "meta.db", ttl=0.05, maxsize=3, evict_every=1)
+    store.set("bkt", "a", None)
+    time.sleep(0.1)
+    assert store.get("bkt", "a") is MISSING
+
+    store.ttl = 60
+    for i in range(5):
+        store.set("bkt", str(i), None)
+    assert len(store) == 3
+    # the ones expiring first are evicted
+    assert store.get("bkt", "0") is MISSING
+    assert store.get("bkt", "4") is None
+
+
+def _set_in_process(path):
+    MetadataStore(path).set("bkt", "a", {"name": "a"}, generation=1)
+
+
+def test_metastore_across_processes(tmp_path):
+    store = MetadataStore(tmp_path / "meta.db")
+    assert store.get("bkt", "a") is MISSING
+
+    ctx = multiprocessing.get_context("spawn")
+    process = ctx.Process(target=_set_in_process, args=(tmp_path / "meta.db",))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert store.get("bkt", "a") == {"name": "a"}
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+import requests
+
+from yunpath.metrics import Histogram, MetricEvent, Metrics, rpc_name
+
+
+class _Adapter(requests.adapters.BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 404 if request.method == "DELETE" else 200
+        response.headers["Content-Length"] = "5"
+        response.raw = io.BytesIO(b"hello")
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+API = "https://storage.googleapis.com"
+
+
+@pytest.mark.parametrize(
+    "method,path,name",
+    [
+        ("GET", "/storage/v1/b/bkt/o/a%2Fb", "objects.get"),
+        ("GET", "/storage/v1/b/bkt/o?prefix=a", "objects.list"),
+        ("DELETE", "/storage/v1/b/bkt/o/a", "objects.delete"),
+        ("PATCH", "/storage/v1/b/bkt/o/a", "objects.patch"),
+        ("POST", "/storage/v1/b/bkt/o/a/rewriteTo/b/bkt/o/b", "objects.rewrite"),
+        ("POST", "/storage/v1/b/bkt/o/a/compose", "objects.compose"),
+        ("GET", "/download/storage/v1/b/bkt/o/a?alt=media", "objects.get_media"),
+        ("POST", "/upload/storage/v1/b/bkt/o?uploadType=multipart", "objects.insert"),
+        ("POST", "/batch/storage/v1", "batch"),
+        ("GET", "/storage/v1/b/bkt", "buckets.get"),
+        ("GET", "/storage/v1/b?project=p", "buckets.list"),
+    ],
+)
+def test_rpc_name(method, path, name):
+    assert rpc_name(method, API + path) == name
+
+
+def test_histogram():
+    hist = Histogram(bounds=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 2.0):
+        hist.observe(seconds)
+    assert hist.counts == [2, 1, 1]
+    assert hist.count == 4
+    assert hist.max == 2.0
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(0.99) == 2.0
+
+
+def test_metrics_record_snapshot_reset():
+    events = []
+    metrics = Metrics(hook=events.append)
+    metrics.record(MetricEvent("operation", "exists", 0.01))
+    metrics.record(MetricEvent("rpc", "objects.get", 0.02, True, 0, 10))
+    metrics.record(MetricEvent("rpc", "objects.get", 0.03, False, 0, 20))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["operations"]["exists"]["count"] == 1
+    assert snapshot["rpcs"]["objects.get"]["count"] == 2
+    assert snapshot["rpcs"]["objects.get"]["errors"] == 1
+    assert snapshot["rpcs"]["objects.get"]["latency"]["count"] == 2
+    assert snapshot["rpc_count"] == 2
+    assert snapshot["bytes_received"] == 30
+    assert len(events) == 3
+
+    metrics.reset()
+    assert metrics.snapshot()["rpcs"] == {}
+    # a copy
+    assert snapshot["rpc_count"] == 2
+
+
+def test_metrics_instrument():
+    session = requests.Session()
+    session.mount("https://", _Adapter())
+    metrics = Metrics()
+    assert metrics.instrument(session)
+    assert not metrics.instrument(object())
+
+    session.request(
+        "POST",
+        f"{API}/upload/storage/v1/b/bkt/o",
+        data=b"abc",
+    )
+    session.request(
+        method="DELETE", url=f"{API}/storage/v1/b/bkt/o/a"
+    )
+
+    # a second Metrics on the same session sees the requests too
+    other = Metrics()
+    assert other.instrument(session)
+    session.get(f"{API}/storage/v1/b/bkt/o/a")
+
+    rpcs = metrics.snapshot()["rpcs"]
+    assert rpcs["objects.insert"]["bytes_sent"] == 3
+    assert rpcs["objects.insert"]["bytes_received"] == 5
+    assert rpcs["objects.delete"]["errors"] == 1
+    assert rpcs["objects.get"]["count"] == 1
+    assert other.snapshot()["rpc_count"] == 1
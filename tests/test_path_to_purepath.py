@@ -140,3 +140,38 @@ def test_copytree_to_clouddir(tmp_path, gspath):
     assert (destination_dir / "subdir").exists()
     assert (destination_dir / "subdir").is_dir()
     assert (destination_dir / "subdir" / "file2").exists()
+
+
+def test_copytree_parallel(tmp_path):
+    test_dir = AnyPath(tmp_path) / "test_dir"
+    (test_dir / "subdir" / "empty").mkdir(parents=True)
+    for i in range(10):
+        (test_dir / f"file{i}").write_text(str(i))
+        (test_dir / "subdir" / f"file{i}").write_text(str(i))
+    destination_dir = AnyPath(tmp_path) / "destination_dir"
+
+    progressed = []
+    test_dir.copytree(
+        destination_dir,
+        max_workers=4,
+        progress=lambda src, done, total: progressed.append((done, total)),
+    )
+    assert (destination_dir / "subdir" / "empty").is_dir()
+    for i in range(10):
+        assert (destination_dir / f"file{i}").read_text() == str(i)
+        assert (destination_dir / "subdir" / f"file{i}").read_text() == str(i)
+    assert progressed == [(i, 20) for i in range(1, 21)]
+
+
+def test_copytree_parallel_error(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    test_dir = AnyPath(tmp_path) / "test_dir"
+    test_dir.mkdir()
+    # a broken symlink cannot be copied
+    (test_dir / "file1").symlink_to(test_dir / "nonexistent")
+    (test_dir / "file2").touch()
+    destination_dir = AnyPath(tmp_path) / "destination_dir"
+
+    with ThreadPoolExecutor(2) as executor, pytest.raises(ValueError):
+        test_dir.copytree(destination_dir, executor=executor)
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+from yunpath.cli import main
+from yunpath.sync import Manifest, sync
+from .conftest import uid  # noqa: F401
+
+
+def _tree(root, files):
+    for rel, content in files.items():
+        path = root.joinpath(*rel.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def test_sync_local_to_gs(tmp_path, gspath):
+    """Test that sync() copies only the files that changed"""
+    src = tmp_path / "src"
+    _tree(src, {"a.txt": "a", "b/c.txt": "c", "b/d/e.txt": "e"})
+    dst = gspath / "test_sync_local_to_gs"
+    manifest = tmp_path / "manifest.json"
+
+    result = sync(src, dst, manifest=manifest)
+    assert result.copied == ["a.txt", "b/c.txt", "b/d/e.txt"]
+    assert result.unchanged == 0
+    assert (dst / "b" / "d" / "e.txt").read_text() == "e"
+    assert manifest.is_file()
+
+    # nothing changed
+    result = sync(src, dst, manifest=manifest)
+    assert result.copied == []
+    assert result.unchanged == 3
+
+    # same size, different content
+    (src / "a.txt").write_text("x")
+    (src / "b" / "f.txt").write_text("f")
+    result = sync(src, dst, manifest=manifest)
+    assert result.copied == ["a.txt", "b/f.txt"]
+    assert (dst / "a.txt").read_text() == "x"
+
+    # extraneous files, only reported with dry_run
+    (src / "b" / "c.txt").unlink()
+    result = sync(src, dst, delete=True, dry_run=True)
+    assert result.deleted == ["b/c.txt"]
+    assert (dst / "b" / "c.txt").exists()
+
+    result = sync(src, dst, delete=True, manifest=manifest)
+    assert result.deleted == ["b/c.txt"]
+    assert not (dst / "b" / "c.txt").exists()
+    assert result.unchanged == 3
+
+    dst.rmtree()
+
+
+def test_sync_gs_to_local(tmp_path, gspath):
+    """Test that sync() downloads the changed blobs, reusing the manifest"""
+    src = gspath / "test_sync_gs_to_local"
+    _tree(src, {"a.txt": "a", "b/c.txt": "c"})
+    dst = tmp_path / "dst"
+    manifest = Manifest(tmp_path / "manifest.json")
+
+    result = sync(src, dst, checksum="md5", manifest=manifest)
+    assert result.copied == ["a.txt", "b/c.txt"]
+    assert (dst / "b" / "c.txt").read_text() == "c"
+
+    (dst / "extra.txt").write_text("extra")
+    result = sync(src, dst, checksum="md5", manifest=manifest, delete=True)
+    assert result.copied == []
+    assert result.deleted == ["extra.txt"]
+    assert result.unchanged == 2
+    assert not (dst / "extra.txt").exists()
+
+    src.rmtree()
+
+
+def test_sync_cli(tmp_path, capsys):
+    """Test the `yunpath sync` command"""
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    _tree(src, {"a.txt": "a", "b/c.txt": "c"})
+
+    assert main(["sync", os.fspath(src), os.fspath(dst), "--dry-run"]) == 0
+    out, err = capsys.readouterr()
+    assert "copy: a.txt" in out
+    assert "2 copied, 0 deleted, 0 unchanged (dry run)" in err
+    assert not dst.exists()
+
+    assert main(["sync", os.fspath(src), os.fspath(dst), "-q"]) == 0
+    out, err = capsys.readouterr()
+    assert out == ""
+    assert (dst / "b" / "c.txt").read_text() == "c"
+
+    assert main(["sync", os.fspath(src), os.fspath(dst)]) == 0
+    assert "0 copied, 0 deleted, 2 unchanged" in capsys.readouterr().err
+
+
+def test_sync_missing_source(tmp_path, gspath, capsys):
+    """Test that a missing source does not empty the destination"""
+    dst = tmp_path / "dst"
+    _tree(dst, {"keep.txt": "k"})
+    _tree(tmp_path, {"file.txt": "f"})
+
+    with pytest.raises(FileNotFoundError):
+        sync(tmp_path / "does-not-exist", dst, delete=True)
+    with pytest.raises(NotADirectoryError):
+        sync(tmp_path / "file.txt", dst, delete=True)
+    with pytest.raises(FileNotFoundError):
+        sync(gspath / "test_sync_missing_source", dst, delete=True)
+    assert (dst / "keep.txt").read_text() == "k"
+
+    missing = os.fspath(tmp_path / "typo")
+    assert main(["sync", missing, os.fspath(dst), "--delete"]) == 1
+    assert "No such source directory" in capsys.readouterr().err
+    assert (dst / "keep.txt").read_text() == "k"
@@ -0,0 +1,111 @@
+import base64
+
+import pytest
+from yunpath.table import FIELDS, listing_fields
+from .conftest import uid  # noqa: F401
+
+
+def _tree(root):
+    (root / "a.txt").write_text("a")
+    (root / "b" / "c.txt").write_text("cc")
+    (root / "b" / "d" / "e.txt").write_text("eee")
+    (root / "b" / "d").mkdir(exist_ok=True)
+    (root / "link").symlink_to(root / "a.txt")
+
+
+def test_listing_fields():
+    """Test that only the properties needed are requested"""
+    assert listing_fields(["size"]) == "items(name,size),prefixes,nextPageToken"
+    assert "metadata" in listing_fields(FIELDS)
+
+
+def test_list_table_dict(gspath):
+    """Test that list_table lists the files into columns"""
+    root = gspath / "test_list_table_dict"
+    _tree(root)
+
+    table = root.list_table(format="dict")
+    assert table["name"] == ["a.txt", "b/c.txt", "b/d/e.txt", "link"]
+    assert table["size"] == [1, 2, 3, 0]
+    assert table["is_symlink"] == [False, False, False, True]
+    assert all(generation for generation in table["generation"])
+    assert all(updated.tzinfo is not None for updated in table["updated"])
+    stat = (root / "b" / "c.txt").stat()
+    assert table["updated"][1].timestamp() == stat.st_mtime
+
+    blob = (root / "a.txt").client.client.bucket(root.bucket).get_blob(
+        (root / "a.txt").blob
+    )
+    crc = int.from_bytes(base64.b64decode(blob.crc32c), "big")
+    assert table["crc32c"][0] == crc
+
+    table = root.list_table(recursive=False, fields=["name"], format="dict")
+    assert table == {"name": ["a.txt", "link"]}
+
+    root.rmtree()
+
+
+def test_iter_table_chunks(gspath):
+    """Test that iter_table yields chunks of at most chunk_size rows"""
+    root = gspath / "test_iter_table_chunks"
+    _tree(root)
+
+    chunks = list(root.iter_table(fields=["name", "size"], format="dict", chunk_size=3))
+    assert [len(chunk["name"]) for chunk in chunks] == [3, 1]
+    assert chunks[1] == {"name": ["link"], "size": [0]}
+
+    with pytest.raises(ValueError):
+        root.iter_table(fields=["nope"])
+    with pytest.raises(ValueError):
+        root.iter_table(format="csv")
+
+    root.rmtree()
+
+
+def test_list_table_numpy(gspath):
+    """Test that list_table builds a NumPy structured array"""
+    np = pytest.importorskip("numpy")
+    root = gspath / "test_list_table_numpy"
+    _tree(root)
+
+    table = root.list_table(format="numpy")
+    assert table.dtype.names == FIELDS
+    assert list(table["name"]) == ["a.txt", "b/c.txt", "b/d/e.txt", "link"]
+    assert table["size"].sum() == 6
+    assert list(table[table["size"] > 1]["name"]) == ["b/c.txt", "b/d/e.txt"]
+    assert table["is_symlink"].sum() == 1
+    assert table["updated"].dtype == np.dtype("datetime64[us]")
+
+    # the chunks have different name widths
+    chunks = list(root.iter_table(fields=["name"], chunk_size=1))
+    assert len(chunks) == 4
+    assert chunks[0].dtype == np.dtype([("name", "U5")])
+    assert list(np.concatenate(chunks)["name"]) == list(table["name"])
+
+    empty = (root / "nothing").list_table(fields=["name", "size"])
+    assert len(empty) == 0
+    assert empty.dtype.names == ("name", "size")
+
+    root.rmtree()
+
+
+def test_list_table_arrow(gspath):
+    """Test that list_table builds an Arrow table"""
+    pa = pytest.importorskip("pyarrow")
+    root = gspath / "test_list_table_arrow"
+    _tree(root)
+
+    table = root.list_table(format="arrow")
+    assert isinstance(table, pa.Table)
+    assert table.column_names == list(FIELDS)
+    assert table.num_rows == 4
+    assert table.column("size").to_pylist() == [1, 2, 3, 0]
+    assert str(table.schema.field("updated").type) == "timestamp[us, tz=UTC]"
+
+    batches = list(root.iter_table(format="arrow", chunk_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2]
+
+    empty = (root / "nothing").list_table(format="arrow")
+    assert empty.num_rows == 0
+
+    root.rmtree()
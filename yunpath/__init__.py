@@ -1,4 +1,5 @@
 import sys
+from importlib import import_module
 
 # FutureWarning: You are using a Python version (3.10.19) which Google will stop
 # supporting in new releases of google.api_core once it reaches its end of life
@@ -9,16 +10,30 @@ if sys.version_info < (3, 11):  # pragma: no cover
     import warnings
     warnings.filterwarnings("ignore", category=FutureWarning)
 
-from cloudpathlib.anypath import AnyPath
-from cloudpathlib.azure.azblobclient import AzureBlobClient
-from cloudpathlib.azure.azblobpath import AzureBlobPath
-from cloudpathlib.cloudpath import CloudPath, implementation_registry
-from cloudpathlib.s3.s3client import S3Client
-from cloudpathlib.s3.s3path import S3Path
-from .patch import GSPath, GSClient
+from . import purepath  # noqa: E402, F401
+
+# Loaded on first access: cloudpathlib imports the SDKs of all the providers
+# it supports, which short-lived processes should not pay for until they
+# touch a cloud path. The patched GSPath/GSClient are registered as soon as
+# cloudpathlib is imported, whoever imports it.
+_LAZY = {
+    "AnyPath": "cloudpathlib.anypath",
+    "AsyncGSClient": "yunpath.aio",
+    "AsyncGSPath": "yunpath.aio",
+    "AzureBlobClient": "cloudpathlib.azure.azblobclient",
+    "AzureBlobPath": "cloudpathlib.azure.azblobpath",
+    "CloudPath": "cloudpathlib.cloudpath",
+    "implementation_registry": "cloudpathlib.cloudpath",
+    "GSClient": "yunpath.patch",
+    "GSPath": "yunpath.patch",
+    "S3Client": "cloudpathlib.s3.s3client",
+    "S3Path": "cloudpathlib.s3.s3path",
+}
 
 __all__ = [
     "AnyPath",
+    "AsyncGSClient",
+    "AsyncGSPath",
     "AzureBlobClient",
     "AzureBlobPath",
     "CloudPath",
@@ -30,3 +45,51 @@ __all__ = [
 ]
 
 __version__ = "0.1.1"
+
+
+class _RegisterOnImport:
+    """Import `yunpath.patch` right after cloudpathlib is imported, so that
+    `cloudpathlib.CloudPath("gs://...")` gives the patched GSPath even when
+    no attribute of yunpath is accessed"""
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname != "cloudpathlib":
+            return None
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+        from importlib.util import find_spec
+
+        spec = find_spec(fullname)
+        if spec is None or spec.loader is None:  # pragma: no cover
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_register(module):
+            exec_module(module)
+            import_module("yunpath.patch")
+
+        spec.loader.exec_module = exec_and_register
+        return spec
+
+
+if "cloudpathlib" in sys.modules:
+    import_module("yunpath.patch")
+elif not any(isinstance(f, _RegisterOnImport) for f in sys.meta_path):
+    sys.meta_path.insert(0, _RegisterOnImport())
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # register the patched GSPath/GSClient before any path is created
+    import_module("yunpath.patch")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
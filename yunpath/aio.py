@@ -0,0 +1,703 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Iterator
+from urllib.parse import quote
+
+from cloudpathlib.cloudpath import CloudPath
+from cloudpathlib.exceptions import CloudPathNotExistsError, NoStatError
+
+from .direntry import blob_stat
+from .metastore import MISSING
+from .patch import _NOT_FETCHED, GSClient, GSPath, _build_tree, _walk_tree
+
+_DONE = object()
+
+_DEFAULT_ENDPOINT = "https://storage.googleapis.com"
+
+# the statuses worth retrying, as google-cloud-storage does
+_RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+async def _close_with_loop(session: Any) -> AsyncGenerator[None, None]:
+    """Close a session when its event loop shuts its async generators down,
+    which `asyncio.run()` does before closing the loop"""
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+class AsyncGSClient:
+    """An asyncio client for GCS paths, with the semantics of `GSClient`.
+
+    The metadata reads (`exists`, `is_dir`, `is_file`, `is_symlink`,
+    `readlink`, `stat`, `resolve`, `iterdir` and `walk` of `AsyncGSPath`)
+    are native asyncio: they are requests to the JSON API of GCS on a pooled
+    aiohttp session, authenticated with the credentials of the storage
+    client, so thousands of them can run concurrently on one event loop.
+    They share the symlink index and the symlink and metadata caches of the
+    `GSClient`, and keep its gcsfuse symlink and directory placeholder
+    semantics.
+
+    The other calls (reads, writes, copies, `mkdir`, `glob`, ...) run the
+    blocking methods of `GSPath` on a pool of at most `max_workers` threads,
+    started on first use.
+
+    The aiohttp session of an event loop is closed by `aclose()` (or at the
+    end of `async with`), or when the loop shuts down (e.g. at the end of
+    `asyncio.run()`). aiohttp is required for the native calls
+    (`pip install aiohttp`).
+
+    Args:
+        client: The `GSClient` to use, a new one (with `**kwargs`) if None
+        max_workers: The maximum number of blocking calls running at a time
+        max_connections: The maximum number of connections of the session
+        api_endpoint: The root url of the JSON API, the one of the storage
+            client (or `https://storage.googleapis.com`) if None
+        timeout: The seconds a request may take
+        retries: The number of times to retry a request after a timeout, a
+            connection error, or a 408, 429 or 5xx response
+        **kwargs: Arguments for the new `GSClient`
+    """
+
+    def __init__(
+        self,
+        client: GSClient | None = None,
+        max_workers: int = 32,
+        max_connections: int = 100,
+        api_endpoint: str | None = None,
+        timeout: float = 60.0,
+        retries: int = 3,
+        **kwargs: Any,
+    ):
+        self.client = client or GSClient(**kwargs)
+        self.max_workers = max_workers
+        self.max_connections = max_connections
+        if api_endpoint is None:
+            connection = getattr(self.client.client, "_connection", None)
+            api_endpoint = getattr(connection, "API_BASE_URL", None)
+        self.api_endpoint = (api_endpoint or _DEFAULT_ENDPOINT).rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._size_connection_pool()
+        # the aiohttp session of each event loop, and the generator closing it
+        self._sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _size_connection_pool(self) -> None:
+        """Let the storage client keep a connection for each worker
+
+        The pool of the adapter in place is grown, not replaced, so that its
+        configuration (e.g. the mutual TLS adapter of google-auth) is kept;
+        it is never shrunk for the other users of the session.
+        """
+        try:
+            import requests
+        except ImportError:  # pragma: no cover
+            return
+
+        http = getattr(self.client.client, "_http", None)
+        if not isinstance(http, requests.Session):
+            return
+        adapter = http.get_adapter("https://storage.googleapis.com/")
+        if not isinstance(adapter, requests.adapters.HTTPAdapter):
+            return
+        if adapter._pool_maxsize >= self.max_workers:
+            return
+        adapter.init_poolmanager(
+            max(adapter._pool_connections, self.max_workers),
+            self.max_workers,
+            block=adapter._pool_block,
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="yunpath-aio"
+                )
+            return self._executor
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on the pool of the client"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+    async def iterate(self, factory: Callable[[], Iterator]) -> AsyncIterator:
+        """Consume a blocking iterator on the pool, one item at a time"""
+        iterator = await self.run(factory)
+        while True:
+            item = await self.run(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+
+    async def _session(self) -> Any:
+        """The aiohttp session of the running event loop"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(loop)
+        if entry is None or entry[0].closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            entry = self._sessions[loop] = (session, _close_with_loop(session))
+            # started in the loop, so that the loop finalizes it
+            await entry[1].asend(None)
+        return entry[0]
+
+    def _refresh_credentials(self, credentials: Any) -> None:
+        with self._refresh_lock:
+            if not credentials.valid:
+                from google.auth.transport.requests import Request
+
+                credentials.refresh(Request())
+
+    async def _headers(self) -> dict[str, str]:
+        """The authorization headers of the credentials of the storage client"""
+        headers: dict[str, str] = {}
+        credentials = getattr(self.client.client, "_credentials", None)
+        if credentials is None:
+            return headers
+        if not credentials.valid:
+            # rare and blocking, on the pool
+            await self.run(self._refresh_credentials, credentials)
+        credentials.apply(headers)
+        return headers
+
+    async def _get_json(
+        self, path: str, params: dict[str, Any], missing_ok: bool = False
+    ) -> dict[str, Any] | None:
+        """GET a resource of the JSON API
+
+        Args:
+            path: The path under `/storage/v1`, quoted
+            params: The query parameters, the None ones are dropped
+            missing_ok: Return None for a 404 instead of raising `NotFound`
+
+        Raises:
+            google.api_core.exceptions.GoogleAPICallError: For an error
+                response, after the retries
+        """
+        import aiohttp
+        import yarl
+        from google.api_core.exceptions import from_http_status
+
+        session = await self._session()
+        url = yarl.URL(f"{self.api_endpoint}/storage/v1{path}", encoded=True)
+        params = {key: str(value) for key, value in params.items() if value is not None}
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.get(
+                    url, params=params, headers=await self._headers()
+                ) as response:
+                    if response.status == 404 and missing_ok:
+                        return None
+                    if response.status < 400:
+                        return await response.json()
+                    if (
+                        response.status not in _RETRY_STATUSES
+                        or attempt == self.retries
+                    ):
+                        raise from_http_status(
+                            response.status,
+                            f"GET {url}: {await response.text()}",
+                        )
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(min(2**attempt * 0.1, 2.0))
+        return None  # pragma: no cover
+
+    async def _iter_resources(
+        self,
+        bucket: str,
+        prefix: str,
+        delimiter: str | None = None,
+        fields: str | None = None,
+    ) -> AsyncIterator[tuple[str, dict[str, Any] | None]]:
+        """List a prefix, page after page
+
+        Yields:
+            Tuples of the name and the resource of the blob, or the name and
+            None for the prefixes (with a delimiter)
+        """
+        params: dict[str, Any] = {
+            "prefix": prefix or None,
+            "delimiter": delimiter,
+            "fields": fields,
+            "projection": "noAcl",
+        }
+        while True:
+            page = await self._get_json(f"/b/{quote(bucket, safe='')}/o", params)
+            for resource in page.get("items", ()):
+                yield resource["name"], resource
+            for name in page.get("prefixes", ()):
+                yield name, None
+            params["pageToken"] = page.get("nextPageToken")
+            if not params["pageToken"]:
+                return
+
+    async def _get_blob(self, bucket: str, name: str) -> Any:
+        """Get a blob, None if missing, like `GSClient._get_blob`"""
+        key = f"{bucket}/{name}"
+        scope = self.client._blob_scope.get()
+        if scope is not None and key in scope:
+            return scope[key]
+
+        store = self.client.metadata_store
+        cache = self.client._metadata_cache
+        blob = _NOT_FETCHED
+        if cache is not None:
+            blob = cache.get(key, _NOT_FETCHED)
+        if blob is _NOT_FETCHED and store is not None:
+            resource = await self.run(store.get, bucket, name)
+            if resource is not MISSING:
+                blob = None if resource is None else self._blob(bucket, resource)
+                if cache is not None:
+                    cache.set(key, blob)
+        if blob is _NOT_FETCHED:
+            resource = await self._get_json(
+                f"/b/{quote(bucket, safe='')}/o/{quote(name, safe='')}",
+                {"projection": "noAcl"},
+                missing_ok=True,
+            )
+            blob = None if resource is None else self._blob(bucket, resource)
+            if cache is not None:
+                cache.set(key, blob)
+            if store is not None:
+                await self.run(
+                    store.set,
+                    bucket,
+                    name,
+                    resource,
+                    None if blob is None else blob.generation,
+                )
+
+        if scope is not None:
+            scope[key] = blob
+        return blob
+
+    def _blob(self, bucket: str, resource: dict[str, Any]) -> Any:
+        blob = self.client.client.bucket(bucket).blob(resource["name"])
+        blob._set_properties(resource)
+        return blob
+
+    async def _get_symlink_target(self, cloud_path: GSPath) -> str | None:
+        """Like `GSClient._get_symlink_target`"""
+        if not cloud_path.blob:
+            return None
+
+        index = self.client._symlink_index
+        if index.covers(cloud_path.bucket, cloud_path.blob):
+            return index.lookup(cloud_path.bucket, cloud_path.blob)
+
+        key = f"{cloud_path.bucket}/{cloud_path.blob}"
+        cache = self.client._symlink_cache
+        if cache is not None:
+            target = cache.get(key, False)
+            if target is not False:
+                return target
+
+        blob = await self._get_blob(cloud_path.bucket, cloud_path.blob)
+        target = None
+        if blob and isinstance(blob.metadata, dict):
+            target = blob.metadata.get("gcsfuse_symlink_target")
+
+        if cache is not None:
+            cache.set(key, target)
+        return target
+
+    async def _is_file_or_dir(self, cloud_path: GSPath) -> str | None:
+        """Like `GSClient._is_file_or_dir`"""
+        if not cloud_path.blob:
+            return "dir"
+
+        bucket = cloud_path.bucket
+        prefix = cloud_path.blob.rstrip("/") + "/"
+        if await self._get_blob(bucket, cloud_path.blob) is not None:
+            if cloud_path.blob == prefix:
+                return "dir"
+            # a directory placeholder with the same name takes precedence
+            if await self._get_blob(bucket, prefix) is not None:
+                return "dir"
+            return "file"
+
+        # not a file, see if it is a directory (placeholder included)
+        store = self.client.metadata_store
+        present = MISSING
+        if store is not None:
+            present = await self.run(store.get_dir, bucket, prefix)
+        if present is MISSING:
+            page = await self._get_json(
+                f"/b/{quote(bucket, safe='')}/o",
+                {
+                    "prefix": prefix,
+                    "maxResults": 1,
+                    "fields": "items(name),nextPageToken",
+                },
+            )
+            present = bool(page.get("items"))
+            if store is not None:
+                await self.run(store.set_dir, bucket, prefix, present)
+        return "dir" if present else None
+
+    async def _exists(self, cloud_path: GSPath) -> bool:
+        if not cloud_path.blob:
+            # the bucket
+            resource = await self._get_json(
+                f"/b/{quote(cloud_path.bucket, safe='')}",
+                {"fields": "name"},
+                missing_ok=True,
+            )
+            return resource is not None
+        return await self._is_file_or_dir(cloud_path) in ("file", "dir")
+
+    def AsyncGSPath(self, cloud_path: str | GSPath | AsyncGSPath) -> AsyncGSPath:
+        """Create an `AsyncGSPath` on this client"""
+        return AsyncGSPath(cloud_path, client=self)
+
+    def close(self, wait: bool = True) -> None:
+        """Shut the pool of threads down
+
+        Args:
+            wait: Whether to wait for the running calls
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    async def aclose(self) -> None:
+        """Close the aiohttp session of the running loop, and shut the pool
+        of threads down, waiting for the running calls"""
+        entry = self._sessions.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            # closes the session
+            await entry[1].aclose()
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> AsyncGSClient:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+
+_default_client: AsyncGSClient | None = None
+
+
+def _get_default_client() -> AsyncGSClient:
+    global _default_client
+    client = GSClient.get_default_client()
+    if _default_client is None or _default_client.client is not client:
+        if _default_client is not None:
+            # its sessions close with their loops
+            _default_client.close(wait=False)
+        _default_client = AsyncGSClient(client)
+    return _default_client
+
+
+class AsyncGSPath:
+    """A GCS path with awaitable methods, mirroring `GSPath`
+
+    The pure path operations (`name`, `parent`, `/`, ...) are synchronous,
+    the ones that talk to GCS are coroutines, and `iterdir`, `glob`,
+    `rglob` and `walk` are async iterators. See `AsyncGSClient` for the ones
+    that are native asyncio.
+
+    Args:
+        cloud_path: The `gs://` url, a `GSPath` or an `AsyncGSPath`
+        client: The `AsyncGSClient` to use, a shared default one if None
+    """
+
+    def __init__(
+        self,
+        cloud_path: str | os.PathLike | GSPath | AsyncGSPath,
+        client: AsyncGSClient | None = None,
+    ):
+        if isinstance(cloud_path, AsyncGSPath):
+            client = client or cloud_path.client
+            cloud_path = cloud_path.path
+        self.client = client or _get_default_client()
+        if not isinstance(cloud_path, GSPath) or (
+            cloud_path.client is not self.client.client
+        ):
+            cloud_path = GSPath(str(cloud_path), client=self.client.client)
+        self.path: GSPath = cloud_path
+
+    def _wrap(self, path: Any) -> Any:
+        return AsyncGSPath(path, self.client) if isinstance(path, GSPath) else path
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}('{self.path}')"
+
+    def __fspath__(self) -> str:
+        return self.path.__fspath__()
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, AsyncGSPath):
+            other = other.path
+        return self.path == other
+
+    def __hash__(self) -> int:
+        return hash(str(self.path).rstrip("/"))
+
+    def __truediv__(self, other: str) -> AsyncGSPath:
+        return self._wrap(self.path / other)
+
+    def joinpath(self, *others: str) -> AsyncGSPath:
+        return self._wrap(self.path.joinpath(*others))
+
+    def with_name(self, name: str) -> AsyncGSPath:
+        return self._wrap(self.path.with_name(name))
+
+    def with_suffix(self, suffix: str) -> AsyncGSPath:
+        return self._wrap(self.path.with_suffix(suffix))
+
+    @property
+    def parent(self) -> AsyncGSPath:
+        return self._wrap(self.path.parent)
+
+    @property
+    def parents(self) -> list[AsyncGSPath]:
+        return [self._wrap(parent) for parent in self.path.parents]
+
+    name = property(lambda self: self.path.name)
+    stem = property(lambda self: self.path.stem)
+    suffix = property(lambda self: self.path.suffix)
+    suffixes = property(lambda self: self.path.suffixes)
+    parts = property(lambda self: self.path.parts)
+    bucket = property(lambda self: self.path.bucket)
+    blob = property(lambda self: self.path.blob)
+
+    async def _run(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        result = await self.client.run(
+            getattr(self.path, method), *args, **kwargs
+        )
+        return self._wrap(result)
+
+    async def _resolve(self, path: GSPath, strict: bool = False) -> GSPath:
+        """Like `GSPath.resolve`, each ancestor checked for a symlink"""
+        if strict and not await self.client._exists(path):
+            raise CloudPathNotExistsError(f"Path {path} does not exist.")
+
+        client = path.client
+        allparts = list(path.parts)
+        resolved = False
+        max_iterations = 100  # Prevent infinite loops with circular symlinks
+        iterations = 0
+
+        while not resolved and iterations < max_iterations:
+            iterations += 1
+            resolved = True
+            key = ""
+
+            for i, part in enumerate(allparts[1:], start=1):
+                key = f"{key}/{part}" if key else part
+                current = GSPath._from_listing(client, "gs://", key)
+                target = await self.client._get_symlink_target(current)
+                if target is not None:
+                    target_path = self._target_path(current, target)
+                    allparts = list(target_path.parts) + allparts[i + 1 :]
+                    resolved = False
+                    break
+
+        if iterations >= max_iterations:
+            raise OSError(f"Too many levels of symbolic links: {path}")
+
+        return GSPath(*allparts, client=client)
+
+    @staticmethod
+    def _target_path(path: GSPath, target: str) -> GSPath:
+        """The path of the raw target of a symlink, like `GSPath.readlink`"""
+        if target.startswith("gs://"):
+            return GSPath(target, client=path.client)
+        return path.parent / target
+
+    async def _follow(self, follow_symlinks: bool) -> GSPath:
+        return await self._resolve(self.path) if follow_symlinks else self.path
+
+    async def exists(self, follow_symlinks: bool = True) -> bool:
+        with self.client.client._operation():
+            return await self.client._exists(await self._follow(follow_symlinks))
+
+    async def is_dir(self, follow_symlinks: bool = True) -> bool:
+        with self.client.client._operation():
+            path = await self._follow(follow_symlinks)
+            return await self.client._is_file_or_dir(path) == "dir"
+
+    async def is_file(self, follow_symlinks: bool = True) -> bool:
+        with self.client.client._operation():
+            path = await self._follow(follow_symlinks)
+            return await self.client._is_file_or_dir(path) == "file"
+
+    async def is_symlink(self) -> bool:
+        with self.client.client._operation():
+            return await self.client._get_symlink_target(self.path) is not None
+
+    async def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        with self.client.client._operation():
+            path = self.path
+            if (
+                follow_symlinks
+                and await self.client._get_symlink_target(path) is not None
+            ):
+                path = await self._resolve(path)
+
+            blob = await self.client._get_blob(path.bucket, path.blob)
+            if blob is None:
+                raise NoStatError(
+                    f"No stats available for {path}; it may be a directory or "
+                    "not exist."
+                )
+            return blob_stat(blob, path.cloud_prefix)
+
+    async def readlink(self) -> AsyncGSPath:
+        with self.client.client._operation():
+            target = await self.client._get_symlink_target(self.path)
+        if target is None:
+            raise OSError(f"{self.path} is not a symlink")
+        return self._wrap(self._target_path(self.path, target))
+
+    async def resolve(self, strict: bool = False) -> AsyncGSPath:
+        with self.client.client._operation():
+            return self._wrap(await self._resolve(self.path, strict=strict))
+
+    async def mkdir(self, parents: bool = False, exist_ok: bool = False) -> None:
+        await self._run("mkdir", parents=parents, exist_ok=exist_ok)
+
+    async def symlink_to(self, target: str | AsyncGSPath | CloudPath) -> AsyncGSPath:
+        if isinstance(target, AsyncGSPath):
+            target = target.path
+        return await self._run("symlink_to", target)
+
+    async def touch(self, exist_ok: bool = True) -> None:
+        await self._run("touch", exist_ok=exist_ok)
+
+    async def unlink(self, missing_ok: bool = True) -> None:
+        await self._run("unlink", missing_ok=missing_ok)
+
+    async def rmdir(self) -> None:
+        await self._run("rmdir")
+
+    async def rmtree(self) -> None:
+        await self._run("rmtree")
+
+    async def read_bytes(self) -> bytes:
+        return await self._run("read_bytes")
+
+    async def read_text(self, encoding: str | None = None) -> str:
+        return await self._run("read_text", encoding=encoding)
+
+    async def write_bytes(self, data: bytes) -> int:
+        return await self._run("write_bytes", data)
+
+    async def write_text(self, data: str, encoding: str | None = None) -> int:
+        return await self._run("write_text", data, encoding=encoding)
+
+    async def copy(self, target: Any, **kwargs: Any) -> Any:
+        if isinstance(target, AsyncGSPath):
+            target = target.path
+        return await self._run("copy", target, **kwargs)
+
+    async def copytree(self, destination: Any, **kwargs: Any) -> Any:
+        if isinstance(destination, AsyncGSPath):
+            destination = destination.path
+        return await self._run("copytree", destination, **kwargs)
+
+    async def download_to(self, destination: str | os.PathLike) -> Any:
+        return await self._run("download_to", destination)
+
+    async def upload_from(self, source: str | os.PathLike, **kwargs: Any) -> Any:
+        return await self._run("upload_from", source, **kwargs)
+
+    async def iterdir(self) -> AsyncIterator[AsyncGSPath]:
+        if not self.path.bucket:
+            # the buckets of the project
+            async for path in self.client.iterate(self.path.iterdir):
+                yield self._wrap(path)
+            return
+
+        path = self.path
+        if await self.is_symlink():
+            path = await self._resolve(path)
+
+        prefix = path.blob.rstrip("/") + "/" if path.blob else ""
+        base = f"{path.cloud_prefix}{path.bucket}/"
+        async for name, _ in self.client._iter_resources(
+            path.bucket, prefix, "/", fields="items(name),prefixes,nextPageToken"
+        ):
+            # the placeholder of the directory itself
+            if name != prefix:
+                yield self._wrap(GSPath._from_listing(path.client, base, name))
+
+    async def glob(self, pattern: str) -> AsyncIterator[AsyncGSPath]:
+        async for path in self.client.iterate(lambda: self.path.glob(pattern)):
+            yield self._wrap(path)
+
+    async def rglob(self, pattern: str) -> AsyncIterator[AsyncGSPath]:
+        async for path in self.client.iterate(lambda: self.path.rglob(pattern)):
+            yield self._wrap(path)
+
+    async def walk(
+        self,
+        top_down: bool = True,
+        on_error: Callable | None = None,
+        follow_symlinks: bool = False,
+        lazy: bool = False,
+    ) -> AsyncIterator[tuple[AsyncGSPath, list[str], list[str]]]:
+        """Walk the tree, like `GSPath.walk`
+
+        Everything under the path is listed at once, natively; with `lazy`,
+        a level at a time on the pool of threads.
+        """
+        if lazy:
+            async for dirpath, dirnames, filenames in self.client.iterate(
+                lambda: self.path.walk(
+                    top_down=top_down,
+                    on_error=on_error,
+                    follow_symlinks=follow_symlinks,
+                    lazy=True,
+                )
+            ):
+                yield self._wrap(dirpath), dirnames, filenames
+            return
+
+        path = self.path
+        if follow_symlinks and await self.is_symlink():
+            path = await self._resolve(path)
+
+        prefix = path.blob.rstrip("/") + "/" if path.blob else ""
+        try:
+            names = [
+                name
+                async for name, _ in self.client._iter_resources(
+                    path.bucket, prefix, fields="items(name),nextPageToken"
+                )
+            ]
+        except Exception as exc:
+            if on_error is None:
+                raise
+            on_error(exc)
+            return
+
+        for dirpath, dirnames, filenames in _walk_tree(
+            path, _build_tree(prefix, names), top_down
+        ):
+            yield self._wrap(dirpath), dirnames, filenames
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe LRU mapping whose entries expire after `ttl` seconds.
+
+    Args:
+        maxsize: The maximum number of entries to keep; the least recently
+            used entry is evicted when it is exceeded
+        ttl: The number of seconds an entry stays valid after it is set
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the value of a key, or default if it is missing or expired"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Set the value of a key, evicting the least recently used entries"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a key if it is in the cache"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_prefix(self, prefix: str) -> None:
+        """Remove all the string keys starting with prefix"""
+        with self._lock:
+            for key in [
+                k for k in self._data if isinstance(k, str) and k.startswith(prefix)
+            ]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        """Remove all the entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
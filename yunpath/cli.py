@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Sequence
+
+from .sync import CHECKSUMS, sync
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="yunpath",
+        description="Work with local and cloud paths.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser(
+        "sync",
+        help="Copy the files that changed from a directory to another.",
+        description=(
+            "Make DESTINATION a copy of SOURCE, copying only the files that "
+            "are missing or differ in size or checksum. Either can be a local "
+            "directory or a gs:// url."
+        ),
+    )
+    sync_parser.add_argument("source", help="The source directory")
+    sync_parser.add_argument("destination", help="The destination directory")
+    sync_parser.add_argument(
+        "--delete",
+        action="store_true",
+        help="Delete the files in DESTINATION that are not in SOURCE",
+    )
+    sync_parser.add_argument(
+        "--checksum",
+        choices=CHECKSUMS,
+        default="crc32c",
+        help="How to compare files of the same size (default: crc32c)",
+    )
+    sync_parser.add_argument(
+        "--manifest",
+        help="A JSON file to keep the checksums of local files in, across runs",
+    )
+    sync_parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="Only print what would be done",
+    )
+    sync_parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=8,
+        help="The number of files compared and copied at a time (default: 8)",
+    )
+    sync_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not print each file"
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """The entry point of the `yunpath` command"""
+    args = _parser().parse_args(argv)
+
+    def progress(action: str, rel: str) -> None:
+        if not args.quiet:
+            print(f"{action}: {rel}", flush=True)
+
+    try:
+        result = sync(
+            args.source,
+            args.destination,
+            delete=args.delete,
+            checksum=args.checksum,
+            manifest=args.manifest,
+            dry_run=args.dry_run,
+            max_workers=args.workers,
+            progress=progress,
+        )
+    except (FileNotFoundError, NotADirectoryError) as exc:
+        print(f"yunpath sync: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"{len(result.copied)} copied, {len(result.deleted)} deleted, "
+        f"{result.unchanged} unchanged"
+        + (" (dry run)" if args.dry_run else ""),
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
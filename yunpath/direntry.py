@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Iterator
+
+from cloudpathlib.exceptions import NoStatError
+
+
+def blob_stat(blob: Any, cloud_prefix: str = "gs://") -> os.stat_result:
+    """Build the stat result of a blob, as `GSPath.stat()` returns it"""
+    # check if there is updated in the real metadata
+    # if so, use it as mtime
+    updated = blob.updated
+    if blob.metadata and "updated" in blob.metadata:  # pragma: no cover
+        updated = blob.metadata["updated"]
+        if isinstance(updated, str):
+            updated = datetime.fromisoformat(updated)
+
+    mtime = updated.timestamp() if updated is not None else 0
+
+    return os.stat_result(
+        (  # type: ignore[arg-type]
+            None,  # mode
+            None,  # ino
+            cloud_prefix,  # dev,
+            None,  # nlink,
+            None,  # uid,
+            None,  # gid,
+            blob.size or 0,  # size,
+            None,  # atime,
+            mtime,  # mtime,
+            None,  # ctime,
+        )
+    )
+
+
+class GSDirEntry:
+    """An `os.DirEntry`-like entry of `GSPath.scandir()`
+
+    The type, size, mtime and gcsfuse symlink target come from the listing,
+    so `is_dir()`, `is_file()`, `is_symlink()` and `stat()` need no more
+    calls. Only following a symlink (the default of `is_dir()`, `is_file()`
+    and `stat()`) asks GCS about its target.
+
+    Args:
+        path: The `GSPath` of the entry
+        blob: The blob from the listing, None for a directory (prefix)
+    """
+
+    __slots__ = ("name", "path", "_cloud_path", "_blob")
+
+    def __init__(self, path: Any, blob: Any = None):
+        self.name: str = path.name
+        self.path: str = str(path)
+        self._cloud_path = path
+        self._blob = blob
+
+    @property
+    def cloud_path(self) -> Any:
+        """The `GSPath` of the entry"""
+        return self._cloud_path
+
+    @property
+    def symlink_target(self) -> str | None:
+        """The raw gcsfuse symlink target, None if not a symlink"""
+        if self._blob is None or not isinstance(self._blob.metadata, dict):
+            return None
+        return self._blob.metadata.get("gcsfuse_symlink_target")
+
+    def is_symlink(self) -> bool:
+        return self.symlink_target is not None
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and self.is_symlink():
+            return self._cloud_path.is_dir()
+        return self._blob is None
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and self.is_symlink():
+            return self._cloud_path.is_file()
+        return self._blob is not None
+
+    def stat(self, follow_symlinks: bool = True) -> os.stat_result:
+        if follow_symlinks and self.is_symlink():
+            return self._cloud_path.stat()
+        if self._blob is None:
+            raise NoStatError(
+                f"No stats available for {self.path}; it may be a directory "
+                "or not exist."
+            )
+        return blob_stat(self._blob, self._cloud_path.cloud_prefix)
+
+    def inode(self) -> int:
+        return 0
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name!r}>"
+
+
+class ScandirIterator:
+    """An iterator of `GSDirEntry` that can be used as a context manager,
+    like the one returned by `os.scandir()`"""
+
+    def __init__(self, entries: Iterator[GSDirEntry]):
+        self._entries = entries
+
+    def __iter__(self) -> ScandirIterator:
+        return self
+
+    def __next__(self) -> GSDirEntry:
+        return next(self._entries)
+
+    def close(self) -> None:
+        close = getattr(self._entries, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> ScandirIterator:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,362 @@
+"""A byte cap on the local cache of the files read through cloudpathlib
+
+`open()`, `read_bytes()` and `read_text()` download a blob to the local
+cache directory of the client before reading it, and cloudpathlib never
+removes it while the client lives. `LocalCacheManager` records the size,
+last access and number of accesses of each cached file, and removes the
+least recently (or least frequently) used ones once the cache grows over
+its cap.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Collection, Iterable
+
+POLICIES = ("lru", "lfu")
+
+# the suffix of the files being downloaded, moved in place once complete
+PARTIAL_SUFFIX = ".yunpath-part"
+
+_ORDER = {"lru": "atime", "lfu": "hits, atime"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    atime REAL NOT NULL,
+    hits INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_atime ON files (atime);
+"""
+
+
+class _MemoryIndex:
+    """The cached files of a single process, by path"""
+
+    def __init__(self):
+        # path -> [size, atime, hits]
+        self._files: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, path: str, size: int | None, hit: bool) -> None:
+        now = time.time()
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is None:
+                self._files[path] = [size or 0, now, 1]
+                return
+            if size is not None:
+                entry[0] = size
+            entry[1] = now
+            entry[2] += hit
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self._files.pop(path, None)
+
+    def add(self, files: Iterable[tuple[str, int, float]]) -> None:
+        with self._lock:
+            for path, size, atime in files:
+                self._files.setdefault(path, [size, atime, 1])
+
+    def total(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._files), sum(e[0] for e in self._files.values())
+
+    def pop_victims(
+        self, need: int, policy: str, keep: Collection[str], before: float
+    ) -> list[tuple[str, int]]:
+        with self._lock:
+            if policy == "lru":
+                order = sorted(self._files.items(), key=lambda item: item[1][1])
+            else:
+                order = sorted(
+                    self._files.items(), key=lambda item: (item[1][2], item[1][1])
+                )
+            victims = []
+            for path, (size, atime, _) in order:
+                if need <= 0:
+                    break
+                if path in keep or atime >= before:
+                    continue
+                victims.append((path, size))
+                need -= size
+            for path, _ in victims:
+                del self._files[path]
+            return victims
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files.clear()
+
+
+class _SQLiteIndex:
+    """The cached files in a SQLite database, shared by the processes
+    opening the same file"""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """The connection of the current thread (and process)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def touch(self, path: str, size: int | None, hit: bool) -> None:
+        self._connect().execute(
+            "INSERT INTO files VALUES (?, ?, ?, 1) "
+            "ON CONFLICT (path) DO UPDATE SET "
+            "size = COALESCE(?, files.size), atime = excluded.atime, "
+            "hits = files.hits + ?",
+            (path, size or 0, time.time(), size, int(hit)),
+        )
+
+    def remove(self, path: str) -> None:
+        self._connect().execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def add(self, files: Iterable[tuple[str, int, float]]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO files VALUES (?, ?, ?, 1)", list(files)
+            )
+
+    def total(self) -> tuple[int, int]:
+        count, size = (
+            self._connect()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files")
+            .fetchone()
+        )
+        return count, size
+
+    def pop_victims(
+        self, need: int, policy: str, keep: Collection[str], before: float
+    ) -> list[tuple[str, int]]:
+        conn = self._connect()
+        victims = []
+        with conn:
+            # the selection and the removal from the index are atomic, so
+            # that processes evicting at the same time pick different files
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                f"SELECT path, size FROM files WHERE atime < ? "
+                f"ORDER BY {_ORDER[policy]}",
+                (before,),
+            )
+            for path, size in rows:
+                if need <= 0:
+                    break
+                if path in keep:
+                    continue
+                victims.append((path, size))
+                need -= size
+            conn.executemany(
+                "DELETE FROM files WHERE path = ?", [(path,) for path, _ in victims]
+            )
+        return victims
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM files")
+
+
+class MapRegistry:
+    """The open maps of the local files of a process, by path
+
+    The maps are held weakly, and a file is no longer mapped once its maps
+    are all closed or garbage collected.
+    """
+
+    def __init__(self):
+        self._maps: dict[str, weakref.WeakSet] = {}
+        self._lock = threading.Lock()
+
+    def add(self, local_path: str | os.PathLike, mapped: Any) -> None:
+        with self._lock:
+            self._maps.setdefault(
+                os.path.abspath(local_path), weakref.WeakSet()
+            ).add(mapped)
+
+    def paths(self) -> set[str]:
+        """The files with an open map"""
+        with self._lock:
+            for path, maps in list(self._maps.items()):
+                if all(mapped.closed for mapped in maps):
+                    del self._maps[path]
+            return set(self._maps)
+
+    def __contains__(self, local_path: str | os.PathLike) -> bool:
+        path = os.path.abspath(local_path)
+        with self._lock:
+            maps = self._maps.get(path)
+            if maps is None:
+                return False
+            if all(mapped.closed for mapped in maps):
+                del self._maps[path]
+                return False
+            return True
+
+
+class LocalCacheManager:
+    """Keep the local file cache under a number of bytes
+
+    The files are recorded when they are read through the cache, and the
+    least recently used (`lru`) or least frequently used (`lfu`, the least
+    recently used first among the same number of accesses) are removed when
+    the total size goes over `max_bytes`. The file being read, the files
+    mapped by `GSPath.mmap()` in this process, and the files accessed in
+    the last `min_age` seconds are never removed, so that a download or read
+    in progress in another process is not cut.
+
+    Args:
+        max_bytes: The maximum total size of the cached files
+        policy: `lru` or `lfu`
+        index: A SQLite file to keep the index in, shared by the processes
+            (and their clients) using the same cache directory. None to keep
+            it in memory, for a single process.
+        min_age: The number of seconds a file is kept after an access,
+            whatever the cap
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        policy: str = "lru",
+        index: str | os.PathLike | None = None,
+        min_age: float = 60.0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.min_age = min_age
+        self._index: Any = _MemoryIndex() if index is None else _SQLiteIndex(index)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+        self._pins = MapRegistry()
+
+    def scan(self, root: str | os.PathLike) -> None:
+        """Record the files already under a cache directory, with the
+        access times of the file system, leaving the recorded ones as is"""
+        root = os.path.abspath(root)
+        if not os.path.isdir(root):
+            return
+
+        # the index may live in the cache directory
+        index = getattr(self._index, "path", None)
+        skip = os.path.abspath(index) if index is not None else None
+        files = []
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (
+                        entry.is_file(follow_symlinks=False)
+                        and PARTIAL_SUFFIX not in entry.name
+                        and not (skip and entry.path.startswith(skip))
+                    ):
+                        st = entry.stat(follow_symlinks=False)
+                        files.append((entry.path, st.st_size, st.st_atime))
+        self._index.add(files)
+
+    def reserve(self, local_path: str | os.PathLike) -> None:
+        """Mark a file as used before it is (re)downloaded, so that it is not
+        evicted meanwhile"""
+        self._index.touch(os.path.abspath(local_path), None, False)
+
+    def access(self, local_path: str | os.PathLike, hit: bool) -> None:
+        """Record a read of a cached file, then evict to fit the cap
+
+        Args:
+            local_path: The cached file
+            hit: Whether it was already cached and fresh, False if it was
+                just downloaded
+        """
+        local_path = os.path.abspath(local_path)
+        try:
+            size = os.stat(local_path).st_size
+        except FileNotFoundError:
+            return
+        self._index.touch(local_path, size, hit)
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+        self.evict(keep=(local_path,))
+
+    def pin(self, local_path: str | os.PathLike, mapped: Any) -> None:
+        """Keep a file from eviction while a map of it is open, until it is
+        closed or garbage collected"""
+        self._pins.add(local_path, mapped)
+
+    def pinned(self) -> set[str]:
+        """The files with an open map"""
+        return self._pins.paths()
+
+    def forget(self, local_path: str | os.PathLike) -> None:
+        """Forget a file, e.g. reserved but not downloaded"""
+        self._index.remove(os.path.abspath(local_path))
+
+    def evict(self, keep: Collection[str] = ()) -> int:
+        """Remove files until the cache fits in `max_bytes`
+
+        Args:
+            keep: The files not to remove, besides the pinned ones
+
+        Returns:
+            The number of bytes freed
+        """
+        _, total = self._index.total()
+        need = total - self.max_bytes
+        if need <= 0:
+            return 0
+
+        keep = {os.path.abspath(path) for path in keep} | self.pinned()
+        victims = self._index.pop_victims(
+            need, self.policy, keep, time.time() - self.min_age
+        )
+        removed = freed = 0
+        for path, size in victims:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # removed by cloudpathlib or another process
+                continue
+            removed += 1
+            freed += size
+        with self._lock:
+            self._stats["evictions"] += removed
+            self._stats["evicted_bytes"] += freed
+        return freed
+
+    def clear(self) -> None:
+        """Forget all the files, without removing them"""
+        self._index.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Get the hits, misses and evictions of this manager, and the
+        number and total size of the cached files
+
+        Returns:
+            A dict with `hits`, `misses`, `evictions`, `evicted_bytes`,
+            `files`, `bytes` and `max_bytes`
+        """
+        files, size = self._index.total()
+        with self._lock:
+            return dict(self._stats, files=files, bytes=size, max_bytes=self.max_bytes)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import re
+from typing import Sequence
+
+# characters that GCS match_glob treats specially, but fnmatch does not; a
+# comma would also split the `{expr,expr/**}` alternatives
+_UNSUPPORTED = set("{},\\")
+_MAGIC = re.compile(r"[*?\[]")
+_CHAR_CLASS = re.compile(r"\[!?\]?[^\]]*\]")
+
+
+def literal_prefix(base: str, parts: Sequence[str]) -> str:
+    """The longest literal prefix of the blob names a glob pattern can match
+
+    Args:
+        base: The prefix of the directory globbed, with a trailing slash (or
+            empty for the bucket)
+        parts: The parts of the pattern
+
+    Returns:
+        The prefix to list
+    """
+    pattern = "/".join(parts)
+    match = _MAGIC.search(pattern)
+    return base + (pattern if match is None else pattern[: match.start()])
+
+
+def _segment(part: str) -> str:
+    # a character class matches a single character, not "/", like `?`;
+    # unmatched brackets too, conservatively
+    part = _CHAR_CLASS.sub("?", part)
+    return part.replace("[", "?").replace("]", "?")
+
+
+def to_match_glob(base: str, parts: Sequence[str]) -> str | None:
+    """Translate a pathlib glob pattern to a GCS `match_glob` expression
+
+    The expression selects a superset of the blobs needed to evaluate the
+    pattern: the ones matching it, and the ones under the directories
+    matching it. The exact matches are still selected client-side.
+
+    Args:
+        base: The prefix of the directory globbed, with a trailing slash (or
+            empty for the bucket)
+        parts: The parts of the pattern, e.g. `("**", "*.txt")`
+
+    Returns:
+        The expression, or None if the pattern (or base) has characters
+        that GCS would not read literally
+    """
+    if _UNSUPPORTED & set(base) or any(_UNSUPPORTED & set(part) for part in parts):
+        return None
+    if _MAGIC.search(base) or "]" in base:
+        return None
+
+    expression = base
+    for i, part in enumerate(parts):
+        if part == "**":
+            # zero or more directories; `a/**b` also matches `a/b`
+            if not expression.endswith("**"):
+                expression += "**"
+            continue
+        part = _segment(part)
+        if expression.endswith("**"):
+            # `**` absorbs the leading wildcards, `**.txt` for `**/*.txt`
+            part = part.lstrip("*")
+        expression += part
+        if i < len(parts) - 1:
+            expression += "/"
+
+    if expression.endswith("**"):
+        return expression
+    # the blob itself, or the ones under it when it is a directory
+    return f"{{{expression},{expression}/**}}"
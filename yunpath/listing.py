@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator
+
+_DONE = object()
+
+
+def _next_chars(bkt: Any, prefix: str) -> list[str]:
+    """Discover the distinct characters following prefix in the blob names,
+    with one request of a single item per character"""
+    chars: list[str] = []
+    start = prefix
+    while True:
+        blobs = list(
+            bkt.list_blobs(
+                prefix=prefix or None,
+                start_offset=start or None,
+                max_results=1,
+                fields="items(name),nextPageToken",
+            )
+        )
+        if not blobs:
+            return chars
+
+        name = blobs[0].name
+        if len(name) == len(prefix):
+            # a blob named as the prefix itself
+            start = prefix + "\x00"
+            continue
+
+        char = name[len(prefix)]
+        chars.append(char)
+        # blob names are ordered by their UTF-8 bytes, which for str is the
+        # order of the code points
+        if ord(char) >= 0x10FFFF:  # pragma: no cover
+            return chars
+        start = prefix + chr(ord(char) + 1)
+
+
+def sample_split_points(
+    bkt: Any,
+    prefix: str,
+    shards: int,
+    max_depth: int = 2,
+    max_workers: int = 16,
+) -> list[str]:
+    """Sample the key space under a prefix for points to split a listing at
+
+    The distinct characters following the prefix are discovered, and the
+    points are deepened a character at a time, concurrently, until there are
+    enough of them or `max_depth` is reached. At most `4 * shards` points
+    are returned, evenly picked, so that the shards are fine enough to keep
+    all the workers busy.
+
+    Args:
+        bkt: The bucket
+        prefix: The prefix to list
+        shards: The number of shards wanted
+        max_depth: The maximum number of characters after the prefix
+        max_workers: The number of probes running at a time
+
+    Returns:
+        The sorted split points (full blob names)
+    """
+    points = [prefix]
+    depth = 0
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        while depth < max_depth and len(points) < shards:
+            deeper = []
+            probed = pool.map(lambda point: _next_chars(bkt, point), points)
+            for point, chars in zip(points, probed):
+                deeper.extend(point + char for char in chars)
+            if not deeper or len(deeper) <= len(points):
+                break
+            points = deeper
+            depth += 1
+
+    points = sorted(point for point in points if point != prefix)
+    limit = max(shards, 1) * 4
+    if len(points) > limit:
+        step = len(points) / limit
+        points = [points[int(i * step)] for i in range(limit)]
+    return points
+
+
+def sharded_list(
+    bkt: Any,
+    prefix: str = "",
+    delimiter: str | None = None,
+    shards: int = 16,
+    hints: Iterable[str] | None = None,
+    max_workers: int = 16,
+    ordered: bool = True,
+    max_pages: int = 4,
+    **list_kwargs: Any,
+) -> Iterator[tuple[str, Any]]:
+    """List the blobs under a prefix in key ranges, concurrently
+
+    The key space is split at the `hints` (keys relative to the prefix) or
+    at points sampled with `sample_split_points`. Each range is listed with
+    `start_offset`/`end_offset` by a worker, and the pages are merged into a
+    single stream. Each worker holds at most `max_pages` pages that are not
+    consumed yet, so memory stays bounded.
+
+    Args:
+        bkt: The bucket
+        prefix: The prefix to list
+        delimiter: The delimiter, to list a single level with "/"
+        shards: The number of shards to sample, if no hints
+        hints: The keys (relative to the prefix) to split the listing at
+        max_workers: The number of shards listed at a time
+        ordered: Whether to yield in key order (shard after shard) or as
+            the pages arrive
+        max_pages: The number of pages a worker may hold
+        **list_kwargs: Extra arguments for `list_blobs`, e.g. fields
+
+    Yields:
+        Tuples of the name and the blob, or the name and None for the
+        prefixes (with a delimiter). Each prefix is yielded once.
+    """
+    if hints is not None:
+        points = sorted({prefix + hint for hint in hints if hint})
+    else:
+        points = sample_split_points(
+            bkt, prefix, shards=shards, max_workers=max_workers
+        )
+    bounds = list(zip([None] + points, points + [None]))
+
+    stop = threading.Event()
+    if ordered:
+        # one queue per shard, consumed shard after shard
+        queues = [queue.Queue(maxsize=max_pages) for _ in bounds]
+    else:
+        queues = [queue.Queue(maxsize=max_pages * max(max_workers, 1))]
+
+    def _put(q: queue.Queue, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _list_shard(index: int, start: str | None, end: str | None) -> None:
+        q = queues[index] if ordered else queues[0]
+        if stop.is_set():
+            return
+        try:
+            iterator = bkt.list_blobs(
+                prefix=prefix or None,
+                delimiter=delimiter,
+                start_offset=start,
+                end_offset=end,
+                **list_kwargs,
+            )
+            for page in iterator.pages:
+                items = [(blob.name, blob) for blob in page]
+                items.extend((name, None) for name in page.prefixes)
+                if not _put(q, items):
+                    return
+        except BaseException as exc:  # forwarded to the consumer
+            _put(q, exc)
+        else:
+            _put(q, _DONE)
+
+    pool = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+    try:
+        for index, (start, end) in enumerate(bounds):
+            pool.submit(_list_shard, index, start, end)
+
+        seen_prefixes: set[str] = set()
+        remaining = len(bounds)
+        current = 0
+        while remaining:
+            q = queues[current] if ordered else queues[0]
+            item = q.get()
+            if item is _DONE:
+                remaining -= 1
+                current += 1
+                continue
+            if isinstance(item, BaseException):
+                raise item
+
+            for name, blob in item:
+                if blob is None:
+                    # a prefix may span shards
+                    if name in seen_prefixes:
+                        continue
+                    seen_prefixes.add(name)
+                yield name, blob
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
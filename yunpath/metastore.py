@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+# Marks a key that is not in the store, since None means a missing blob
+MISSING = object()
+
+# Sorts after any other character, to list the keys under a prefix as a range
+_MAX_CHAR = "\U0010ffff"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    bucket TEXT NOT NULL,
+    name TEXT NOT NULL,
+    generation INTEGER,
+    resource TEXT,
+    expires REAL NOT NULL,
+    PRIMARY KEY (bucket, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS blobs_expires ON blobs (expires);
+CREATE TABLE IF NOT EXISTS dirs (
+    bucket TEXT NOT NULL,
+    prefix TEXT NOT NULL,
+    present INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (bucket, prefix)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dirs_expires ON dirs (expires);
+"""
+
+
+class MetadataStore:
+    """A cache of blob metadata in a SQLite database, shared by the processes
+    (and threads) opening the same file
+
+    Entries are the JSON resources of the blobs (None for a missing blob) by
+    bucket and name, with their generation, and whether prefixes have
+    anything under them. An entry is never replaced by the one of an older
+    generation, so a slow reader cannot undo a newer write. The database is
+    in WAL mode, so readers do not block each other nor the writer.
+
+    Args:
+        path: The database file, created if needed
+        ttl: The number of seconds an entry stays valid after it is set
+        maxsize: The maximum number of entries in each table; the ones
+            expiring first are evicted when it is exceeded
+        evict_every: Check the size of the tables every this many sets
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        ttl: float = 300.0,
+        maxsize: int = 100_000,
+        evict_every: int = 256,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sets = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """The connection of the current thread (and process)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, bucket: str, name: str) -> Any:
+        """Get the resource of a blob, None if it is known to be missing,
+        `MISSING` if it is not in the store or expired"""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT resource FROM blobs "
+                "WHERE bucket = ? AND name = ? AND expires > ?",
+                (bucket, name, time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return MISSING
+        return None if row[0] is None else json.loads(row[0])
+
+    def set(
+        self,
+        bucket: str,
+        name: str,
+        resource: dict[str, Any] | None,
+        generation: int | None = None,
+    ) -> None:
+        """Set the resource of a blob, None if it is missing
+
+        A blob of a known generation is only replaced by the same or a newer
+        generation, not by a missing blob (nor a generation unknown) that
+        may have been read before it was written, until it expires. The
+        deletions through the clients invalidate it instead.
+        """
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO blobs VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (bucket, name) DO UPDATE SET "
+            "generation = excluded.generation, resource = excluded.resource, "
+            "expires = excluded.expires "
+            "WHERE blobs.generation IS NULL OR blobs.expires <= ? "
+            "OR excluded.generation >= blobs.generation",
+            (
+                bucket,
+                name,
+                None if generation is None else int(generation),
+                None if resource is None else json.dumps(resource),
+                now + self.ttl,
+                now,
+            ),
+        )
+        self._maybe_evict()
+
+    def get_dir(self, bucket: str, prefix: str) -> Any:
+        """Get whether anything is under a prefix, `MISSING` if unknown"""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT present FROM dirs "
+                "WHERE bucket = ? AND prefix = ? AND expires > ?",
+                (bucket, prefix, time.time()),
+            )
+            .fetchone()
+        )
+        return MISSING if row is None else bool(row[0])
+
+    def set_dir(self, bucket: str, prefix: str, present: bool) -> None:
+        """Set whether anything is under a prefix"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?)",
+            (bucket, prefix, int(present), time.time() + self.ttl),
+        )
+        self._maybe_evict()
+
+    def invalidate(self, bucket: str, name: str, recursive: bool = False) -> None:
+        """Forget a blob and its `name/` placeholder (and everything under it
+        if recursive), and whether its parent prefixes have anything under
+        them, after it is changed"""
+        key = name.rstrip("/")
+        parts = key.split("/")
+        prefixes = ["/".join(parts[:i]) + "/" for i in range(1, len(parts) + 1)]
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM blobs WHERE bucket = ? AND name IN (?, ?)",
+                (bucket, key, key + "/"),
+            )
+            conn.executemany(
+                "DELETE FROM dirs WHERE bucket = ? AND prefix = ?",
+                [(bucket, prefix) for prefix in prefixes],
+            )
+            if recursive and not key:
+                # the whole bucket
+                conn.execute("DELETE FROM blobs WHERE bucket = ?", (bucket,))
+                conn.execute("DELETE FROM dirs WHERE bucket = ?", (bucket,))
+            elif recursive:
+                low, high = key + "/", key + "/" + _MAX_CHAR
+                conn.execute(
+                    "DELETE FROM blobs WHERE bucket = ? AND name >= ? AND name < ?",
+                    (bucket, low, high),
+                )
+                conn.execute(
+                    "DELETE FROM dirs WHERE bucket = ? AND prefix >= ? "
+                    "AND prefix < ?",
+                    (bucket, low, high),
+                )
+
+    def _maybe_evict(self) -> None:
+        with self._lock:
+            self._sets += 1
+            if self._sets < self.evict_every:
+                return
+            self._sets = 0
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the expired entries, then the ones expiring first until
+        each table fits in `maxsize`"""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for table, key in (("blobs", "bucket, name"), ("dirs", "bucket, prefix")):
+                conn.execute(f"DELETE FROM {table} WHERE expires <= ?", (time.time(),))
+                (count,) = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+                if count > self.maxsize:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE ({key}) IN ("
+                        f"SELECT {key} FROM {table} ORDER BY expires LIMIT ?)",
+                        (count - self.maxsize,),
+                    )
+
+    def clear(self) -> None:
+        """Remove all the entries"""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM blobs")
+            conn.execute("DELETE FROM dirs")
+
+    def __len__(self) -> int:
+        (count,) = (
+            self._connect()
+            .execute("SELECT COUNT(*) FROM blobs WHERE expires > ?", (time.time(),))
+            .fetchone()
+        )
+        return count
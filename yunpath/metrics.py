@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+from urllib.parse import urlsplit
+
+# The upper bounds (seconds) of the latency buckets, the last one is open
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_ACTIONS = {"rewriteTo": "rewrite", "copyTo": "copy", "compose": "compose"}
+_VERBS = {
+    "GET": "get",
+    "POST": "insert",
+    "PUT": "update",
+    "PATCH": "patch",
+    "DELETE": "delete",
+}
+
+
+@dataclass
+class MetricEvent:
+    """An operation or an RPC, as passed to the hook of `Metrics`
+
+    Attributes:
+        kind: `operation` for a public `GSPath` method, `rpc` for a request
+        name: The method (e.g. `exists`) or the RPC (e.g. `objects.get`)
+        seconds: How long it took
+        error: Whether it raised, or the request got an error status
+        bytes_sent: The size of the request body (RPCs only)
+        bytes_received: The size of the response body (RPCs only)
+    """
+
+    kind: str
+    name: str
+    seconds: float
+    error: bool = False
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+class Histogram:
+    """A latency histogram with fixed buckets
+
+    Args:
+        bounds: The upper bounds of the buckets, in seconds; one more
+            bucket holds what is above the last one
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in
+        (the max for the open bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max  # pragma: no cover
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+def rpc_name(method: str, url: str) -> str:
+    """Name a GCS JSON API request after the API method, e.g.
+    `objects.get`, `objects.list`, `objects.get_media` (a download),
+    `objects.insert` (an upload) or `batch`"""
+    parts = urlsplit(url)
+    path = parts.path
+    if path.startswith("/batch/"):
+        return "batch"
+    if path.startswith("/upload/"):
+        return "objects.insert"
+    if path.startswith("/download/") or "alt=media" in parts.query:
+        return "objects.get_media"
+
+    # /storage/v1/b/{bucket}/o/{object}/{action}/..., the names are quoted
+    segments = path.split("/storage/v1/", 1)[-1].strip("/").split("/")
+    verb = _VERBS.get(method.upper(), method.lower())
+    if segments[0] != "b":
+        return f"other.{verb}"
+    if len(segments) == 1:
+        return "buckets.list" if verb == "get" else f"buckets.{verb}"
+    if len(segments) == 2:
+        return f"buckets.{verb}"
+    if len(segments) == 3:
+        return "objects.list" if verb == "get" else f"objects.{verb}"
+    if len(segments) == 4:
+        return f"objects.{verb}"
+    return f"objects.{_ACTIONS.get(segments[4], segments[4])}"
+
+
+def _body_size(body: Any, headers: Any) -> int:
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode())
+    try:
+        return int((headers or {}).get("Content-Length") or 0)
+    except (TypeError, ValueError):  # pragma: no cover
+        return 0
+
+
+class Metrics:
+    """Counters and latency histograms of the public `GSPath` operations
+    and of the GCS requests behind them
+
+    Only the outermost operation is counted: `exists()` counts as one
+    `exists`, not as the `resolve` and `is_symlink` it calls. Requests are
+    counted by the HTTP session of the storage client, so all the clients
+    sharing a session see all its requests, including the ones made from
+    worker threads.
+
+    Args:
+        hook: A callable called with a `MetricEvent` after each operation
+            and request, e.g. to export to a metrics stack. It is called in
+            the thread that made the call and should be fast.
+        bounds: The upper bounds of the latency buckets, in seconds
+    """
+
+    def __init__(
+        self,
+        hook: Callable[[MetricEvent], Any] | None = None,
+        bounds: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.hook = hook
+        self.bounds = tuple(bounds)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all the counters and histograms"""
+        with self._lock:
+            self._operations: dict[str, dict[str, Any]] = {}
+            self._rpcs: dict[str, dict[str, Any]] = {}
+
+    def _entry(self, table: dict[str, dict[str, Any]], name: str) -> dict:
+        entry = table.get(name)
+        if entry is None:
+            entry = table[name] = {
+                "count": 0,
+                "errors": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "latency": Histogram(self.bounds),
+            }
+        return entry
+
+    def record(self, event: MetricEvent) -> None:
+        """Record an operation or a request"""
+        with self._lock:
+            table = self._operations if event.kind == "operation" else self._rpcs
+            entry = self._entry(table, event.name)
+            entry["count"] += 1
+            entry["errors"] += event.error
+            entry["bytes_sent"] += event.bytes_sent
+            entry["bytes_received"] += event.bytes_received
+            entry["latency"].observe(event.seconds)
+        if self.hook is not None:
+            self.hook(event)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get a copy of the metrics
+
+        Returns:
+            A dict with `operations` and `rpcs`, each a dict of names to
+            their `count`, `errors`, `bytes_sent`, `bytes_received` and
+            `latency` histogram (a dict), and the totals `rpc_count`,
+            `bytes_sent` and `bytes_received`
+        """
+        with self._lock:
+            out: dict[str, Any] = {}
+            for key, table in (("operations", self._operations), ("rpcs", self._rpcs)):
+                out[key] = {
+                    name: dict(entry, latency=entry["latency"].as_dict())
+                    for name, entry in sorted(table.items())
+                }
+            out["rpc_count"] = sum(e["count"] for e in self._rpcs.values())
+            out["bytes_sent"] = sum(e["bytes_sent"] for e in self._rpcs.values())
+            out["bytes_received"] = sum(
+                e["bytes_received"] for e in self._rpcs.values()
+            )
+            return out
+
+    def instrument(self, session: Any) -> bool:
+        """Count the requests made through a `requests.Session`
+
+        Returns:
+            Whether the session could be instrumented
+        """
+        try:
+            import requests
+        except ImportError:  # pragma: no cover
+            return False
+        if not isinstance(session, requests.Session):
+            return False
+
+        sinks = getattr(session, "_yunpath_metrics", None)
+        if sinks is not None:
+            if self not in sinks:
+                sinks.append(self)
+            return True
+
+        sinks = session._yunpath_metrics = [self]
+        request = session.request
+
+        @functools.wraps(request)
+        def instrumented(method, url, *args, **kwargs):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = request(method, url, *args, **kwargs)
+                return response
+            finally:
+                sent = _body_size(kwargs.get("data"), kwargs.get("headers"))
+                received = 0
+                if response is not None:
+                    received = _body_size(None, response.headers)
+                event = MetricEvent(
+                    "rpc",
+                    rpc_name(method, url),
+                    time.perf_counter() - start,
+                    error=response is None or response.status_code >= 400,
+                    bytes_sent=sent,
+                    bytes_received=received,
+                )
+                for metrics in list(sinks):
+                    metrics.record(event)
+
+        session.request = instrumented
+        return True
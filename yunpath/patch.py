@@ -1,134 +1,829 @@
 from __future__ import annotations
 
+import io
+import mmap
 import os
 import shutil
+import sys
 import functools
-from datetime import datetime
-from pathlib import PurePath
-from typing import Callable, Container, Iterable
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Callable, Container, Iterable, Iterator, Sequence
+from urllib.parse import urlparse
 
 from cloudpathlib.client import register_client_class
 from cloudpathlib.exceptions import (
     CloudPathFileExistsError,
+    CloudPathFileNotFoundError,
+    CloudPathNotADirectoryError,
     CloudPathNotExistsError,
     CloudPathIsADirectoryError,
     NoStatError,
+    OverwriteNewerCloudError,
 )
 from cloudpathlib.gs.gsclient import GSClient as _GSClient
 from cloudpathlib.gs.gspath import GSPath as _GSPath
-from cloudpathlib.cloudpath import register_path_class, CloudPath
+from cloudpathlib.cloudpath import (  # type: ignore[attr-defined]
+    _CloudPathSelectable,
+    _make_selector,
+    _posix_flavour,
+    register_path_class,
+    CloudPath,
+)
 from cloudpathlib.anypath import to_anypath
 
+from . import globbing, listing, table, transfer
+from .cache import TTLCache
+from .direntry import GSDirEntry, ScandirIterator, blob_stat
+from .filecache import PARTIAL_SUFFIX, LocalCacheManager, MapRegistry
+from .metastore import MISSING, MetadataStore
+from .metrics import MetricEvent, Metrics
+from .stream import GSRangeReader, GSStreamWriter, GSTextStreamWriter
+from .symlinks import SymlinkIndex
 
-def _rmtree(self, ignore_errors=False, onerror=None):
-    """Recursively delete a directory tree."""
-    if self.is_dir():
-        shutil.rmtree(self, ignore_errors=ignore_errors, onerror=onerror)
-    else:
-        raise NotADirectoryError(f"[Errno 20] Not a directory: '{self}'")
-
-
-def _copy(
-    self,
-    destination: str | os.PathLike | CloudPath,
-    force_overwrite_to_cloud: bool | None = None,
-):
-    """Copy a file to a destination."""
-    if not self.exists() or not self.is_file():
-        raise ValueError(
-            f"Path {self} should be a file. To copy a directory tree use "
-            "the method copytree."
-        )
+# Marks a blob that has not been fetched yet, since None means a missing blob
+_NOT_FETCHED = object()
 
-    # handle string version of cloud paths + local paths
-    if isinstance(destination, (str, os.PathLike)):
-        destination = to_anypath(destination)
 
-    if destination.is_dir():
-        destination = destination / self.name
+class _LazyAttribute:
+    """An instance attribute computed on first access
 
-    if not isinstance(destination, CloudPath):
-        return shutil.copyfile(self, destination)
+    It is stored in the `__dict__` of the instance, which then takes
+    precedence over this (non-data) descriptor, so later accesses cost as
+    much as a plain attribute. Setting it just sets the instance attribute.
+    """
 
-    else:
-        return destination.upload_from(
-            self, force_overwrite_to_cloud=force_overwrite_to_cloud
-        )
+    def __init__(self, compute: Callable[[Any], Any]):
+        self.compute = compute
 
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
 
-def _copytree(
-    self,
-    destination: str | os.PathLike | CloudPath,
-    follow_symlinks: bool = True,  # not used  # noqa
-    force_overwrite_to_cloud: bool | None = None,
-    ignore: Callable[[str, Iterable[str]], Container[str]] | None = None,
-):
-    """Recursively copy a directory tree to a destination directory."""
-    if not self.is_dir():
-        raise NotADirectoryError(
-            f"Origin path {self} must be a directory. "
-            "To copy a single file use the method copy."
-        )
+    def __get__(self, obj: Any, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.compute(obj)
+        return value
 
-    # handle string version of cloud paths + local paths
-    if isinstance(destination, (str, os.PathLike)):
-        destination = to_anypath(destination)
 
-    if destination.exists() and destination.is_file():
-        raise FileExistsError(
-            f"Destination path {destination} of copytree must be a directory."
+@register_client_class("gs")
+class GSClient(_GSClient):
+
+    def __init__(
+        self,
+        *args,
+        symlink_cache_ttl: float | None = None,
+        symlink_cache_size: int = 4096,
+        metadata_cache_ttl: float | None = None,
+        metadata_cache_size: int = 4096,
+        metadata_store: str | os.PathLike | MetadataStore | None = None,
+        metrics: bool | Metrics = False,
+        local_cache: int | LocalCacheManager | None = None,
+        delete_batch_size: int = 100,
+        delete_workers: int = 8,
+        stream_reads: bool = False,
+        stream_block_size: int = 1024 * 1024,
+        stream_max_block_size: int = 32 * 1024 * 1024,
+        stream_readahead: bool = True,
+        stream_writes: bool = False,
+        stream_chunk_size: int = 8 * 1024 * 1024,
+        list_shards: int | None = None,
+        list_workers: int = 16,
+        list_ordered: bool = True,
+        composite_upload_threshold: int | None = None,
+        composite_upload_chunk_size: int = 64 * 1024 * 1024,
+        composite_upload_workers: int = 8,
+        sliced_download_threshold: int | None = None,
+        sliced_download_chunk_size: int = 64 * 1024 * 1024,
+        sliced_download_workers: int = 8,
+        **kwargs,
+    ):
+        """Initialize the client
+
+        Args:
+            *args, **kwargs: Arguments passed to `cloudpathlib.GSClient`
+            symlink_cache_ttl: Seconds to remember whether a path is a gcsfuse
+                symlink (and its target). Changes made through this client are
+                reflected immediately; changes made elsewhere may take this long
+                to be seen. None or 0 (the default) to disable the cache.
+            symlink_cache_size: The maximum number of paths to remember
+            metadata_cache_ttl: Seconds to share fetched blob metadata across
+                calls. Within a single call (e.g. `stat()`), each blob is
+                always fetched at most once. None or 0 to disable.
+            metadata_cache_size: The maximum number of blobs to remember
+            metadata_store: A SQLite file (or a `MetadataStore`) to share the
+                fetched blob metadata, and whether directories exist, across
+                processes. `exists()`, `stat()`, `is_dir()` and the like look
+                it up before asking GCS; changes made through yunpath clients
+                using the same file are reflected immediately, changes made
+                elsewhere may take its TTL (300s by default) to be seen.
+            metrics: Whether to count the public operations of the paths and
+                the requests made to GCS, with their latencies and sizes, in
+                `client.metrics` (a `yunpath.metrics.Metrics`). Pass a
+                `Metrics` to set a hook or to share it between clients.
+            local_cache: The maximum number of bytes of the files cached
+                locally by `open()`, `read_bytes()` and `read_text()`, the
+                least recently used ones removed first; or a
+                `yunpath.filecache.LocalCacheManager` for the LFU policy, or to
+                share the index between processes. Its hits, misses and
+                evictions are in `client.local_cache.stats()`. None for no cap.
+            delete_batch_size: The number of blobs to delete in each batch
+                request when removing a directory, up to 100
+            delete_workers: The number of batch requests to run at a time when
+                removing a directory
+            stream_reads: Whether `open()` in read modes streams the blob with
+                range requests instead of downloading it to the local cache
+                first, when `stream` is not passed to `open()`
+            stream_block_size: The initial size of each range request when
+                streaming a blob
+            stream_max_block_size: The size that range requests grow to when
+                reading sequentially
+            stream_readahead: Whether to fetch the next block in the
+                background when reading sequentially
+            stream_writes: Whether `open()` in write modes (and so
+                `write_bytes()`/`write_text()`) uploads straight to GCS with a
+                resumable upload instead of writing to the local cache first,
+                when `stream` is not passed to `open()`
+            stream_chunk_size: The size of each chunk of a streamed upload, a
+                multiple of 256 KiB
+            list_shards: List directories (`iterdir`, `walk`) in about this
+                many key ranges concurrently, split at points sampled from
+                the key space, when they do not fit in a single page (the
+                first page is then listed again). None to list with page
+                tokens only.
+            list_workers: The number of key ranges listed at a time
+            list_ordered: Whether sharded listings are yielded in key order,
+                or as the pages arrive
+            composite_upload_threshold: Upload files of at least this many
+                bytes as chunks in parallel, composed into the final object.
+                None to always upload files in one stream. Note that
+                composite objects have no md5 hash, only a crc32c.
+            composite_upload_chunk_size: The size of each chunk in bytes
+            composite_upload_workers: The number of chunks to upload at a time
+            sliced_download_threshold: Download blobs of at least this many
+                bytes with concurrent ranged requests. None to always download
+                blobs in one stream.
+            sliced_download_chunk_size: The size of each slice in bytes
+            sliced_download_workers: The number of slices to download at a time
+        """
+        super().__init__(*args, **kwargs)
+        self._symlink_cache = (
+            TTLCache(maxsize=symlink_cache_size, ttl=symlink_cache_ttl)
+            if symlink_cache_ttl
+            else None
+        )
+        self._symlink_index = SymlinkIndex()
+        self._metadata_cache = (
+            TTLCache(maxsize=metadata_cache_size, ttl=metadata_cache_ttl)
+            if metadata_cache_ttl
+            else None
+        )
+        if metadata_store is not None and not isinstance(
+            metadata_store, MetadataStore
+        ):
+            metadata_store = MetadataStore(metadata_store)
+        self.metadata_store = metadata_store
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics: Metrics | None = metrics or None
+        if local_cache is not None and not isinstance(
+            local_cache, LocalCacheManager
+        ):
+            local_cache = LocalCacheManager(local_cache)
+        self.local_cache = local_cache
+        if self.local_cache is not None:
+            # the warm entries left by a previous client
+            self.local_cache.scan(self._local_cache_dir)
+        # the cached files mapped by GSPath.mmap(), replaced before writes
+        self._maps = MapRegistry()
+        if self.metrics is not None:
+            self.metrics.instrument(getattr(self.client, "_http", None))
+        self._blob_scope: ContextVar[dict | None] = ContextVar(
+            f"yunpath_blob_scope_{id(self)}", default=None
+        )
+        self.delete_batch_size = delete_batch_size
+        self.delete_workers = delete_workers
+        self.stream_reads = stream_reads
+        self.stream_block_size = stream_block_size
+        self.stream_max_block_size = stream_max_block_size
+        self.stream_readahead = stream_readahead
+        self.stream_writes = stream_writes
+        self.stream_chunk_size = stream_chunk_size
+        self.list_shards = list_shards
+        self.list_workers = list_workers
+        self.list_ordered = list_ordered
+        self.composite_upload_threshold = composite_upload_threshold
+        self.composite_upload_chunk_size = composite_upload_chunk_size
+        self.composite_upload_workers = composite_upload_workers
+        self.sliced_download_threshold = sliced_download_threshold
+        self.sliced_download_chunk_size = sliced_download_chunk_size
+        self.sliced_download_workers = sliced_download_workers
+
+    def index_symlinks(self, cloud_path: str | _GSPath) -> int:
+        """Index the gcsfuse symlinks under a bucket or prefix.
+
+        The prefix is listed once with only the names and metadata of the
+        objects requested. After that, `is_symlink`, `readlink` and `resolve`
+        answer for paths under the prefix from memory. Symlinks created or
+        removed through this client keep the index up to date; call it again
+        (or `refresh_symlink_index`) to pick up changes made elsewhere.
+
+        Args:
+            cloud_path: The bucket or prefix to index, e.g. `gs://bucket/data`
+
+        Returns:
+            The number of symlinks found
+        """
+        if not isinstance(cloud_path, _GSPath):
+            cloud_path = self.CloudPath(cloud_path)
+        return self._symlink_index.build(
+            self.client, cloud_path.bucket, cloud_path.blob
         )
 
-    contents = list(self.iterdir())
+    def refresh_symlink_index(self, cloud_path: str | _GSPath | None = None) -> int:
+        """Re-list a prefix under the index, or all indexed prefixes if None
 
-    if ignore is not None:
-        ignored_names = ignore(self, [x.name for x in contents])
-    else:
-        ignored_names = set()
+        Returns:
+            The number of symlinks found
+        """
+        if cloud_path is not None:
+            return self.index_symlinks(cloud_path)
+        return self._symlink_index.refresh(self.client)
 
-    destination.mkdir(parents=True, exist_ok=True)
+    def _get_symlink_target(self, cloud_path: _GSPath) -> str | None:
+        """Get the raw gcsfuse symlink target of a path, None if not a symlink"""
+        if not cloud_path.blob:
+            # root bucket
+            return None
 
-    for subpath in contents:
-        if subpath.name in ignored_names:
-            continue
-        if subpath.is_file():
-            subpath.copy(
-                destination / subpath.name,
-                force_overwrite_to_cloud=force_overwrite_to_cloud,
+        if self._symlink_index.covers(cloud_path.bucket, cloud_path.blob):
+            return self._symlink_index.lookup(cloud_path.bucket, cloud_path.blob)
+
+        key = f"{cloud_path.bucket}/{cloud_path.blob}"
+        if self._symlink_cache is not None:
+            target = self._symlink_cache.get(key, False)
+            if target is not False:
+                return target
+
+        blob = self._get_blob(cloud_path.bucket, cloud_path.blob)
+        target = None
+        if blob and isinstance(blob.metadata, dict):
+            target = blob.metadata.get("gcsfuse_symlink_target")
+
+        if self._symlink_cache is not None:
+            self._symlink_cache.set(key, target)
+        return target
+
+    @contextmanager
+    def _operation(self, name: str | None = None) -> Iterator[None]:
+        """Fetch each blob at most once within a public operation
+
+        Nested operations share the blobs fetched by the outermost one, which
+        is the only one counted in the metrics.
+        """
+        if self._blob_scope.get() is not None:
+            yield
+            return
+
+        token = self._blob_scope.set({})
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._blob_scope.reset(token)
+            if self.metrics is not None and name is not None:
+                self.metrics.record(
+                    MetricEvent(
+                        "operation", name, time.perf_counter() - start, error
+                    )
+                )
+
+    def _metered(self, name: str, iterator: Iterator) -> Iterator:
+        """Count an iterator as an operation, once it is exhausted or closed"""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield from iterator
+        except GeneratorExit:
+            raise
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.metrics.record(
+                MetricEvent("operation", name, time.perf_counter() - start, error)
             )
-        elif subpath.is_dir():
-            # Simply join the subdirectory name to the destination
-            # The trailing slash handling is done by the path join operation
-            subpath.copytree(
-                destination / subpath.name.rstrip("/"),
-                force_overwrite_to_cloud=force_overwrite_to_cloud,
-                ignore=ignore,
+
+    def _get_blob(self, bucket: str, name: str) -> Any:
+        """Get a blob with its metadata, None if it does not exist"""
+        key = f"{bucket}/{name}"
+        scope = self._blob_scope.get()
+        if scope is not None and key in scope:
+            return scope[key]
+
+        blob = _NOT_FETCHED
+        if self._metadata_cache is not None:
+            blob = self._metadata_cache.get(key, _NOT_FETCHED)
+        if blob is _NOT_FETCHED and self.metadata_store is not None:
+            resource = self.metadata_store.get(bucket, name)
+            if resource is not MISSING:
+                blob = None
+                if resource is not None:
+                    blob = self.client.bucket(bucket).blob(name)
+                    blob._set_properties(resource)
+                if self._metadata_cache is not None:
+                    self._metadata_cache.set(key, blob)
+        if blob is _NOT_FETCHED:
+            blob = self.client.bucket(bucket).get_blob(name)
+            if self._metadata_cache is not None:
+                self._metadata_cache.set(key, blob)
+            if self.metadata_store is not None:
+                self.metadata_store.set(
+                    bucket,
+                    name,
+                    None if blob is None else blob._properties,
+                    None if blob is None else blob.generation,
+                )
+
+        if scope is not None:
+            scope[key] = blob
+        return blob
+
+    def _get_metadata(self, cloud_path: _GSPath) -> dict[str, Any] | None:
+        blob = self._get_blob(cloud_path.bucket, cloud_path.blob)
+        if blob is None:
+            return None
+
+        return {
+            "etag": blob.etag,
+            "size": blob.size,
+            "updated": blob.updated,
+            "content_type": blob.content_type,
+            "md5_hash": blob.md5_hash,
+        }
+
+    def _invalidate(self, cloud_path: _GSPath, recursive: bool = False) -> None:
+        """Forget what is cached about a path (and everything under it if
+        recursive), after it is changed through this client"""
+        self._symlink_index.discard(cloud_path.bucket, cloud_path.blob, recursive)
+
+        # the path itself and its directory placeholder
+        key = f"{cloud_path.bucket}/{cloud_path.blob}".rstrip("/")
+        for cache in (self._symlink_cache, self._metadata_cache):
+            if cache is None:
+                continue
+            cache.pop(key)
+            cache.pop(key + "/")
+            if recursive:
+                cache.pop_prefix(key + "/")
+
+        if self.metadata_store is not None:
+            self.metadata_store.invalidate(
+                cloud_path.bucket, cloud_path.blob, recursive
             )
 
-    return destination
+        scope = self._blob_scope.get()
+        if scope is not None:
+            for k in [
+                k
+                for k in scope
+                if k in (key, key + "/") or (recursive and k.startswith(key + "/"))
+            ]:
+                del scope[k]
 
+    def _upload_file(self, local_path, cloud_path: _GSPath) -> _GSPath:
+        try:
+            size = os.path.getsize(local_path)
+            if (
+                self.composite_upload_threshold is None
+                or size < self.composite_upload_threshold
+                or size <= self.composite_upload_chunk_size
+            ):
+                return super()._upload_file(local_path, cloud_path)
+
+            content_type = None
+            if self.content_type_method is not None:
+                content_type, _ = self.content_type_method(str(local_path))
+            transfer.composite_upload(
+                self.client,
+                cloud_path.bucket,
+                cloud_path.blob,
+                local_path,
+                chunk_size=self.composite_upload_chunk_size,
+                max_workers=self.composite_upload_workers,
+                content_type=content_type,
+                **self.blob_kwargs,
+            )
+            return cloud_path
+        finally:
+            self._invalidate(cloud_path)
+
+    def clear_cache(self):
+        """Clear the local cache directory, and the index of its cap"""
+        super().clear_cache()
+        if self.local_cache is not None:
+            self.local_cache.clear()
+
+    def _download_file(self, cloud_path: _GSPath, local_path) -> Path:
+        # download next to the file, then move it in place, so that the
+        # readers and the maps of the previous version (even in other
+        # processes) never see a partial or truncated file
+        local_path = Path(local_path)
+        partial = _partial_path(local_path)
+        try:
+            self._download_to(cloud_path, partial)
+            os.replace(partial, local_path)
+        finally:
+            if partial.exists():
+                partial.unlink()
+        return local_path
+
+    def _download_to(self, cloud_path: _GSPath, local_path: Path) -> None:
+        if (
+            self.sliced_download_threshold is None
+            or self.download_chunks_concurrently_kwargs is not None
+        ):
+            super()._download_file(cloud_path, local_path)
+            return
 
-PurePath.rmtree = _rmtree
-PurePath.copy = _copy
-PurePath.copytree = _copytree
-PurePath.fspath = property(lambda self: str(self))
+        # always fresh, the slices are pinned to its generation
+        blob = self.client.bucket(cloud_path.bucket).get_blob(cloud_path.blob)
+        if blob is None:
+            raise FileNotFoundError(f"No such file: {cloud_path}")
 
+        if (blob.size or 0) < max(
+            self.sliced_download_threshold, self.sliced_download_chunk_size + 1
+        ):
+            blob.download_to_filename(local_path, **self.blob_kwargs)
+        else:
+            transfer.sliced_download(
+                blob,
+                local_path,
+                chunk_size=self.sliced_download_chunk_size,
+                max_workers=self.sliced_download_workers,
+                **self.blob_kwargs,
+            )
 
-@register_client_class("gs")
-class GSClient(_GSClient):
+    def _move_file(
+        self, src: _GSPath, dst: _GSPath, remove_src: bool = True
+    ) -> _GSPath:
+        """Copy or move a blob server-side with the rewrite API
 
-    def _is_file_or_dir(self, cloud_path: _GSPath) -> str | None:
-        """Check if a path is a file or a directory"""
-        out = super()._is_file_or_dir(cloud_path)
-        if out is not None and out != "file":
-            return out
+        Unlike `copy_blob`, rewrite works for objects of any size across
+        locations and storage classes, by calling it until it is done. The
+        metadata (thus the gcsfuse symlink target) is copied along.
+        """
+        if src == dst:
+            # just a touch
+            try:
+                return super()._move_file(src, dst, remove_src=remove_src)
+            finally:
+                self._invalidate(dst)
+
+        target = self._symlink_index.lookup(src.bucket, src.blob)
+        try:
+            src_blob = self.client.bucket(src.bucket).blob(src.blob)
+            dst_blob = self.client.bucket(dst.bucket).blob(dst.blob)
+            token, _, _ = dst_blob.rewrite(src_blob, **self.blob_kwargs)
+            while token is not None:
+                token, _, _ = dst_blob.rewrite(
+                    src_blob, token=token, **self.blob_kwargs
+                )
+
+            if remove_src:
+                src_blob.delete(**self.blob_kwargs)
+        finally:
+            self._invalidate(dst)
+            if remove_src:
+                self._invalidate(src)
+
+        if target is not None:
+            self._symlink_index.set(dst.bucket, dst.blob, target)
+        return dst
+
+    def _remove(self, cloud_path: _GSPath, missing_ok: bool = True) -> None:
+        try:
+            file_or_dir = self._is_file_or_dir(cloud_path)
+            bucket = self.client.bucket(cloud_path.bucket)
+            if file_or_dir == "file":
+                # no need to fetch the blob again to delete it
+                bucket.delete_blob(cloud_path.blob, **self.blob_kwargs)
+            elif file_or_dir == "dir":
+                self._remove_dir(cloud_path)
+            elif not missing_ok:
+                raise FileNotFoundError(f"File does not exist: {cloud_path}")
+        finally:
+            self._invalidate(cloud_path, recursive=True)
+
+    def _remove_dir(self, cloud_path: _GSPath) -> None:
+        """Remove everything under a directory with batched deletions
+
+        The prefix is listed once. The files are deleted first, then the
+        `prefix/` placeholders, deepest first, so a directory never looks
+        empty while it still has contents.
+        """
+        prefix = cloud_path.blob.rstrip("/") + "/" if cloud_path.blob else ""
+        files = []
+        placeholders: dict[int, list[str]] = {}
+        for blob in self.client.bucket(cloud_path.bucket).list_blobs(
+            prefix=prefix or None, fields="items(name),nextPageToken"
+        ):
+            if blob.name.endswith("/"):
+                placeholders.setdefault(blob.name.count("/"), []).append(blob.name)
+            else:
+                files.append(blob.name)
+
+        for names in [files] + [
+            placeholders[depth] for depth in sorted(placeholders, reverse=True)
+        ]:
+            transfer.delete_blobs(
+                self.client,
+                cloud_path.bucket,
+                names,
+                batch_size=self.delete_batch_size,
+                max_workers=self.delete_workers,
+                **self.blob_kwargs,
+            )
+
+    def list_blobs(
+        self,
+        cloud_path: str | _GSPath,
+        shards: int | None = None,
+        hints: Iterable[str] | None = None,
+        ordered: bool | None = None,
+        max_workers: int | None = None,
+        **list_kwargs: Any,
+    ) -> Iterator[Any]:
+        """List all the blobs under a bucket or prefix, in key ranges
+        listed concurrently
+
+        Args:
+            cloud_path: The bucket or prefix to list, e.g. `gs://bucket/data`
+            shards: The number of key ranges to sample,
+                `GSClient(list_shards=...)` (or 16) if None
+            hints: The keys (relative to the prefix) to split the key space
+                at, instead of sampling it
+            ordered: Whether to yield the blobs in key order,
+                `GSClient(list_ordered=...)` if None
+            max_workers: The number of key ranges listed at a time,
+                `GSClient(list_workers=...)` if None
+            **list_kwargs: Extra arguments for `list_blobs`, e.g. fields
+
+        Yields:
+            The blobs
+        """
+        if not isinstance(cloud_path, _GSPath):
+            cloud_path = self.CloudPath(cloud_path)
+        prefix = cloud_path.blob.rstrip("/") + "/" if cloud_path.blob else ""
+        for _, blob in listing.sharded_list(
+            self.client.bucket(cloud_path.bucket),
+            prefix,
+            shards=shards or self.list_shards or 16,
+            hints=hints,
+            max_workers=max_workers or self.list_workers,
+            ordered=self.list_ordered if ordered is None else ordered,
+            **list_kwargs,
+        ):
+            yield blob
+
+    def _iter_blobs(
+        self,
+        bucket: str,
+        prefix: str,
+        delimiter: str | None = None,
+        **list_kwargs: Any,
+    ) -> Iterator[tuple[str, Any]]:
+        """List a prefix, sharded if `list_shards` is set and it does not fit
+        in a page
+
+        Yields:
+            Tuples of the name and the blob, or the name and None for the
+            prefixes (with a delimiter)
+        """
+        bkt = self.client.bucket(bucket)
+        iterator = bkt.list_blobs(
+            prefix=prefix or None, delimiter=delimiter, **list_kwargs
+        )
+        pages = iterator.pages
+        if self.list_shards:
+            # a listing of a single page takes a single request, the sampling
+            # only pays off for the larger ones
+            first = next(pages, None)
+            if first is not None and iterator.next_page_token:
+                yield from listing.sharded_list(
+                    bkt,
+                    prefix,
+                    delimiter=delimiter,
+                    shards=self.list_shards,
+                    max_workers=self.list_workers,
+                    ordered=self.list_ordered,
+                    **list_kwargs,
+                )
+                return
+            pages = iter(() if first is None else (first,))
+
+        for page in pages:
+            for blob in page:
+                yield blob.name, blob
+            for name in page.prefixes:
+                yield name, None
+
+    def _list_dir(self, cloud_path: _GSPath, recursive: bool = False):
+        if recursive or not cloud_path.bucket:
+            for path, is_dir in super()._list_dir(cloud_path, recursive=recursive):
+                # the `prefix/` placeholders created by GSPath.mkdir are
+                # directories
+                yield path, is_dir or path.blob.endswith("/")
+            return
 
+        prefix = cloud_path.blob.rstrip("/") + "/" if cloud_path.blob else ""
+        base = f"{cloud_path.cloud_prefix}{cloud_path.bucket}/"
+        for name, blob in self._iter_blobs(cloud_path.bucket, prefix, "/"):
+            yield (
+                GSPath._from_listing(self, base, name),
+                blob is None or name.endswith("/"),
+            )
+
+    def _scandir(self, cloud_path: _GSPath) -> Iterator[GSDirEntry]:
+        """List a directory level, keeping the blobs of the listing"""
+        if not cloud_path.bucket:
+            for bucket in self.client.list_buckets():
+                yield GSDirEntry(
+                    self.CloudPath(f"{cloud_path.cloud_prefix}{bucket.name}")
+                )
+            return
+
+        prefix = cloud_path.blob.rstrip("/") + "/" if cloud_path.blob else ""
+        base = f"{cloud_path.cloud_prefix}{cloud_path.bucket}/"
+        iterator = self.client.bucket(cloud_path.bucket).list_blobs(
+            prefix=prefix or None, delimiter="/"
+        )
+        for page in iterator.pages:
+            for blob in page:
+                # the placeholder of the directory itself
+                if blob.name != prefix:
+                    yield GSDirEntry(
+                        GSPath._from_listing(self, base, blob.name), blob
+                    )
+            for subdir in page.prefixes:
+                yield GSDirEntry(GSPath._from_listing(self, base, subdir))
+
+    def _list_tree(
+        self, cloud_path: _GSPath
+    ) -> dict[str, tuple[dict[str, None], list[str]]]:
+        """List everything under a directory at once, as a tree
+
+        Returns:
+            A dict of the directories relative to `cloud_path` (`""` for
+            itself, `"a/b/"` for a subdirectory) to the names of their
+            subdirectories (an ordered dict) and of their files. The `prefix/`
+            placeholders make directories of their own.
+        """
+        prefix = cloud_path.blob.rstrip("/") + "/" if cloud_path.blob else ""
+        return _build_tree(
+            prefix,
+            (
+                name
+                for name, _ in self._iter_blobs(
+                    cloud_path.bucket, prefix, fields="items(name),nextPageToken"
+                )
+            ),
+        )
+
+    def _dir_exists(self, cloud_path: _GSPath) -> bool:
+        """Check if anything is under a path (placeholder included)"""
         prefix = cloud_path.blob.rstrip("/") + "/"
-        placeholder_blob = self.client.bucket(cloud_path.bucket).get_blob(prefix)
-        if placeholder_blob is not None:  # pragma: no cover
+        blobs = self.client.bucket(cloud_path.bucket).list_blobs(
+            max_results=1, prefix=prefix, fields="items(name),nextPageToken"
+        )
+        return any(True for _ in blobs)
+
+    def _is_file_or_dir(self, cloud_path: _GSPath) -> str | None:
+        """Check if a path is a file or a directory
+
+        Directories also include the ones with only a `prefix/` placeholder,
+        which is what `GSPath.mkdir` creates.
+        """
+        # short-circuit the root-level bucket
+        if not cloud_path.blob:
             return "dir"
 
-        return out
+        prefix = cloud_path.blob.rstrip("/") + "/"
+        if self._get_blob(cloud_path.bucket, cloud_path.blob) is not None:
+            if cloud_path.blob == prefix:
+                return "dir"
+            # a directory placeholder with the same name takes precedence
+            if self._get_blob(cloud_path.bucket, prefix) is not None:
+                return "dir"
+            return "file"
+
+        # not a file, see if it is a directory (placeholder included)
+        present = MISSING
+        if self.metadata_store is not None:
+            present = self.metadata_store.get_dir(cloud_path.bucket, prefix)
+        if present is MISSING:
+            blobs = self.client.bucket(cloud_path.bucket).list_blobs(
+                max_results=1, prefix=prefix, fields="items(name),nextPageToken"
+            )
+            present = any(True for _ in blobs)
+            if self.metadata_store is not None:
+                self.metadata_store.set_dir(cloud_path.bucket, prefix, present)
+        return "dir" if present else None
+
+
+def _build_tree(
+    prefix: str, names: Iterable[str]
+) -> dict[str, tuple[dict[str, None], list[str]]]:
+    """Rebuild the directory tree of the blob names under a prefix, see
+    `GSClient._list_tree`"""
+    tree: dict[str, tuple[dict[str, None], list[str]]] = {"": ({}, [])}
+    for name in names:
+        rel = name[len(prefix) :]
+        parts = [part for part in rel.split("/") if part]
+        if not parts:
+            # the placeholder of the directory itself
+            continue
+
+        dirparts = parts if rel.endswith("/") else parts[:-1]
+        key = ""
+        for part in dirparts:
+            tree[key][0][part] = None
+            key = f"{key}{part}/"
+            if key not in tree:
+                tree[key] = ({}, [])
+
+        if not rel.endswith("/"):
+            tree[key][1].append(parts[-1])
+
+    return tree
+
+
+def _walk_tree(
+    path: GSPath,
+    tree: dict[str, tuple[dict[str, None], list[str]]],
+    top_down: bool = True,
+) -> Iterator[tuple[GSPath, list[str], list[str]]]:
+    """Walk a tree from `_build_tree`, like `pathlib.Path.walk`"""
+    # an explicit stack of directories to yield, or of results whose
+    # subdirectories are walked (bottom-up)
+    stack: list = [(path, "")]
+    while stack:
+        top, key = stack.pop()
+        if isinstance(top, tuple):
+            yield top
+            continue
+
+        dirs, files = tree[key]
+        dirnames = list(dirs)
+        filenames = [name for name in files if name not in dirs]
+        if top_down:
+            yield top, dirnames, filenames
+        else:
+            stack.append(((top, dirnames, filenames), None))
+        stack.extend(
+            (top._child(name), f"{key}{name}/") for name in reversed(dirnames)
+        )
+
+
+def _partial_path(local_path: Path) -> Path:
+    """A file next to a cached file, to move in place once written"""
+    return local_path.with_name(
+        f"{local_path.name}{PARTIAL_SUFFIX}-{os.getpid()}-{threading.get_ident()}"
+    )
+
+
+def _single_fetch(method: Callable) -> Callable:
+    """Decorator to fetch each blob at most once within a call of the method"""
+    name = method.__name__.lstrip("_")
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.client._operation(name):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _metered_iter(method: Callable) -> Callable:
+    """Decorator to count the iterators returned by a method as operations"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        iterator = method(self, *args, **kwargs)
+        if self.client.metrics is None:
+            return iterator
+        return self.client._metered(name, iterator)
+
+    return wrapper
 
 
 def _wrap_follow_symlinks(
@@ -145,6 +840,7 @@ def _wrap_follow_symlinks(
             (0-based, excluding self)
     """
 
+    @_single_fetch
     @functools.wraps(method)
     def wrapper(self, *args, follow_symlinks=True, **kwargs):
         if follow_symlinks:
@@ -177,11 +873,91 @@ def _wrap_follow_symlinks(
 @register_path_class("gs")
 class GSPath(_GSPath):
 
+    # computed on first use, the paths from listings often never need them
+    _url = _LazyAttribute(lambda self: urlparse(self._str))
+    _path = _LazyAttribute(lambda self: PurePosixPath(f"/{self._no_prefix}"))
+    # shared by all the paths of a bucket
+    _bucket = _LazyAttribute(
+        lambda self: sys.intern(self._no_prefix.split("/", 1)[0])
+    )
+    # the trailing slashes do not matter, for __eq__ and __hash__
+    _key = _LazyAttribute(lambda self: self._str.rstrip("/"))
+
+    @classmethod
+    def _from_listing(cls, client: GSClient, base: str, name: str) -> GSPath:
+        """Build a path from a listing, skipping the checks of the constructor
+
+        Args:
+            client: The client of the path
+            base: The url of the directory listed, with a trailing slash,
+                e.g. `gs://bucket/` (the same string for all its entries)
+            name: The name relative to base, e.g. the blob name for a base
+                of the bucket
+        """
+        path = cls.__new__(cls)
+        path.__dict__.update(
+            _handle=None, _client=client, _str=base + name, _dirty=False
+        )
+        return path
+
+    def _child(self, name: str) -> GSPath:
+        """`self / name` for a name from a listing, relative to self"""
+        base = self._str if self._str.endswith("/") else self._str + "/"
+        return self._from_listing(self.client, base, name)
+
+    @property
+    def bucket(self) -> str:
+        return self._bucket
+
+    @_single_fetch
     def mkdir(  # type: ignore[override]
         self,
         parents: bool = False,
         exist_ok: bool = False,
     ):
+        if not self.blob:
+            # the bucket
+            return self._mkdir_recursive(parents=parents, exist_ok=exist_ok)
+
+        # self and its ancestors, deepest first, probed concurrently; a
+        # directory exists once anything is under it, so do its ancestors
+        levels = [self] + [parent for parent in self.parents if parent.blob]
+        with ThreadPoolExecutor(max_workers=len(levels)) as pool:
+            exists = list(pool.map(self.client._dir_exists, levels))
+        existing = exists.index(True) if True in exists else len(levels)
+        if existing == 0:
+            if not exist_ok:
+                raise CloudPathFileExistsError(
+                    f"cannot create directory '{self}': File exists"
+                )
+            return
+
+        missing = levels[:existing]
+        if self.client._get_blob(missing[-1].bucket, missing[-1].blob) is not None:
+            # a file or a symlink in the way
+            return self._mkdir_recursive(parents=parents, exist_ok=exist_ok)
+        if len(missing) > 1 and not parents:
+            if self.parent.exists():
+                # a symlink to a directory
+                return self._mkdir_recursive(parents=parents, exist_ok=exist_ok)
+            raise CloudPathNotExistsError(
+                f"cannot create directory '{self}': No such file or directory"
+            )
+
+        bucket = self.client.client.bucket(self.bucket)
+        with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+            for future in [
+                pool.submit(
+                    bucket.blob(path.blob.rstrip("/") + "/").upload_from_string, ""
+                )
+                for path in missing
+            ]:
+                future.result()
+        for path in missing:
+            self.client._invalidate(path)
+
+    def _mkdir_recursive(self, parents: bool = False, exist_ok: bool = False):
+        """Create the directory level by level, following symlinks"""
         if self.exists():
             if not exist_ok:
                 raise CloudPathFileExistsError(
@@ -203,38 +979,88 @@ class GSPath(_GSPath):
         path = self.blob.rstrip("/") + "/"
         blob = self.client.client.bucket(self.bucket).blob(path)
         blob.upload_from_string("")
+        self.client._invalidate(self)
 
+    @_metered_iter
     def walk(
         self,
         top_down: bool = True,
         on_error: Callable | None = None,
         follow_symlinks: bool = False,
+        lazy: bool = False,
     ):
+        # lazy=False: one flat listing of the whole prefix, the tree is
+        #   rebuilt in memory; the fastest for full walks
+        # lazy=True: one listing per directory level, when visited; pruning
+        #   `dirnames` (top_down) skips listing the pruned subtrees
         if follow_symlinks and self.is_symlink():
             path = self.resolve()
         else:
             path = self
 
-        yield from super(GSPath, path).walk(
-            top_down=top_down, on_error=on_error, follow_symlinks=False
-        )
+        if lazy:
+            yield from path._walk_lazy(top_down=top_down, on_error=on_error)
+            return
+
+        try:
+            tree = self.client._list_tree(path)
+        except Exception as exc:
+            if on_error is None:
+                raise
+            on_error(exc)
+            return
+
+        yield from _walk_tree(path, tree, top_down)
+
+    def _walk_lazy(
+        self,
+        top_down: bool = True,
+        on_error: Callable | None = None,
+    ):
+        """Walk the tree listing each directory level with scandir"""
+        stack: list = [self]
+        while stack:
+            top = stack.pop()
+            if isinstance(top, tuple):
+                yield top
+                continue
+
+            try:
+                entries = list(self.client._scandir(top))
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                on_error(exc)
+                continue
+
+            dirnames = [e.name for e in entries if e.is_dir(follow_symlinks=False)]
+            # a directory placeholder takes precedence over a blob of its name
+            subdirs = set(dirnames)
+            filenames = [
+                e.name
+                for e in entries
+                if not e.is_dir(follow_symlinks=False) and e.name not in subdirs
+            ]
+
+            if top_down:
+                yield top, dirnames, filenames
+            else:
+                stack.append((top, dirnames, filenames))
+            stack.extend(top._child(name) for name in reversed(dirnames))
 
     def __eq__(self, other) -> bool:
+        # a trailing slash does not make a different path, without a network
+        # call to check that it is a directory
+        if self is other:
+            return True
         if not isinstance(other, type(self)):
             return False
-        if str(self) == str(other):
-            return True
-        # Check trailing slash without network call - both should be directories
-        # if one has trailing slash. We check string patterns only.
-        self_str = str(self)
-        other_str = str(other)
-        if self_str.rstrip("/") == other_str.rstrip("/"):
-            # If either has a trailing slash, consider them equal
-            # (assuming directory paths)
-            if self_str.endswith("/") or other_str.endswith("/"):
-                return True
-        return False
+        return self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
 
+    @_metered_iter
     def iterdir(self):
         """Iterate over the directory entries"""
         if self.is_symlink():
@@ -255,6 +1081,190 @@ class GSPath(_GSPath):
             else:
                 yield f
 
+    @_metered_iter
+    def glob(
+        self,
+        pattern: str | os.PathLike,
+        case_sensitive: bool | None = None,
+        recurse_symlinks: bool = True,
+    ) -> Iterator[GSPath]:
+        yield from self._glob_pushdown(pattern, case_sensitive, recursive=False)
+
+    @_metered_iter
+    def rglob(
+        self,
+        pattern: str | os.PathLike,
+        case_sensitive: bool | None = None,
+        recurse_symlinks: bool = True,
+    ) -> Iterator[GSPath]:
+        yield from self._glob_pushdown(pattern, case_sensitive, recursive=True)
+
+    def _glob_pushdown(
+        self,
+        pattern: str | os.PathLike,
+        case_sensitive: bool | None,
+        recursive: bool,
+    ) -> Iterator[GSPath]:
+        """Glob with the listing narrowed down server-side
+
+        Only the blobs under the longest literal prefix of the pattern are
+        listed; with subdirectories in the pattern, they are also filtered
+        by GCS with `match_glob`. The exact matches are then selected as
+        `CloudPath.glob` does.
+        """
+        parts = PurePosixPath(self._glob_checks(pattern)).parts
+        if recursive:
+            parts = ("**",) + parts
+        base = self.blob.rstrip("/") + "/" if self.blob else ""
+        match_glob = globbing.to_match_glob(base, parts)
+        if match_glob is None or case_sensitive is False:
+            # GCS cannot express it, or matches case-sensitively only
+            method = super().rglob if recursive else super().glob
+            yield from method(pattern, case_sensitive=case_sensitive)
+            return
+
+        prefix = globbing.literal_prefix(base, parts)
+        if len(parts) == 1 and parts[0] != "**":
+            # a single level, listed with the directories as prefixes
+            listed = self.client._iter_blobs(self.bucket, prefix, "/")
+        else:
+            listed = self.client._iter_blobs(
+                self.bucket,
+                prefix,
+                match_glob=match_glob,
+                fields="items(name),nextPageToken",
+            )
+
+        # the tree of the listed blobs, None for the files, dicts for the
+        # directories, which take precedence over blobs of the same name
+        tree: dict = {}
+        for name, blob in listed:
+            is_dir = blob is None or name.endswith("/")
+            rel = [part for part in name[len(base) :].split("/") if part]
+            if not rel:
+                continue
+            node = tree
+            for part in rel[:-1]:
+                if node.get(part) is None:
+                    node[part] = {}
+                node = node[part]
+            if is_dir and node.get(rel[-1]) is None:
+                node[rel[-1]] = {}
+            elif not is_dir:
+                node.setdefault(rel[-1], None)
+
+        selector = _make_selector(
+            tuple(parts), _posix_flavour, case_sensitive=case_sensitive
+        )
+        root = _CloudPathSelectable(self.name, [], tree)
+        for path in selector.select_from(root):
+            # select_from returns self.name/... so strip before joining
+            yield self._child(str(path)[len(self.name) + 1 :])
+
+    def scandir(self) -> ScandirIterator:
+        """Iterate over the entries of the directory, like `os.scandir()`
+
+        The entries carry their type, size, mtime and gcsfuse symlink target
+        from the listing, see `yunpath.direntry.GSDirEntry`.
+        """
+        if self.is_symlink():
+            path = self.resolve()
+        else:
+            path = self
+
+        return ScandirIterator(self.client._scandir(path))
+
+    @_metered_iter
+    def iter_table(
+        self,
+        recursive: bool = True,
+        fields: Sequence[str] | None = None,
+        format: str = "numpy",
+        chunk_size: int = 100_000,
+    ) -> Iterator[Any]:
+        """List the files under the directory into columnar chunks
+
+        The listing pages are read straight into the columns, without a
+        `GSPath` per blob, and only the properties the fields need are
+        requested. At most `chunk_size` rows are held at a time.
+
+        Args:
+            recursive: Whether to list the whole tree, or only the files
+                directly in the directory
+            fields: The columns, some of `yunpath.table.FIELDS` (`name`,
+                `size`, `updated`, `crc32c`, `generation`, `is_symlink`),
+                all of them by default
+            format: `numpy` for structured arrays, `arrow` for
+                `pyarrow.RecordBatch`es, `dict` for dicts of lists
+            chunk_size: The maximum number of rows of a chunk
+
+        Yields:
+            The chunks, with the names relative to the directory
+        """
+        return self._iter_table(recursive, fields, format, chunk_size)
+
+    def _iter_table(
+        self,
+        recursive: bool,
+        fields: Sequence[str] | None,
+        format: str,
+        chunk_size: int = 100_000,
+    ) -> Iterator[Any]:
+        fields = table.check_fields(fields, format)
+        path = self.resolve() if self.is_symlink() else self
+        prefix = path.blob.rstrip("/") + "/" if path.blob else ""
+        listed = self.client._iter_blobs(
+            path.bucket,
+            prefix,
+            None if recursive else "/",
+            fields=table.listing_fields(fields),
+        )
+        return table.iter_table(
+            listed, prefix, fields=fields, format=format, chunk_size=chunk_size
+        )
+
+    @_single_fetch
+    def list_table(
+        self,
+        recursive: bool = True,
+        fields: Sequence[str] | None = None,
+        format: str = "numpy",
+    ) -> Any:
+        """List the files under the directory into a single table
+
+        See `iter_table` for the arguments, and to bound the memory.
+
+        Returns:
+            A NumPy structured array, a `pyarrow.Table` or a dict of lists,
+            e.g. `table[table["size"] > 2**20]["name"]` for the files over
+            1MiB with NumPy
+        """
+        return table.concat(self._iter_table(recursive, fields, format), fields, format)
+
+    def _refresh_cache(self, force_overwrite_from_cloud: bool | None = None) -> None:
+        """Download the blob to the local cache if it is missing or stale,
+        recording the access for the cap of the cache"""
+        manager = self.client.local_cache
+        if manager is None:
+            return super()._refresh_cache(force_overwrite_from_cloud)
+
+        local = self._local
+        try:
+            before = local.stat().st_mtime_ns
+        except FileNotFoundError:
+            before = None
+        manager.reserve(local)
+        super()._refresh_cache(force_overwrite_from_cloud)
+        try:
+            after = local.stat().st_mtime_ns
+        except FileNotFoundError:
+            # nothing in the cloud
+            manager.forget(local)
+            return
+        # a download sets the mtime of the file to the one of the blob
+        manager.access(local, hit=before is not None and before == after)
+
+    @_single_fetch
     def stat(self, follow_symlinks: bool = True) -> os.stat_result:
         """Return the stat result for the path"""
         if follow_symlinks and self.is_symlink():
@@ -262,75 +1272,41 @@ class GSPath(_GSPath):
         else:
             path = self
 
-        meta = path.client._get_metadata(path)
-
-        # check if there is updated in the real metadata
-        # if so, use it as mtime
-        bucket = path.client.client.bucket(path.bucket)
-        blob = bucket.get_blob(path.blob)
-        if blob and blob.metadata and "updated" in blob.metadata:  # pragma: no cover
-            updated = blob.metadata["updated"]
-            if isinstance(updated, str):
-                updated = datetime.fromisoformat(updated)
-            meta["updated"] = updated
-
-        if meta is None:
+        blob = path.client._get_blob(path.bucket, path.blob)
+        if blob is None:
             raise NoStatError(
                 f"No stats available for {path}; it may be a directory or not exist."
             )
 
-        try:
-            mtime = meta["updated"].timestamp()
-        except KeyError:  # pragma: no cover
-            mtime = 0
-
-        return os.stat_result(
-            (  # type: ignore[arg-type]
-                None,  # mode
-                None,  # ino
-                path.cloud_prefix,  # dev,
-                None,  # nlink,
-                None,  # uid,
-                None,  # gid,
-                meta.get("size", 0),  # size,
-                None,  # atime,
-                mtime,  # mtime,
-                None,  # ctime,
-            )
-        )
+        return blob_stat(blob, path.cloud_prefix)
 
+    @_single_fetch
     def is_symlink(self) -> bool:
         """Check if it is a gcsfuse created symlink"""
-        if not self.blob:
-            # root bucket
-            return False
-
-        blob = self.client.client.bucket(self.bucket).get_blob(self.blob)
-        return (
-            blob
-            and blob.metadata
-            and isinstance(blob.metadata, dict)
-            and "gcsfuse_symlink_target" in blob.metadata
-        )
+        return self.client._get_symlink_target(self) is not None
 
+    @_single_fetch
     def readlink(self) -> GSPath:
         """Read the target of a gcsfuse created symlink"""
-        if not self.is_symlink():
+        target = self.client._get_symlink_target(self)
+        if target is None:
             raise OSError(f"{self} is not a symlink")
 
-        blob = self.client.client.bucket(self.bucket).get_blob(self.blob)
-        assert blob is not None and blob.metadata is not None  # for mypy
-        target = blob.metadata["gcsfuse_symlink_target"]
         if target.startswith("gs://"):
             return GSPath(target, client=self.client)
         return self.parent / target
 
+    @_single_fetch
     def resolve(self, strict: bool = False) -> GSPath:
         """Make the path absolute, resolving any symlinks.
 
         If strict is True, raise an exception if the path doesn't exist.
+
+        Whether each ancestor is a symlink is looked up through the client's
+        symlink cache, so resolving paths under the same directory repeatedly
+        does not hit GCS once per path component.
         """
-        if not self.exists(follow_symlinks=False) and strict:
+        if strict and not self.exists(follow_symlinks=False):
             raise CloudPathNotExistsError(f"Path {self} does not exist.")
 
         allparts = list(self.parts)
@@ -341,11 +1317,12 @@ class GSPath(_GSPath):
         while not resolved and iterations < max_iterations:
             iterations += 1
             resolved = True
-            parts = ["gs://"]
+            key = ""
 
             for i, part in enumerate(allparts[1:], start=1):
-                parts.append(part)
-                current_path = GSPath(*parts, client=self.client)
+                key = f"{key}/{part}" if key else part
+                # the ancestors are built from strings, not joined
+                current_path = GSPath._from_listing(self.client, "gs://", key)
 
                 if current_path.is_symlink():
                     target = current_path.readlink()
@@ -359,6 +1336,7 @@ class GSPath(_GSPath):
 
         return GSPath(*allparts, client=self.client)
 
+    @_single_fetch
     def symlink_to(self, target: str | os.PathLike | CloudPath) -> GSPath:
         """Create a gcsfuse compatible symlink to target named self."""
         if self.exists(follow_symlinks=False):
@@ -370,9 +1348,12 @@ class GSPath(_GSPath):
         metadata = {"gcsfuse_symlink_target": str(target)}
         blob.metadata = metadata
         blob.upload_from_string("")
+        self.client._invalidate(self)
+        self.client._symlink_index.set(self.bucket, self.blob, str(target))
 
         return self
 
+    @_single_fetch
     def unlink(self, missing_ok: bool = True) -> None:
         if self.is_dir(follow_symlinks=False):
             raise CloudPathIsADirectoryError(
@@ -380,6 +1361,324 @@ class GSPath(_GSPath):
             )
         self.client._remove(self, missing_ok)
 
+    def _copy(
+        self,
+        target: str | os.PathLike | CloudPath,
+        follow_symlinks: bool = True,
+        preserve_metadata: bool = False,
+        force_overwrite_to_cloud: bool | None = None,
+        remove_src: bool = False,
+    ):
+        """Copy or move to target, server-side if target is also a GSPath"""
+        destination = to_anypath(target)
+        if not isinstance(destination, _GSPath):
+            return super()._copy(
+                destination,
+                follow_symlinks=follow_symlinks,
+                preserve_metadata=preserve_metadata,
+                force_overwrite_to_cloud=force_overwrite_to_cloud,
+                remove_src=remove_src,
+            )
+
+        if not self.exists(follow_symlinks=False):
+            raise ValueError(f"Path {self} must exist to copy.")
+
+        if self.is_dir(follow_symlinks=False):
+            result = self.copytree(
+                destination,
+                follow_symlinks=False,
+                force_overwrite_to_cloud=force_overwrite_to_cloud,
+            )
+            if remove_src:
+                self.rmtree(follow_symlinks=False)
+            return result
+
+        if destination.exists() and destination.is_dir():
+            destination = destination / self.name
+
+        return self._copy_object(
+            destination,
+            force_overwrite_to_cloud=force_overwrite_to_cloud,
+            remove_src=remove_src,
+        )
+
+    def _copy_object(
+        self,
+        destination: GSPath,
+        force_overwrite_to_cloud: bool | None = None,
+        remove_src: bool = False,
+    ) -> GSPath:
+        """Copy or move the blob of self to destination without downloading it
+
+        A symlink is copied as a symlink, since its metadata is copied along.
+        """
+        if force_overwrite_to_cloud is None:
+            force_overwrite_to_cloud = os.environ.get(
+                "CLOUDPATHLIB_FORCE_OVERWRITE_TO_CLOUD", "False"
+            ).lower() in ["1", "true"]
+
+        if not force_overwrite_to_cloud:
+            try:
+                newer = (
+                    destination.stat(follow_symlinks=False).st_mtime
+                    >= self.stat(follow_symlinks=False).st_mtime
+                )
+            except NoStatError:
+                newer = False
+            if newer:
+                raise OverwriteNewerCloudError(
+                    f"File ({destination}) is newer than ({self}). "
+                    "To overwrite pass `force_overwrite_to_cloud=True`."
+                )
+
+        if self.client is destination.client:
+            return self.client._move_file(self, destination, remove_src=remove_src)
+
+        from google.api_core.exceptions import Forbidden
+
+        try:
+            out = destination.client._move_file(
+                self, destination, remove_src=remove_src
+            )
+        except Forbidden:
+            # the client of destination cannot read self, go through local
+            out = destination.upload_from(self.fspath, force_overwrite_to_cloud=True)
+            if remove_src:
+                self.unlink()
+        else:
+            self.client._invalidate(self)
+        return out
+
+    def _copytree(
+        self,
+        destination: str | os.PathLike | CloudPath,
+        force_overwrite_to_cloud: bool | None = None,
+        ignore: Callable[[str, Iterable[str]], Container[str]] | None = None,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+        progress: Callable[[Any, int, int], Any] | None = None,
+    ):
+        """Copy self to a directory, if self is a directory.
+
+        The tree is listed up front, then the files are copied with
+        `max_workers` threads (or the given `executor`).
+        See `yunpath.transfer.copytree`.
+        """
+        if not self.is_dir():
+            raise CloudPathNotADirectoryError(
+                f"Origin path {self} must be a directory. "
+                "To copy a single file use the method copy."
+            )
+
+        destination = to_anypath(destination)
+        if destination.exists() and destination.is_file():
+            raise CloudPathFileExistsError(
+                f"Destination path {destination} of copytree must be a directory."
+            )
+
+        return transfer.copytree(
+            self,
+            destination,
+            force_overwrite_to_cloud=force_overwrite_to_cloud,
+            ignore=ignore,
+            max_workers=max_workers,
+            executor=executor,
+            progress=progress,
+        )
+
+    def _map(self) -> mmap.mmap | None:
+        """Map the blob from the local cache, None if it is empty"""
+        if not self.exists():
+            raise CloudPathFileNotFoundError(f"File does not exist: {self}")
+        if not self.is_file():
+            raise CloudPathIsADirectoryError(f"Cannot map a directory: {self}")
+
+        self._refresh_cache()
+        local = self._local
+        with open(local, "rb") as fh:
+            if not os.fstat(fh.fileno()).st_size:
+                return None
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self.client._maps.add(local, mapped)
+        if self.client.local_cache is not None:
+            self.client.local_cache.pin(local, mapped)
+        return mapped
+
+    def _mmap(self) -> mmap.mmap:
+        """Map the file read-only, without a copy
+
+        The blob is downloaded to the local cache first if it is missing or
+        stale, like `read_bytes()` does, then mapped, e.g. for
+        `numpy.frombuffer(path.mmap(), dtype=...)`. With a cap on the local
+        cache (`GSClient(local_cache=...)`), the file is not evicted while
+        the map is open. A newer version downloaded or written later through
+        this process replaces the file instead of overwriting it, so the map
+        keeps its content.
+
+        Raises:
+            ValueError: If the file is empty, which cannot be mapped
+        """
+        mapped = self._map()
+        if mapped is None:
+            raise ValueError(f"Cannot map an empty file: {self}")
+        return mapped
+
+    def _read_buffer(self) -> memoryview:
+        """The content of the file as a read-only memoryview, without a copy
+
+        See `mmap()`; the file stays mapped while the memoryview (or a
+        buffer made from it) is alive, or until it is released.
+        """
+        mapped = self._map()
+        return memoryview(b"") if mapped is None else memoryview(mapped)
+
+    def _detach_local(self, keep_content: bool) -> None:
+        """Replace the cached file with a new one before writing to it if it
+        is mapped in this process, so that the maps are not truncated or
+        changed; with its mtime, so that it is not downloaded again. The
+        files not mapped are written in place."""
+        local = self._local
+        if local not in self.client._maps:
+            return
+        try:
+            st = local.stat()
+        except FileNotFoundError:
+            return
+
+        partial = _partial_path(local)
+        try:
+            if keep_content:
+                shutil.copyfile(local, partial)
+            else:
+                partial.touch()
+            os.utime(partial, ns=(st.st_atime_ns, st.st_mtime_ns))
+            os.replace(partial, local)
+        finally:
+            if partial.exists():
+                partial.unlink()
+
+    def _open(
+        self,
+        mode: str = "r",
+        buffering: int = -1,
+        encoding: str | None = None,
+        errors: str | None = None,
+        newline: str | None = None,
+        force_overwrite_from_cloud: bool | None = None,
+        force_overwrite_to_cloud: bool | None = None,
+        stream: bool | None = None,
+    ) -> IO[Any]:
+        """Open the file, optionally streaming it instead of caching it locally
+
+        Args:
+            stream: For the read modes, whether to read the blob with range
+                requests (see `yunpath.stream.GSRangeReader`) instead of
+                downloading it to the local cache first. In binary mode the
+                reader itself is returned, with `iter_chunks()` and
+                `iter_lines()`. Defaults to `GSClient(stream_reads=...)`.
+                For the write modes (`w`, `x`, not `a` or `+`), whether to
+                upload straight to GCS with a resumable upload (see
+                `yunpath.stream.GSStreamWriter`), committed on close.
+                Defaults to `GSClient(stream_writes=...)`.
+        """
+        reading = not set(mode) - set("rbt")
+        writing = not reading and not set(mode) - set("wxbt")
+        if stream is None:
+            stream = self.client.stream_reads if reading else self.client.stream_writes
+        if writing and stream:
+            return self._open_writer(
+                mode,
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+            )
+        if not reading:
+            self._detach_local(keep_content="w" not in mode and "x" not in mode)
+        if not reading or not stream:
+            return super().open(
+                mode,
+                buffering=buffering,
+                encoding=encoding,
+                errors=errors,
+                newline=newline,
+                force_overwrite_from_cloud=force_overwrite_from_cloud,
+                force_overwrite_to_cloud=force_overwrite_to_cloud,
+            )
+
+        blob = self.client._get_blob(self.bucket, self.blob) if self.blob else None
+        if blob is None:
+            if self.is_dir(follow_symlinks=False):
+                raise CloudPathIsADirectoryError(
+                    f"Cannot open directory, only files. Tried to open ({self})"
+                )
+            raise CloudPathFileNotFoundError(
+                f"File opened for read, but it does not exist on cloud: {self}"
+            )
+
+        reader = GSRangeReader(
+            blob,
+            block_size=self.client.stream_block_size,
+            max_block_size=self.client.stream_max_block_size,
+            readahead=self.client.stream_readahead,
+            **self.client.blob_kwargs,
+        )
+        if "b" in mode:
+            return reader
+        return io.TextIOWrapper(
+            io.BufferedReader(reader, buffer_size=max(buffering, 8192)),
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+        )
+
+    def _open_writer(
+        self,
+        mode: str,
+        buffering: int = -1,
+        encoding: str | None = None,
+        errors: str | None = None,
+        newline: str | None = None,
+    ) -> IO[Any]:
+        """Open a resumable upload to the blob, see `_open`"""
+        if not self.blob or self.client._is_file_or_dir(self) == "dir":
+            raise CloudPathIsADirectoryError(
+                f"Cannot open directory, only files. Tried to open ({self})"
+            )
+
+        upload_kwargs = dict(self.client.blob_kwargs)
+        if "x" in mode:
+            if self.exists(follow_symlinks=False):
+                raise CloudPathFileExistsError(
+                    f"Cannot open existing file ({self}) for creation."
+                )
+            # fail the commit if someone else creates it meanwhile
+            upload_kwargs["if_generation_match"] = 0
+        if self.client.content_type_method is not None:
+            content_type, _ = self.client.content_type_method(str(self))
+            upload_kwargs["content_type"] = content_type
+
+        blob = self.client.client.bucket(self.bucket).blob(self.blob)
+        writer = GSStreamWriter(
+            blob.open(
+                "wb",
+                chunk_size=self.client.stream_chunk_size,
+                ignore_flush=True,
+                **upload_kwargs,
+            ),
+            name=str(self),
+            on_close=lambda: self.client._invalidate(self),
+        )
+        if "b" in mode:
+            return writer
+        return GSTextStreamWriter(
+            writer,
+            encoding=encoding,
+            errors=errors,
+            newline=newline,
+            line_buffering=buffering == 1,
+        )
+
     exists = _wrap_follow_symlinks(_GSPath.exists)
     is_dir = _wrap_follow_symlinks(_GSPath.is_dir)
     is_file = _wrap_follow_symlinks(_GSPath.is_file)
@@ -390,7 +1689,7 @@ class GSPath(_GSPath):
         _GSPath.copy_into, target_argname="target_dir", target_arg_index=0
     )
     copytree = _wrap_follow_symlinks(
-        _GSPath.copytree, target_argname="destination", target_arg_index=0
+        _copytree, target_argname="destination", target_arg_index=0
     )
     move = _wrap_follow_symlinks(
         _GSPath.move, target_argname="target", target_arg_index=0
@@ -398,8 +1697,10 @@ class GSPath(_GSPath):
     move_into = _wrap_follow_symlinks(
         _GSPath.move_into, target_argname="target_dir", target_arg_index=0
     )
-    open = _wrap_follow_symlinks(_GSPath.open)
+    open = _wrap_follow_symlinks(_open)
     read_bytes = _wrap_follow_symlinks(_GSPath.read_bytes)
+    mmap = _wrap_follow_symlinks(_mmap)
+    read_buffer = _wrap_follow_symlinks(_read_buffer)
     read_text = _wrap_follow_symlinks(_GSPath.read_text)
     write_bytes = _wrap_follow_symlinks(_GSPath.write_bytes)
     write_text = _wrap_follow_symlinks(_GSPath.write_text)
@@ -0,0 +1,110 @@
+"""The methods added to `pathlib.PurePath`, to match the `CloudPath` API
+
+They are patched in when `yunpath` is imported. cloudpathlib, which imports
+the SDKs of all its providers, is only imported when a cloud path is
+involved.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import PurePath
+from typing import TYPE_CHECKING, Any, Callable, Container, Iterable
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor
+
+    from cloudpathlib.cloudpath import CloudPath
+
+
+def _to_anypath(path: str | os.PathLike) -> Any:
+    """Turn a string or path-like into a local or cloud path, with the GS
+    patches in place"""
+    from .patch import to_anypath
+
+    return to_anypath(path)
+
+
+def _rmtree(self, ignore_errors=False, onerror=None):
+    """Recursively delete a directory tree."""
+    if self.is_dir():
+        shutil.rmtree(self, ignore_errors=ignore_errors, onerror=onerror)
+    else:
+        raise NotADirectoryError(f"[Errno 20] Not a directory: '{self}'")
+
+
+def _copy(
+    self,
+    destination: str | os.PathLike | CloudPath,
+    force_overwrite_to_cloud: bool | None = None,
+):
+    """Copy a file to a destination."""
+    if not self.exists() or not self.is_file():
+        raise ValueError(
+            f"Path {self} should be a file. To copy a directory tree use "
+            "the method copytree."
+        )
+
+    # handle string version of cloud paths + local paths
+    if not isinstance(destination, PurePath):
+        destination = _to_anypath(destination)
+
+    if destination.is_dir():
+        destination = destination / self.name
+
+    if isinstance(destination, PurePath):
+        return shutil.copyfile(self, destination)
+
+    else:
+        return destination.upload_from(
+            self, force_overwrite_to_cloud=force_overwrite_to_cloud
+        )
+
+
+def _copytree(
+    self,
+    destination: str | os.PathLike | CloudPath,
+    follow_symlinks: bool = True,  # not used  # noqa
+    force_overwrite_to_cloud: bool | None = None,
+    ignore: Callable[[str, Iterable[str]], Container[str]] | None = None,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    progress: Callable[[Any, int, int], Any] | None = None,
+):
+    """Recursively copy a directory tree to a destination directory.
+
+    The tree is listed up front, then the files are copied with `max_workers`
+    threads (or the given `executor`). See `yunpath.transfer.copytree`.
+    """
+    if not self.is_dir():
+        raise NotADirectoryError(
+            f"Origin path {self} must be a directory. "
+            "To copy a single file use the method copy."
+        )
+
+    # handle string version of cloud paths + local paths
+    if not isinstance(destination, PurePath):
+        destination = _to_anypath(destination)
+
+    if destination.exists() and destination.is_file():
+        raise FileExistsError(
+            f"Destination path {destination} of copytree must be a directory."
+        )
+
+    from . import transfer
+
+    return transfer.copytree(
+        self,
+        destination,
+        force_overwrite_to_cloud=force_overwrite_to_cloud,
+        ignore=ignore,
+        max_workers=max_workers,
+        executor=executor,
+        progress=progress,
+    )
+
+
+PurePath.rmtree = _rmtree
+PurePath.copy = _copy
+PurePath.copytree = _copytree
+PurePath.fspath = property(lambda self: str(self))
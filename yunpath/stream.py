@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+
+class GSRangeReader(io.RawIOBase):
+    """A seekable binary reader of a blob, backed by HTTP range requests.
+
+    Nothing is staged on local disk, and the first bytes are available after
+    a single small request, whatever the size of the blob. Reads are served
+    from a block buffer. The block size starts at `block_size`, doubles for
+    each sequential fetch up to `max_block_size`, and falls back to
+    `block_size` after a seek elsewhere. With `readahead`, the next block is
+    fetched in the background while the current one is consumed, so at most
+    two blocks are held in memory.
+
+    The reads are pinned to the generation of the blob when it is opened, so
+    a blob overwritten meanwhile fails to read instead of mixing contents.
+
+    Args:
+        blob: The blob to read, with its size and generation loaded
+        block_size: The initial (and minimum) size of each range request
+        max_block_size: The maximum size of each range request
+        readahead: Whether to fetch the next block in the background
+        **blob_kwargs: Extra arguments for the downloads, e.g. timeout
+    """
+
+    def __init__(
+        self,
+        blob: Any,
+        block_size: int = 1024 * 1024,
+        max_block_size: int = 32 * 1024 * 1024,
+        readahead: bool = True,
+        **blob_kwargs: Any,
+    ):
+        super().__init__()
+        self.name = f"gs://{blob.bucket.name}/{blob.name}"
+        self.size: int = blob.size or 0
+        self.block_size = block_size
+        self.max_block_size = max(max_block_size, block_size)
+        self.readahead = readahead
+        self._blob = blob.bucket.blob(blob.name, generation=blob.generation)
+        self._blob_kwargs = blob_kwargs
+        self._pos = 0
+        self._buffer = b""
+        self._buffer_start = 0
+        self._next_block_size = block_size
+        self._prefetch: tuple[int, Future] | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _fetch(self, start: int, length: int) -> bytes:
+        end = min(start + length, self.size)
+        if start >= end:
+            return b""
+        return self._blob.download_as_bytes(
+            start=start, end=end - 1, checksum=None, **self._blob_kwargs
+        )
+
+    def _fill(self, pos: int, length: int) -> None:
+        """Load the block starting at pos into the buffer"""
+        # the first block is not sequential, readers of headers only need it
+        sequential = bool(self._buffer) and pos == self._buffer_start + len(
+            self._buffer
+        )
+        if sequential:
+            self._next_block_size = min(
+                self._next_block_size * 2, self.max_block_size
+            )
+        else:
+            self._next_block_size = self.block_size
+
+        if self._prefetch is not None and self._prefetch[0] == pos:
+            data = self._prefetch[1].result()
+        else:
+            data = self._fetch(pos, max(length, self._next_block_size))
+        self._prefetch = None
+        self._buffer = data
+        self._buffer_start = pos
+
+        after = pos + len(data)
+        if self.readahead and sequential and after < self.size:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            size = min(self._next_block_size * 2, self.max_block_size)
+            self._prefetch = (after, self._executor.submit(self._fetch, after, size))
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b: Any) -> int:
+        """Read until b is full or the end of the blob, unlike a raw file,
+        since callers of `open("rb")` rarely loop on short reads"""
+        self._checkClosed()
+        view = memoryview(b).cast("B")
+        filled = 0
+        while filled < len(view) and self._pos < self.size:
+            offset = self._pos - self._buffer_start
+            if not 0 <= offset < len(self._buffer):
+                self._fill(self._pos, len(view) - filled)
+                offset = 0
+                if not self._buffer:  # pragma: no cover, truncated blob
+                    break
+
+            n = min(len(view) - filled, len(self._buffer) - offset)
+            view[filled : filled + n] = self._buffer[offset : offset + n]
+            self._pos += n
+            filled += n
+        return filled
+
+    def readall(self) -> bytes:
+        self._checkClosed()
+        chunks = []
+        offset = self._pos - self._buffer_start
+        if 0 <= offset < len(self._buffer):
+            chunks.append(self._buffer[offset:])
+            self._pos = self._buffer_start + len(self._buffer)
+        if self._pos < self.size:
+            if self._prefetch is not None and self._prefetch[0] == self._pos:
+                chunks.append(self._prefetch[1].result())
+                self._pos += len(chunks[-1])
+                self._prefetch = None
+            chunks.append(self._fetch(self._pos, self.size - self._pos))
+        self._pos = max(self._pos, self.size)
+        return b"".join(chunks)
+
+    def readline(self, size: int | None = -1) -> bytes:
+        self._checkClosed()
+        line = bytearray()
+        while size is None or size < 0 or len(line) < size:
+            if self._pos >= self.size:
+                break
+            offset = self._pos - self._buffer_start
+            if not 0 <= offset < len(self._buffer):
+                self._fill(self._pos, 0)
+                offset = 0
+
+            end = self._buffer.find(b"\n", offset)
+            end = len(self._buffer) if end < 0 else end + 1
+            if size is not None and size >= 0:
+                end = min(end, offset + size - len(line))
+            line += self._buffer[offset:end]
+            self._pos += end - offset
+            if line.endswith(b"\n"):
+                break
+        return bytes(line)
+
+    def iter_chunks(self, chunk_size: int | None = None) -> Iterator[bytes]:
+        """Iterate over the rest of the blob in chunks
+
+        Args:
+            chunk_size: The size of each chunk, the adaptive block size if None
+        """
+        while True:
+            if chunk_size is None:
+                offset = self._pos - self._buffer_start
+                if not 0 <= offset < len(self._buffer):
+                    if self._pos >= self.size:
+                        return
+                    self._fill(self._pos, 0)
+                    offset = 0
+                chunk = self._buffer[offset:]
+                self._pos += len(chunk)
+            else:
+                chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_lines(self, keepends: bool = False) -> Iterator[bytes]:
+        """Iterate over the rest of the blob line by line
+
+        Args:
+            keepends: Whether to keep the line endings
+        """
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line if keepends else line.rstrip(b"\r\n")
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._prefetch = None
+        self._buffer = b""
+        super().close()
+
+
+class GSStreamWriter(io.BufferedIOBase):
+    """A binary writer that streams to a blob with a resumable upload.
+
+    It wraps the writer from `Blob.open("wb")`, which sends the data to the
+    upload session in chunks of a fixed size, so memory is bounded by the
+    chunk size and nothing is staged on local disk. The blob is created (or
+    replaced) only when the writer is closed. Leaving a `with` block with an
+    exception cancels the upload instead, leaving the blob untouched.
+
+    Args:
+        writer: The writer from `Blob.open("wb")`
+        name: The `gs://` url of the blob
+        on_close: A callable called after the upload is committed
+    """
+
+    def __init__(
+        self,
+        writer: Any,
+        name: str,
+        on_close: Callable[[], Any] | None = None,
+    ):
+        super().__init__()
+        self.name = name
+        self._writer = writer
+        self._on_close = on_close
+
+    @property
+    def closed(self) -> bool:
+        return self._writer.closed
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        self._writer.write(b)
+        return memoryview(b).nbytes
+
+    def tell(self) -> int:
+        return self._writer.tell()
+
+    def flush(self) -> None:
+        # the data is only committed when closing
+        pass
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._writer.close()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+
+    def terminate(self) -> None:
+        """Cancel the upload, the blob is left as it was"""
+        if self.closed:
+            return
+        terminate = getattr(self._writer, "terminate", None)
+        if terminate is not None:
+            terminate()
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if exc_type is not None:
+            self.terminate()
+        else:
+            self.close()
+
+
+class GSTextStreamWriter(io.TextIOWrapper):
+    """A text writer over `GSStreamWriter` that cancels the upload when its
+    `with` block raises"""
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        if exc_type is not None:
+            self.buffer.terminate()
+        else:
+            self.close()
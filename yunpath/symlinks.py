@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+
+class SymlinkIndex:
+    """An in-memory index of the gcsfuse symlinks under some bucket prefixes.
+
+    A prefix is indexed by listing it once, asking GCS only for the names and
+    the custom metadata of the objects. For any path under an indexed prefix,
+    the index is authoritative: a path not recorded is not a symlink, without
+    fetching its blob.
+    """
+
+    def __init__(self):
+        # bucket => prefixes (without trailing slash) that have been listed
+        self._prefixes: dict[str, set[str]] = {}
+        # (bucket, blob) => raw symlink target
+        self._targets: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def covers(self, bucket: str, blob: str) -> bool:
+        """Check if a blob is under an indexed prefix"""
+        prefixes = self._prefixes.get(bucket, ())
+        return any(blob.startswith(prefix) for prefix in prefixes)
+
+    def lookup(self, bucket: str, blob: str) -> str | None:
+        """Get the target of a blob, None if it is not a symlink"""
+        return self._targets.get((bucket, blob))
+
+    def build(self, storage_client: Any, bucket: str, prefix: str = "") -> int:
+        """List a prefix and (re-)index the symlinks under it
+
+        Args:
+            storage_client: The google cloud storage client
+            bucket: The bucket name
+            prefix: The prefix to index, the whole bucket if empty
+
+        Returns:
+            The number of symlinks found under the prefix
+        """
+        prefix = prefix.rstrip("/")
+        found = {}
+        for blob in storage_client.bucket(bucket).list_blobs(
+            prefix=prefix or None,
+            fields="items(name,metadata),nextPageToken",
+        ):
+            metadata = blob.metadata
+            if isinstance(metadata, dict) and "gcsfuse_symlink_target" in metadata:
+                found[(bucket, blob.name)] = metadata["gcsfuse_symlink_target"]
+
+        with self._lock:
+            for key in [
+                k for k in self._targets if k[0] == bucket and k[1].startswith(prefix)
+            ]:
+                del self._targets[key]
+            self._targets.update(found)
+
+            prefixes = self._prefixes.setdefault(bucket, set())
+            # a wider prefix makes the narrower ones redundant
+            for indexed in [p for p in prefixes if p.startswith(prefix)]:
+                prefixes.discard(indexed)
+            prefixes.add(prefix)
+
+        return len(found)
+
+    def refresh(self, storage_client: Any) -> int:
+        """Re-list all the indexed prefixes, for changes made by other clients"""
+        return sum(
+            self.build(storage_client, bucket, prefix)
+            for bucket, prefixes in list(self._prefixes.items())
+            for prefix in list(prefixes)
+        )
+
+    def set(self, bucket: str, blob: str, target: str) -> None:
+        """Record a symlink created through the client"""
+        if not self.covers(bucket, blob):
+            return
+        with self._lock:
+            self._targets[(bucket, blob)] = target
+
+    def discard(self, bucket: str, blob: str, recursive: bool = False) -> None:
+        """Forget a blob (and everything under it if recursive) that was
+        overwritten or removed through the client"""
+        with self._lock:
+            self._targets.pop((bucket, blob), None)
+            self._targets.pop((bucket, blob.rstrip("/")), None)
+            if recursive:
+                prefix = blob.rstrip("/") + "/"
+                for key in [
+                    k
+                    for k in self._targets
+                    if k[0] == bucket and k[1].startswith(prefix)
+                ]:
+                    del self._targets[key]
+
+    def clear(self) -> None:
+        """Drop the index"""
+        with self._lock:
+            self._prefixes.clear()
+            self._targets.clear()
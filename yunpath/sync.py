@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from cloudpathlib.anypath import to_anypath
+from cloudpathlib.cloudpath import CloudPath
+
+from . import patch  # noqa: F401, the patched GSPath for to_anypath
+from . import transfer
+
+CHECKSUMS = ("crc32c", "md5", "size")
+
+
+@dataclass
+class SyncResult:
+    """What a sync did, or would do with `dry_run`
+
+    Attributes:
+        copied: The relative paths copied from the source
+        deleted: The relative paths deleted from the destination
+        unchanged: The number of files already up to date
+    """
+
+    copied: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+
+class Manifest:
+    """The digests of local files, reused while their size and mtime do not
+    change, persisted as a JSON file
+
+    Args:
+        path: The JSON file, None to keep the digests in memory only
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._files: dict[str, dict[str, Any]] = {}
+        if self.path is not None and self.path.is_file():
+            try:
+                self._files = json.loads(self.path.read_text()).get("files", {})
+            except (ValueError, AttributeError):
+                # corrupted, rebuilt on the next save
+                self._files = {}
+
+    def digest(self, local_path: str | os.PathLike, checksum: str) -> str:
+        """Get the digest of a local file as GCS reports it (base64)"""
+        local_path = os.path.abspath(local_path)
+        st = os.stat(local_path)
+        with self._lock:
+            entry = self._files.get(local_path)
+            if (
+                entry is None
+                or entry.get("size") != st.st_size
+                or entry.get("mtime_ns") != st.st_mtime_ns
+            ):
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+                self._files[local_path] = entry
+            elif checksum in entry:
+                return entry[checksum]
+
+        value = _local_digest(local_path, checksum)
+        with self._lock:
+            entry[checksum] = value
+        return value
+
+    def record(self, local_path: str | os.PathLike, checksum: str, value: str):
+        """Record the known digest of a local file just written"""
+        local_path = os.path.abspath(local_path)
+        st = os.stat(local_path)
+        with self._lock:
+            self._files[local_path] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                checksum: value,
+            }
+
+    def forget(self, local_path: str | os.PathLike) -> None:
+        with self._lock:
+            self._files.pop(os.path.abspath(local_path), None)
+
+    def save(self) -> None:
+        """Write the manifest, atomically"""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with self._lock:
+            tmp.write_text(json.dumps({"version": 1, "files": self._files}))
+        os.replace(tmp, self.path)
+
+
+def _local_digest(local_path: str, checksum: str) -> str:
+    if checksum == "crc32c":
+        return transfer._crc32c(local_path)
+
+    md5 = hashlib.md5()
+    with open(local_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            md5.update(block)
+    return base64.b64encode(md5.digest()).decode()
+
+
+def _list(root: Any) -> dict[str, Any]:
+    """List the files under a root, by their relative path (posix)
+
+    Returns:
+        The blobs for a cloud root, the `os.DirEntry`s for a local one
+    """
+    files = {}
+    if isinstance(root, CloudPath):
+        if not hasattr(root.client, "_iter_blobs"):
+            raise ValueError(f"Only local and gs:// paths can be synced: {root}")
+        prefix = root.blob.rstrip("/") + "/" if root.blob else ""
+        for name, blob in root.client._iter_blobs(root.bucket, prefix):
+            if not name.endswith("/"):
+                # not the prefix/ placeholders
+                files[name[len(prefix) :]] = blob
+        return files
+
+    if not os.path.isdir(root):
+        return files
+
+    stack = [(os.fspath(root), "")]
+    while stack:
+        dirpath, rel = stack.pop()
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append((entry.path, f"{rel}{entry.name}/"))
+                elif entry.is_file():
+                    files[f"{rel}{entry.name}"] = entry
+    return files
+
+
+def sync(
+    source: str | os.PathLike | CloudPath,
+    destination: str | os.PathLike | CloudPath,
+    delete: bool = False,
+    checksum: str = "crc32c",
+    manifest: str | os.PathLike | Manifest | None = None,
+    dry_run: bool = False,
+    max_workers: int = 8,
+    progress: Callable[[str, str], Any] | None = None,
+) -> SyncResult:
+    """Make a destination directory a copy of a source directory, copying
+    only the files that changed
+
+    Either side can be local or on the cloud. A file is copied when it is
+    missing in the destination, has a different size, or has a different
+    checksum. The checksums of blobs come with the listing; the ones of
+    local files are computed, and reused from the manifest while the size
+    and mtime of the file do not change.
+
+    Args:
+        source: The source directory
+        destination: The destination directory
+        delete: Whether to delete the files in the destination that are not
+            in the source
+        checksum: `crc32c`, `md5` (missing for composite blobs) or `size`
+            to compare the sizes only
+        manifest: A JSON file (or a `Manifest`) to keep the digests of
+            local files in, across runs
+        dry_run: Only report what would be done
+        max_workers: The number of files compared and copied at a time
+        progress: A callable called with the action (`copy` or `delete`)
+            and the relative path, in the worker threads
+
+    Returns:
+        What was done
+
+    Raises:
+        FileNotFoundError: If the source does not exist
+        NotADirectoryError: If the source is not a directory
+    """
+    if checksum not in CHECKSUMS:
+        raise ValueError(f"checksum must be one of {CHECKSUMS}, got {checksum!r}")
+
+    source = to_anypath(source)
+    destination = to_anypath(destination)
+    # a missing source would look empty, and delete the whole destination
+    if not source.exists():
+        raise FileNotFoundError(f"No such source directory: {source}")
+    if not source.is_dir():
+        raise NotADirectoryError(f"The source is not a directory: {source}")
+    if not isinstance(manifest, Manifest):
+        manifest = Manifest(manifest)
+
+    src_files = _list(source)
+    dst_files = _list(destination)
+    result = SyncResult()
+    lock = threading.Lock()
+
+    def _size(item: Any) -> int:
+        if isinstance(item, os.DirEntry):
+            return item.stat().st_size
+        return item.size or 0
+
+    def _digest(item: Any) -> str | None:
+        if isinstance(item, os.DirEntry):
+            return manifest.digest(item.path, checksum)
+        return item.crc32c if checksum == "crc32c" else item.md5_hash
+
+    def _same(rel: str) -> bool:
+        dst_item = dst_files.get(rel)
+        if dst_item is None:
+            return False
+        src_item = src_files[rel]
+        if _size(src_item) != _size(dst_item):
+            return False
+        if checksum == "size":
+            return True
+        src_digest = _digest(src_item)
+        return src_digest is not None and src_digest == _digest(dst_item)
+
+    def _sync_one(rel: str) -> None:
+        if _same(rel):
+            with lock:
+                result.unchanged += 1
+            return
+
+        with lock:
+            result.copied.append(rel)
+        if progress is not None:
+            progress("copy", rel)
+        if dry_run:
+            return
+
+        src = source.joinpath(*rel.split("/"))
+        dst = destination.joinpath(*rel.split("/"))
+        if not isinstance(dst, CloudPath):
+            dst.parent.mkdir(parents=True, exist_ok=True)
+        transfer.copy_file(src, dst, force_overwrite_to_cloud=True)
+
+        if checksum != "size" and not isinstance(dst, CloudPath):
+            digest = _digest(src_files[rel])
+            if digest is not None:
+                manifest.record(dst, checksum, digest)
+
+    def _delete_one(rel: str) -> None:
+        with lock:
+            result.deleted.append(rel)
+        if progress is not None:
+            progress("delete", rel)
+        if dry_run or isinstance(destination, CloudPath):
+            return
+        path = destination.joinpath(*rel.split("/"))
+        path.unlink()
+        manifest.forget(path)
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        for future in [pool.submit(_sync_one, rel) for rel in sorted(src_files)]:
+            future.result()
+
+        extraneous = sorted(set(dst_files) - set(src_files)) if delete else []
+        for future in [pool.submit(_delete_one, rel) for rel in extraneous]:
+            future.result()
+
+    if extraneous and not dry_run and isinstance(destination, CloudPath):
+        prefix = destination.blob.rstrip("/") + "/" if destination.blob else ""
+        client = destination.client
+        transfer.delete_blobs(
+            client.client,
+            destination.bucket,
+            [prefix + rel for rel in extraneous],
+            batch_size=client.delete_batch_size,
+            max_workers=client.delete_workers,
+            **client.blob_kwargs,
+        )
+        client._invalidate(destination, recursive=True)
+
+    result.copied.sort()
+    result.deleted.sort()
+    manifest.save()
+    return result
@@ -0,0 +1,225 @@
+"""Columnar listings of the blobs under a prefix
+
+The listing pages are read straight into a buffer per column, without a
+`GSPath` per blob, and converted a chunk at a time to NumPy structured
+arrays, Arrow record batches or plain dicts of lists. NumPy and pyarrow are
+only imported for their format.
+"""
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Sequence
+
+FIELDS = ("name", "size", "updated", "crc32c", "generation", "is_symlink")
+FORMATS = ("numpy", "arrow", "dict")
+
+# the properties of the listed resources each field is read from
+_PROPERTIES = {
+    "name": "name",
+    "size": "size",
+    "updated": "updated",
+    "crc32c": "crc32c",
+    "generation": "generation",
+    "is_symlink": "metadata",
+}
+
+
+def check_fields(fields: Sequence[str] | None, format: str) -> tuple[str, ...]:
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, got {format!r}")
+    if fields is None:
+        return FIELDS
+    fields = tuple(fields)
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}, expected some of {FIELDS}")
+    if not fields:
+        raise ValueError("At least one field is required")
+    return fields
+
+
+def listing_fields(fields: Sequence[str]) -> str:
+    """The partial response of a listing with only what the fields need"""
+    properties = {"name"} | {_PROPERTIES[field] for field in fields}
+    return f"items({','.join(sorted(properties))}),prefixes,nextPageToken"
+
+
+def _crc32c(value: str | None) -> int | None:
+    """The base64 big-endian crc32c of GCS as an int"""
+    if value is None:
+        return None
+    return int.from_bytes(base64.b64decode(value), "big")
+
+
+def _is_symlink(metadata: dict | None) -> bool:
+    return bool(metadata) and "gcsfuse_symlink_target" in metadata
+
+
+def _updated(value: str | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.endswith("Z"):  # before python 3.11
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _to_int(value: Any) -> int | None:
+    # int64 values are strings in the JSON API
+    return None if value is None else int(value)
+
+
+# what the property of each field becomes in its column
+_CONVERT = {
+    "size": _to_int,
+    "updated": _updated,
+    "crc32c": _crc32c,
+    "generation": _to_int,
+    "is_symlink": _is_symlink,
+}
+
+
+def _to_numpy(columns: dict[str, list], fields: tuple[str, ...]) -> Any:
+    import numpy as np
+
+    width = max(map(len, columns.get("name", ())), default=0)
+    dtypes = {
+        # fixed width, for vectorized string operations
+        "name": f"U{width or 1}",
+        "size": np.int64,
+        "updated": "datetime64[us]",
+        "crc32c": np.uint32,
+        "generation": np.int64,
+        "is_symlink": bool,
+    }
+    table = np.zeros(
+        len(columns[fields[0]]), dtype=[(field, dtypes[field]) for field in fields]
+    )
+    for field in fields:
+        values = columns[field]
+        if field == "updated":
+            # GCS times are UTC, numpy datetimes are naive; NaT if missing
+            values = [v.replace(tzinfo=None) if v else None for v in values]
+        elif field in ("size", "crc32c", "generation"):
+            # 0 if missing
+            values = [v or 0 for v in values]
+        table[field] = values
+    return table
+
+
+def arrow_schema(fields: Sequence[str]) -> Any:
+    """The Arrow schema of a table with the fields"""
+    import pyarrow as pa
+
+    types = {
+        "name": pa.string(),
+        "size": pa.int64(),
+        "updated": pa.timestamp("us", tz="UTC"),
+        "crc32c": pa.uint32(),
+        "generation": pa.int64(),
+        "is_symlink": pa.bool_(),
+    }
+    return pa.schema([(field, types[field]) for field in fields])
+
+
+def _to_arrow(columns: dict[str, list], fields: tuple[str, ...]) -> Any:
+    import pyarrow as pa
+
+    schema = arrow_schema(fields)
+    arrays = [
+        pa.array(columns[field], type=schema.field(field).type) for field in fields
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+_CONVERTERS = {
+    "numpy": _to_numpy,
+    "arrow": _to_arrow,
+    "dict": lambda columns, fields: columns,
+}
+
+
+def iter_table(
+    listed: Iterable[tuple[str, Any]],
+    prefix: str = "",
+    fields: Sequence[str] | None = None,
+    format: str = "numpy",
+    chunk_size: int = 100_000,
+) -> Iterator[Any]:
+    """Read a listing into columnar chunks
+
+    Args:
+        listed: Tuples of the name and the blob (None for a prefix, which
+            is skipped), e.g. from `GSClient._iter_blobs`
+        prefix: The prefix listed, stripped from the names
+        fields: The columns, some of `FIELDS`, all of them by default
+        format: `numpy` for structured arrays, `arrow` for
+            `pyarrow.RecordBatch`es, `dict` for dicts of lists
+        chunk_size: The maximum number of rows of a chunk
+
+    Yields:
+        The chunks, none of them empty. The names are relative to the prefix,
+        the `prefix/` directory placeholders are skipped. For NumPy, the
+        missing sizes, crc32cs and generations are 0 and the missing times
+        NaT; the times are UTC.
+    """
+    fields = check_fields(fields, format)
+    convert = _CONVERTERS[format]
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    reads = [
+        (field, _PROPERTIES[field], _CONVERT[field])
+        for field in fields
+        if field != "name"
+    ]
+    strip = len(prefix)
+    columns: dict[str, list] = {field: [] for field in fields}
+    count = 0
+    for name, blob in listed:
+        if blob is None or name.endswith("/"):
+            continue
+        if "name" in columns:
+            columns["name"].append(name[strip:])
+        # the resource as listed, without building the properties of Blob
+        resource = blob._properties
+        for field, prop, read in reads:
+            columns[field].append(read(resource.get(prop)))
+        count += 1
+        if count >= chunk_size:
+            yield convert(columns, fields)
+            columns = {field: [] for field in fields}
+            count = 0
+
+    if count:
+        yield convert(columns, fields)
+
+
+def concat(chunks: Iterable[Any], fields: Sequence[str] | None, format: str) -> Any:
+    """Concatenate the chunks of `iter_table` into a single table
+
+    Returns:
+        A NumPy structured array, a `pyarrow.Table` or a dict of lists
+    """
+    fields = check_fields(fields, format)
+    chunks = list(chunks)
+    if format == "arrow":
+        import pyarrow as pa
+
+        return pa.Table.from_batches(chunks, schema=arrow_schema(fields))
+
+    if format == "numpy":
+        if not chunks:
+            return _to_numpy({field: [] for field in fields}, fields)
+        if len(chunks) == 1:
+            return chunks[0]
+        import numpy as np
+
+        # the widths of the names are promoted to the longest
+        return np.concatenate(chunks)
+
+    columns: dict[str, list] = {field: [] for field in fields}
+    for chunk in chunks:
+        for field in fields:
+            columns[field].extend(chunk[field])
+    return columns
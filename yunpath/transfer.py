@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import base64
+import os
+import time
+import uuid
+from contextlib import suppress
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Container, Iterable, Iterator
+
+from cloudpathlib.cloudpath import CloudPath
+
+
+def _walk(source: Any) -> Iterator[tuple[Any, list[str], list[str]]]:
+    """Walk a local or cloud directory top-down, following symlinks
+
+    The dirnames yielded can be pruned in place.
+    """
+    if isinstance(source, CloudPath):
+        yield from source.walk()
+        return
+
+    for dirpath, dirnames, filenames in os.walk(source, followlinks=True):
+        yield source.__class__(dirpath), dirnames, filenames
+
+
+def copy_file(
+    source: Any,
+    destination: Any,
+    force_overwrite_to_cloud: bool | None = None,
+) -> None:
+    """Copy a local or cloud file to a local or cloud file path"""
+    # GSPath to GSPath: copy the blob server-side as it is
+    copy_object = getattr(source, "_copy_object", None)
+    if copy_object is not None and isinstance(destination, type(source)):
+        copy_object(destination, force_overwrite_to_cloud=force_overwrite_to_cloud)
+    else:
+        source.copy(destination, force_overwrite_to_cloud=force_overwrite_to_cloud)
+
+
+def copytree(
+    source: Any,
+    destination: Any,
+    force_overwrite_to_cloud: bool | None = None,
+    ignore: Callable[[Any, Iterable[str]], Container[str]] | None = None,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+    progress: Callable[[Any, int, int], Any] | None = None,
+) -> Any:
+    """Copy a local or cloud directory tree to a local or cloud destination
+
+    The whole source tree is listed first, with `ignore` applied to each
+    directory, then the directories are created and the files are copied,
+    in parallel if `max_workers` or `executor` is given.
+
+    Args:
+        source: The source directory, validated by the caller
+        destination: The destination directory
+        force_overwrite_to_cloud: Passed to the `copy` of each file
+        ignore: A callable like `shutil.ignore_patterns(...)`, called with
+            each directory (its blob name for cloud paths) and the names in it
+        max_workers: The number of threads to copy files with
+        executor: An executor to copy files with, instead of a new thread pool
+        progress: A callable called with each source file copied, the number
+            of files copied so far and the total number of files, in the
+            calling thread
+
+    Returns:
+        The destination
+
+    Raises:
+        The error of the first file (in listing order) that failed to copy;
+            files not yet started by then are skipped
+    """
+    dirs = []
+    files = []
+    for dirpath, dirnames, filenames in _walk(source):
+        dest_dir = destination.joinpath(*dirpath.relative_to(source).parts)
+        dirs.append(dest_dir)
+
+        if ignore is not None:
+            ignored = ignore(
+                dirpath._no_prefix_no_drive
+                if isinstance(dirpath, CloudPath)
+                else dirpath,
+                dirnames + filenames,
+            )
+            dirnames[:] = [name for name in dirnames if name not in ignored]
+            filenames = [name for name in filenames if name not in ignored]
+
+        for name in dirnames + filenames:
+            # keys like `a/../b` must not escape the destination
+            if name in (".", ".."):
+                raise ValueError(f"Invalid name in {dirpath}: {name!r}")
+
+        files.extend((dirpath / name, dest_dir / name) for name in filenames)
+
+    for dest_dir in dirs:
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+    def _copy(src: Any, dst: Any) -> None:
+        copy_file(src, dst, force_overwrite_to_cloud=force_overwrite_to_cloud)
+
+    total = len(files)
+    if executor is None and (max_workers is None or max_workers <= 1):
+        for done, (src, dst) in enumerate(files, start=1):
+            _copy(src, dst)
+            if progress is not None:
+                progress(src, done, total)
+        return destination
+
+    pool = executor or ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures: list[Future] = [pool.submit(_copy, src, dst) for src, dst in files]
+        order = {future: i for i, future in enumerate(futures)}
+        pending = set(futures)
+        done = 0
+        failed: list[Future] = []
+        while pending:
+            finished, pending = wait(pending, return_when="FIRST_COMPLETED")
+            for future in sorted(finished, key=order.__getitem__):
+                if future.cancelled():
+                    continue
+                if future.exception() is not None:
+                    failed.append(future)
+                    continue
+                done += 1
+                if progress is not None:
+                    progress(files[order[future]][0], done, total)
+
+            if failed:
+                for future in pending:
+                    future.cancel()
+
+        if failed:
+            first = min(failed, key=order.__getitem__)
+            raise first.exception()
+    finally:
+        if executor is None:
+            pool.shutdown(wait=True)
+
+    return destination
+
+
+def delete_blobs(
+    storage_client: Any,
+    bucket: str,
+    names: Iterable[str],
+    batch_size: int = 100,
+    max_workers: int = 8,
+    retries: int = 3,
+    **blob_kwargs: Any,
+) -> None:
+    """Delete blobs with JSON API batch requests, several batches at a time
+
+    The blobs of a batch that fail are retried one by one. The blobs that do
+    not exist (anymore) are not considered failures.
+
+    Args:
+        storage_client: The google cloud storage client
+        bucket: The bucket name
+        names: The names of the blobs to delete
+        batch_size: The number of deletions in a batch request, up to 100
+        max_workers: The maximum number of batch requests running at a time
+        retries: The number of times to retry each failed deletion
+        **blob_kwargs: Extra arguments for the deletions, e.g. timeout
+    """
+    from google.api_core.exceptions import NotFound
+
+    bkt = storage_client.bucket(bucket)
+    names = list(names)
+    chunks = [names[i : i + batch_size] for i in range(0, len(names), batch_size)]
+
+    def _delete_one(name: str) -> None:
+        for attempt in range(retries + 1):
+            try:
+                bkt.delete_blob(name, **blob_kwargs)
+                return
+            except NotFound:
+                return
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(min(2**attempt * 0.1, 2.0))
+
+    def _delete_chunk(chunk: list[str]) -> None:
+        if len(chunk) == 1:
+            _delete_one(chunk[0])
+            return
+
+        failed = chunk
+        try:
+            with storage_client.batch(raise_exception=False) as batch:
+                for name in chunk:
+                    bkt.delete_blob(name, **blob_kwargs)
+        except Exception:
+            # the batch request itself failed, retry all of them
+            pass
+        else:
+            failed = [
+                name
+                for name, response in zip(chunk, batch._responses)
+                if not 200 <= response.status_code < 300
+                and response.status_code != 404
+            ]
+
+        for name in failed:
+            _delete_one(name)
+
+    if len(chunks) <= 1 or max_workers <= 1:
+        for chunk in chunks:
+            _delete_chunk(chunk)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for future in [pool.submit(_delete_chunk, chunk) for chunk in chunks]:
+            future.result()
+
+
+def _crc32c(local_path: str | os.PathLike, block_size: int = 1 << 20) -> str:
+    """Compute the base64-encoded crc32c of a local file, as GCS reports it"""
+    import google_crc32c
+
+    checksum = google_crc32c.Checksum()
+    with open(local_path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            checksum.update(block)
+    return base64.b64encode(checksum.digest()).decode()
+
+
+def composite_upload(
+    storage_client: Any,
+    bucket: str,
+    name: str,
+    local_path: str | os.PathLike,
+    chunk_size: int,
+    max_workers: int = 8,
+    content_type: str | None = None,
+    **blob_kwargs: Any,
+) -> None:
+    """Upload a local file as chunks in parallel and compose them into a blob
+
+    The chunks are uploaded as temporary objects next to the destination,
+    composed (up to 32 at a time, as GCS allows) into the destination, and
+    removed afterwards, whether the upload succeeds or not. When the upload
+    fails, the errors of the removal are ignored so that the original error
+    is raised. The crc32c of the composed object is checked against the
+    local file.
+
+    Args:
+        storage_client: The google cloud storage client
+        bucket: The bucket name
+        name: The name of the destination blob
+        local_path: The local file to upload
+        chunk_size: The size of each chunk in bytes
+        max_workers: The number of chunks to upload at a time
+        content_type: The content type of the destination blob
+        **blob_kwargs: Extra arguments for the uploads and the compositions
+
+    Raises:
+        OSError: When the crc32c of the composed object does not match
+    """
+    bkt = storage_client.bucket(bucket)
+    size = os.path.getsize(local_path)
+    offsets = range(0, size, chunk_size)
+    token = uuid.uuid4().hex
+    temporaries: list[str] = []
+
+    def _upload_chunk(index: int, offset: int) -> Any:
+        blob = bkt.blob(f"{name}.yunpath-tmp-{token}-{index:05d}")
+        with open(local_path, "rb") as fh:
+            fh.seek(offset)
+            blob.upload_from_file(
+                fh, size=min(chunk_size, size - offset), **blob_kwargs
+            )
+        return blob
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            futures = [
+                pool.submit(_upload_chunk, i, offset)
+                for i, offset in enumerate(offsets)
+            ]
+            crc = pool.submit(_crc32c, local_path)
+            temporaries.extend(
+                f"{name}.yunpath-tmp-{token}-{i:05d}" for i in range(len(futures))
+            )
+            components = [future.result() for future in futures]
+            expected = crc.result()
+
+        # compose 32 components at a time until only the destination is left
+        level = 0
+        while True:
+            groups = [components[i : i + 32] for i in range(0, len(components), 32)]
+            if len(groups) == 1:
+                destination = bkt.blob(name)
+                destination.content_type = content_type
+                destination.compose(groups[0], **blob_kwargs)
+                break
+
+            level += 1
+            components = []
+            for i, group in enumerate(groups):
+                intermediate = bkt.blob(
+                    f"{name}.yunpath-tmp-{token}-c{level}-{i:05d}"
+                )
+                temporaries.append(intermediate.name)
+                intermediate.compose(group, **blob_kwargs)
+                components.append(intermediate)
+
+        if destination.crc32c != expected:
+            bkt.delete_blob(name, **blob_kwargs)
+            raise OSError(
+                f"Composite upload of {local_path} to gs://{bucket}/{name} is "
+                f"corrupted: crc32c {destination.crc32c} != {expected}"
+            )
+    except BaseException:
+        # a failure to clean up must not hide the reason of the failure
+        with suppress(Exception):
+            delete_blobs(
+                storage_client,
+                bucket,
+                temporaries,
+                max_workers=max_workers,
+                **blob_kwargs,
+            )
+        raise
+
+    delete_blobs(
+        storage_client, bucket, temporaries, max_workers=max_workers, **blob_kwargs
+    )
+
+
+def sliced_download(
+    blob: Any,
+    local_path: str | os.PathLike,
+    chunk_size: int,
+    max_workers: int = 8,
+    **blob_kwargs: Any,
+) -> None:
+    """Download a blob with concurrent ranged requests into a local file
+
+    The local file is preallocated to the size of the blob, and each slice
+    is written at its offset. The slices are pinned to the generation of
+    the blob, so a blob overwritten meanwhile fails instead of mixing
+    contents. The crc32c of the local file is checked against the blob's.
+
+    Args:
+        blob: The blob to download, with its size and generation loaded
+        local_path: The local file to write
+        chunk_size: The size of each slice in bytes
+        max_workers: The number of slices to download at a time
+        **blob_kwargs: Extra arguments for the downloads
+
+    Raises:
+        OSError: When the crc32c of the local file does not match
+    """
+    size = blob.size or 0
+    pinned = blob.bucket.blob(blob.name, generation=blob.generation)
+
+    fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+    def _download_slice(offset: int) -> None:
+        data = pinned.download_as_bytes(
+            start=offset,
+            end=min(offset + chunk_size, size) - 1,
+            checksum=None,
+            **blob_kwargs,
+        )
+        fd = os.open(local_path, os.O_WRONLY)
+        try:
+            if not hasattr(os, "pwrite"):  # pragma: no cover, Windows
+                os.lseek(fd, offset, os.SEEK_SET)
+            # the writes may be partial, e.g. when interrupted by a signal
+            view = memoryview(data)
+            while view:
+                if hasattr(os, "pwrite"):
+                    written = os.pwrite(fd, view, offset)
+                else:  # pragma: no cover, Windows
+                    written = os.write(fd, view)
+                view = view[written:]
+                offset += written
+        finally:
+            os.close(fd)
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        for future in [
+            pool.submit(_download_slice, offset)
+            for offset in range(0, size, chunk_size)
+        ]:
+            future.result()
+
+    if blob.crc32c and _crc32c(local_path) != blob.crc32c:
+        os.remove(local_path)
+        raise OSError(
+            f"Sliced download of gs://{blob.bucket.name}/{blob.name} to "
+            f"{local_path} is corrupted: crc32c mismatch"
+        )